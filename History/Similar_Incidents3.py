@@ -443,149 +443,458 @@ A comprehensive system for analyzing IT incidents by comparing them with histori
 and providing root cause analysis using LLM capabilities.
 
 Features:
-- ChromaDB for vector storage and similarity search
+- ChromaDB (or an in-process NumPy index) for vector storage and similarity search
 - Groq LLM for incident analysis
 - Multiple input methods for incidents
 - Detailed incident comparison and analysis
 """
 
+import hashlib
 import os
-import pandas as pd
 import numpy as np
 from groq import Groq
-import chromadb
 from chromadb.utils import embedding_functions
-from chromadb.errors import InvalidCollectionException
-import shutil
 import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from tqdm import tqdm
 from config.settings import Settings
+from services.ingest_manifest import IngestManifest
+from services.llm_provider import get_llm_provider
+from services.embedding_cache import get_query_embedding_cache
+from services.vector_index import RetrievalBackend, ChromaBackend, NumpyVectorIndex, matches_where
+from services.incident_reader import iter_cached_incident_rows, read_ahead_batches
+from services.embedding_workers import EmbeddingPool
+from services.lexical_index import BM25Index, reciprocal_rank_fusion
+from services.near_duplicates import NearDuplicateIndex
+from services.incident_metadata import incident_metadata, build_where
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 logging.getLogger('chromadb.telemetry.product.posthog').setLevel(logging.WARNING)
 
+CHROMA_DB_PATH = "./chroma_db"
+COLLECTION_NAME = "incident_embeddings"
+NUMPY_INDEX_PATH = "./vector_index"
+
+# Cosine similarities mapped to 0 and 100 by the embedding-only similarity
+# score; all-MiniLM puts unrelated incidents around 0.2 and near-duplicates
+# above 0.8
+SIMILARITY_COSINE_FLOOR = 0.2
+SIMILARITY_COSINE_CEILING = 0.8
+
+# Hybrid retrieval fuses this many times n_results candidates from each of
+# the vector and lexical rankings
+HYBRID_CANDIDATE_MULTIPLIER = 4
+
+GROQ_MODEL = "llama-3.1-8b-instant"
+# Model behind chromadb's DefaultEmbeddingFunction, used to key cached query embeddings
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+# Bump when the structure of analysis results changes, so stored results are recomputed
+ANALYSIS_RESULT_VERSION = 1
+
+# Fields of the root cause analysis, in the order the prompt asks for them
+ROOT_CAUSE_KEYS = ('CATEGORY', 'ROOT_CAUSE', 'IMPACT', 'COMPONENT', 'SOLUTION', 'PREVENTION')
+ROOT_CAUSE_FAILED = {
+    'CATEGORY': 'Error',
+    'ROOT_CAUSE': 'Analysis failed',
+    'IMPACT': 'Unknown',
+    'COMPONENT': 'Unknown',
+    'SOLUTION': 'Analysis failed',
+    'PREVENTION': 'Analysis failed'
+}
+
 class EnhancedIncidentAnalysisSystem:
     """
     A system for analyzing IT incidents and finding similar historical cases.
+
+    Instances are safe to share between threads: queries and LLM calls run
+    concurrently, while writes to the vector store are serialised. Streamlit
+    pages should obtain the process-wide instance from
+    services.engine_registry rather than constructing one per rerun.
+
+    Attributes:
+        groq_client: Client for accessing Groq LLM API
+        embedding_function: Embedding model shared by ingest and queries
+        backend (RetrievalBackend): Vector store holding historical incidents
+        lexical_index (BM25Index): Inverted index over every ingested incident
+        near_duplicates (NearDuplicateIndex or None): Near-duplicate clusters; only
+            their representatives are stored in the backend
+        manifest (IngestManifest): Record of what has been ingested into the backend
+        categories (list): Valid incident categories
     """
     
-    def __init__(self, groq_api_key=None, historical_incidents_file=None):
+    def __init__(self, groq_api_key=None, historical_incidents_file=None, retrieval_backend="chroma",
+                 quantization="none", rescore_factor=4, near_duplicate_threshold=None,
+                 analysis_workers=None):
         """
         Initialize the incident analysis system.
         
         Args:
             groq_api_key (str, optional): API key for Groq LLM service
             historical_incidents_file (str, optional): Path to Excel file containing historical incidents
+            retrieval_backend (str or RetrievalBackend): "chroma", "numpy" or a backend instance
+            quantization (str): Scan storage of the "numpy" backend, "none", "float16" or "int8"
+            rescore_factor (int): Quantized shortlist size per result, rescored in float32
+            near_duplicate_threshold (float, optional): Jaccard similarity at which
+                historical incidents are clustered, 0 to disable; defaults to
+                Settings.NEAR_DUPLICATE_THRESHOLD
+            analysis_workers (int, optional): Threads running the LLM calls of
+                analyze_incident; defaults to Settings.ANALYSIS_WORKERS
         """
         if groq_api_key is None:
             groq_api_key = Settings().GROQ_API_KEY
+        if near_duplicate_threshold is None:
+            near_duplicate_threshold = Settings().NEAR_DUPLICATE_THRESHOLD
+        if analysis_workers is None:
+            analysis_workers = Settings().ANALYSIS_WORKERS
         self.groq_client = Groq(api_key=groq_api_key)
-        self.chroma_client = chromadb.PersistentClient(path="./chroma_db")
-        self.embedding_function = embedding_functions.DefaultEmbeddingFunction()
+        self.embedding_function = get_llm_provider().embedding_function(
+            embedding_functions.DefaultEmbeddingFunction()
+        )
         self.categories = ["Software", "Hardware", "Network", "Security"]
-        
-        # Initialize collection
-        try:
-            self.collection = self.chroma_client.get_collection(name="incident_embeddings")
-            logger.info("Loaded existing incident collection from ChromaDB")
-        except InvalidCollectionException:
-            self.collection = self.chroma_client.create_collection(
-                name="incident_embeddings",
-                embedding_function=self.embedding_function
-            )
-            logger.info("Created new incident collection in ChromaDB")
+        self._lock = threading.RLock()
+        self._executor = ThreadPoolExecutor(max_workers=analysis_workers, thread_name_prefix="incident-analysis")
+
+        # Initialize vector store
+        if isinstance(retrieval_backend, RetrievalBackend):
+            self.backend = retrieval_backend
+        elif retrieval_backend == "numpy":
+            self.backend = NumpyVectorIndex(NUMPY_INDEX_PATH, self.embedding_function,
+                                            quantization=quantization, rescore_factor=rescore_factor)
+        elif retrieval_backend == "chroma":
+            if quantization != "none":
+                logger.warning("Vector quantization applies only to the numpy backend; ignoring it")
+            self.backend = ChromaBackend(CHROMA_DB_PATH, COLLECTION_NAME, self.embedding_function)
+        else:
+            raise ValueError(f"Unknown retrieval backend: {retrieval_backend}")
+        self.manifest = IngestManifest(self.backend.manifest_path)
+        self.lexical_index = BM25Index(
+            os.path.join(os.path.dirname(self.backend.manifest_path), "bm25_index.json")
+        )
+        self.near_duplicates = NearDuplicateIndex(
+            os.path.join(os.path.dirname(self.backend.manifest_path), "near_duplicates.json"),
+            threshold=near_duplicate_threshold
+        ) if near_duplicate_threshold > 0 else None
         
         if historical_incidents_file:
             self.load_historical_incidents(historical_incidents_file)
 
+    def warm_up(self):
+        """
+        Load the embedding model by running a throwaway embedding.
+
+        The default embedding function loads its ONNX session lazily on first
+        use; doing it here keeps that cost off the first user request.
+        """
+        with self._lock:
+            self.embedding_function(["warm up"])
+        logger.info("Embedding model warmed up")
+
+    def close(self):
+        """
+        Release the worker pool, the Groq HTTP client and the vector store.
+
+        The instance must not be used after it has been closed.
+        """
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            try:
+                self.groq_client.close()
+            except Exception as e:
+                logger.warning(f"Error closing Groq client: {str(e)}")
+            try:
+                self.backend.close()
+            except Exception as e:
+                logger.warning(f"Error closing retrieval backend: {str(e)}")
+        logger.info("Incident analysis system closed")
+
     def reset_database(self):
         """
-        Delete all data from ChromaDB and reinitialize the collection.
+        Delete all incidents from the vector store and reinitialize it.
         """
-        try:
-            # Delete the collection if it exists
+        with self._lock:
             try:
-                self.chroma_client.delete_collection("incident_embeddings")
-                logger.info("Deleted existing collection")
-            except:
-                pass
-
-            # Recreate the collection
-            self.collection = self.chroma_client.create_collection(
-                name="incident_embeddings",
-                embedding_function=self.embedding_function
-            )
-            logger.info("Reinitialized ChromaDB collection")
-            
-            return True
-        except Exception as e:
-            logger.error(f"Error resetting database: {str(e)}")
-            return False
+                self.backend.reset()
+                self.lexical_index.clear()
+                if self.near_duplicates is not None:
+                    self.near_duplicates.clear()
+                self.manifest.clear()
+                return True
+            except Exception as e:
+                logger.error(f"Error resetting database: {str(e)}")
+                return False
 
     def delete_all_data(self):
         """
-        Delete all ChromaDB data by removing the database directory.
+        Delete all vector store data by removing its directory.
         """
-        try:
-            # Close the client connection
-            self.chroma_client.reset()
-            
-            # Remove the ChromaDB directory
-            db_path = "./chroma_db"
-            if os.path.exists(db_path):
-                shutil.rmtree(db_path)
-                logger.info("Successfully deleted ChromaDB directory")
-            
-            # Reinitialize the client and collection
-            self.chroma_client = chromadb.PersistentClient(path="./chroma_db")
-            self.collection = self.chroma_client.create_collection(
-                name="incident_embeddings",
-                embedding_function=self.embedding_function
+        with self._lock:
+            try:
+                self.backend.destroy()
+                self.lexical_index.clear()
+                if self.near_duplicates is not None:
+                    self.near_duplicates.clear()
+                self.manifest.clear()
+                return True
+            except Exception as e:
+                logger.error(f"Error deleting data: {str(e)}")
+                return False
+
+    def analysis_version(self):
+        """
+        Fingerprint of the models and prompts behind an analysis result.
+
+        Stored analyses (services.analysis_store) are reused only while this
+        value is unchanged. The provider mode is included so synthetic or
+        replayed results are never served in live mode.
+
+        Returns:
+            str: Short hex digest
+        """
+        digest = hashlib.sha256()
+        for part in (ANALYSIS_RESULT_VERSION, GROQ_MODEL, EMBEDDING_MODEL, get_llm_provider().mode,
+                     self._root_cause_prompt(''), self._similarity_prompt('', [])):
+            digest.update(str(part).encode('utf-8'))
+            digest.update(b'\x1f')
+        return digest.hexdigest()[:16]
+
+    def corpus_fingerprint(self):
+        """Return the SHA-256 of the last ingested historical file, or None before any ingest."""
+        return self.manifest.source.get('sha256')
+
+    def load_historical_incidents(self, file_path, incremental=True, batch_size=None, embed_workers=None):
+        """
+        Stream historical incidents from an Excel or CSV export into the vector store.
+
+        Rows are read one at a time and embedded/written in batches of
+        batch_size, with the reader kept at most a couple of batches ahead,
+        so peak memory does not grow with the size of the file.
+
+        With embed_workers > 0, batches are embedded in that many worker
+        processes (see services.embedding_workers) while this thread stays
+        the single writer, upserting the precomputed embeddings as they
+        complete; at most two batches per worker are in flight.
+
+        In incremental mode the ingest manifest is consulted first: an unchanged
+        file (same mtime and hash) is not parsed at all, and otherwise only new
+        or modified rows are upserted and rows missing from the file are deleted.
+        An .xlsx file is parsed once per content hash: the rows are cached in
+        columnar form under Settings.SPREADSHEET_CACHE_DIR, so full rebuilds
+        (a reset, another backend, a store out of sync with the manifest) read
+        the cache instead (see services.incident_reader).
+
+        Every incident is stored with a category, impacted service and date
+        (see services.incident_metadata) so retrieval can be prefiltered.
+
+        Unless near-duplicate clustering is disabled, each new or changed row
+        is first matched against the existing clusters (see
+        services.near_duplicates): a near-duplicate only joins its cluster's
+        member list and the lexical index, and is never embedded. Members of
+        a representative that changed or disappeared are clustered again at
+        the end of the run.
+
+        Args:
+            file_path (str): Path to .xlsx or .csv file containing historical incidents
+            incremental (bool): Diff against the ingest manifest instead of
+                rewriting every row
+            batch_size (int, optional): Rows embedded and written per batch,
+                defaults to Settings.INGEST_BATCH_SIZE
+            embed_workers (int, optional): Embedding processes, 0 to embed in
+                this process; defaults to Settings.INGEST_EMBED_WORKERS
+        """
+        settings = Settings()
+        batch_size = batch_size or settings.INGEST_BATCH_SIZE
+        embed_workers = settings.INGEST_EMBED_WORKERS if embed_workers is None else embed_workers
+        with self._lock:
+            self._load_historical_incidents(file_path, incremental, batch_size, embed_workers,
+                                            settings.SPREADSHEET_CACHE_DIR)
+
+    def _write_batch(self, ids, documents, metadatas, embeddings=None):
+        """Upsert one batch into the vector store and the lexical index."""
+        self.backend.upsert(ids=ids, documents=documents, metadatas=metadatas, embeddings=embeddings)
+        for incident_id, description, metadata in zip(ids, documents, metadatas):
+            self.lexical_index.add(
+                incident_id, f"{incident_id} {description} {metadata['actions_taken']}"
             )
-            logger.info("Reinitialized ChromaDB")
-            
-            return True
-        except Exception as e:
-            logger.error(f"Error deleting data: {str(e)}")
-            return False
 
-    def load_historical_incidents(self, file_path):
+    def _manifest_in_sync(self):
+        """True when the backend, lexical index and clusters all match the manifest."""
+        rows = len(self.manifest.rows)
+        if self.near_duplicates is None:
+            return self.backend.count() == rows == self.lexical_index.count()
+        return (self.backend.count() == self.near_duplicates.representative_count()
+                and rows == self.lexical_index.count() == self.near_duplicates.count())
+
+    @staticmethod
+    def _incident_record(row, incident_id):
         """
-        Load historical incidents from Excel file into ChromaDB.
+        Build the stored form of one historical incident row.
+
+        Returns:
+            tuple: (description, metadata, row hash for the ingest manifest);
+                the description is stored once, as the document
+        """
+        description = str(row.get('Description', ''))
+        actions_taken = str(row.get('Actions Taken', ''))
+        participants = str(row.get('Participants', ''))
+        filterable = incident_metadata(row, incident_id, description, actions_taken)
+        row_hash = IngestManifest.row_hash(description, actions_taken, participants, *filterable.values())
+        metadata = {
+            'incident_id': incident_id,
+            'actions_taken': actions_taken,
+            'participants': participants,
+            **filterable
+        }
+        return description, metadata, row_hash
+
+    def _cluster(self, incident_id, document, metadata, orphans, demoted):
         """
+        Place a new or changed row in the near-duplicate clusters.
+
+        Returns:
+            bool: True when the row joined an existing cluster and must not be
+                embedded; it is indexed lexically and queued in demoted so a
+                stale vector from when it was a representative is deleted
+        """
+        orphans.update(self.near_duplicates.remove(incident_id))
+        orphans.discard(incident_id)
+        if self.near_duplicates.add(incident_id, document, metadata) is None:
+            return False
+        self.lexical_index.add(incident_id, f"{incident_id} {document} {metadata['actions_taken']}")
+        demoted.append(incident_id)
+        return True
+
+    def _load_historical_incidents(self, file_path, incremental, batch_size, embed_workers, cache_dir):
         try:
-            df = pd.read_excel(file_path)
-            logger.info(f"Loading {len(df)} historical incidents into ChromaDB")
-            
-            # Prepare data for ChromaDB
-            documents = df['Description'].tolist()
-            ids = [str(id) for id in df['Incidents'].tolist()]
-            
-            # Create metadata with explicit field mapping
-            metadata = []
-            for _, row in df.iterrows():
-                metadata.append({
-                    'incident_id': str(row['Incidents']),
-                    'description': str(row['Description']),
-                    'actions_taken': str(row['Actions Taken']),
-                    'participants': str(row['Participants'])
-                })
-            
-            # Add to ChromaDB in batches
-            batch_size = 100
-            for i in tqdm(range(0, len(documents), batch_size)):
-                batch_docs = documents[i:i + batch_size]
-                batch_ids = ids[i:i + batch_size]
-                batch_metadata = metadata[i:i + batch_size]
-                
-                self.collection.add(
-                    documents=batch_docs,
-                    ids=batch_ids,
-                    metadatas=batch_metadata
-                )
-            logger.info(f"Successfully loaded {len(documents)} incidents into ChromaDB")
+            unchanged, fingerprint = self.manifest.check_source(file_path)
+            # A store that no longer matches the manifest (e.g. recreated
+            # by another process) cannot be trusted for a diff
+            manifest_in_sync = self._manifest_in_sync()
+            if incremental and unchanged and manifest_in_sync:
+                logger.info("Historical incidents unchanged since last load, skipping ingest")
+                return
+
+            logger.info(f"Streaming historical incidents from {file_path} into the vector store")
+            previous_rows = self.manifest.rows if incremental and manifest_in_sync else {}
+            if not previous_rows:
+                # A full rebuild starts from empty stores, so incidents that
+                # are no longer in the file cannot linger in any of them
+                self.backend.reset()
+                self.lexical_index.clear()
+                if self.near_duplicates is not None:
+                    self.near_duplicates.clear()
+            row_hashes = {}
+            upserted = 0
+            duplicates = 0
+            # IDs of members of dissolved clusters, to be clustered again, and
+            # former representatives that became members, to be deleted from the backend
+            orphans = set()
+            demoted = []
+            start = time.perf_counter()
+            progress = tqdm(unit=" rows", desc="Ingesting incidents")
+            pool = EmbeddingPool(embed_workers) if embed_workers > 0 else None
+            # (embedding future, ids, documents, metadatas, rows read) per batch in flight
+            in_flight = deque()
+
+            def write_oldest():
+                future, ids, documents, metadatas, rows_read = in_flight.popleft()
+                if ids:
+                    self._write_batch(ids, documents, metadatas,
+                                      embeddings=future.result() if future else None)
+                progress.update(rows_read)
+                return len(ids)
+
+            try:
+                for batch in read_ahead_batches(
+                        iter_cached_incident_rows(file_path, cache_dir, fingerprint['sha256']), batch_size):
+                    ids, documents, metadatas = [], [], []
+                    for row in batch:
+                        if row.get('Incidents') in (None, ''):
+                            continue
+                        incident_id = str(row['Incidents'])
+                        if incident_id in row_hashes:
+                            duplicates += 1
+                            continue
+                        description, metadata, row_hash = self._incident_record(row, incident_id)
+                        row_hashes[incident_id] = row_hash
+                        if previous_rows.get(incident_id) == row_hash:
+                            continue
+
+                        if self.near_duplicates is not None and self._cluster(
+                                incident_id, description, metadata, orphans, demoted):
+                            continue
+                        ids.append(incident_id)
+                        documents.append(description)
+                        metadatas.append(metadata)
+
+                    in_flight.append((pool.submit(documents) if pool and ids else None,
+                                      ids, documents, metadatas, len(batch)))
+                    while in_flight and (not pool or len(in_flight) > 2 * embed_workers):
+                        upserted += write_oldest()
+                while in_flight:
+                    upserted += write_oldest()
+            finally:
+                if pool:
+                    pool.close()
+                progress.close()
+
+            removed_ids = [incident_id for incident_id in previous_rows if incident_id not in row_hashes]
+            if self.near_duplicates is not None:
+                for incident_id in removed_ids:
+                    orphans.update(self.near_duplicates.remove(incident_id))
+                orphans.difference_update(removed_ids)
+                ids, documents, metadatas = [], [], []
+                # Remaining orphans are unchanged rows of the file; only their IDs
+                # are kept in the clusters, so read them back from the source
+                for row in (iter_cached_incident_rows(file_path, cache_dir, fingerprint['sha256'])
+                            if orphans else ()):
+                    incident_id = str(row.get('Incidents', ''))
+                    if incident_id not in orphans:
+                        continue
+                    orphans.discard(incident_id)
+                    description, metadata, _ = self._incident_record(row, incident_id)
+                    # Orphans were members, so they have no vector to delete
+                    if not self._cluster(incident_id, description, metadata, set(), []):
+                        ids.append(incident_id)
+                        documents.append(description)
+                        metadatas.append(metadata)
+                    if not orphans:
+                        break
+                for i in range(0, len(ids), batch_size):
+                    self._write_batch(ids[i:i + batch_size], documents[i:i + batch_size],
+                                      metadatas[i:i + batch_size])
+                upserted += len(ids)
+            if demoted:
+                # Most new members were never stored; only delete former representatives
+                demoted = self.backend.get(demoted, include=[])['ids']
+            stale_ids = removed_ids + demoted
+            for i in range(0, len(stale_ids), batch_size):
+                self.backend.delete(ids=stale_ids[i:i + batch_size])
+            self.lexical_index.remove(removed_ids)
+            self.backend.persist()
+            self.lexical_index.persist()
+            if self.near_duplicates is not None:
+                self.near_duplicates.persist()
+
+            self.manifest.source = fingerprint
+            self.manifest.rows = row_hashes
+            self.manifest.save()
+            if duplicates:
+                logger.warning(f"Skipped {duplicates} rows with duplicate incident IDs")
+            if not self._manifest_in_sync():
+                logger.warning("Vector store is out of sync with the ingest manifest after loading; "
+                               "the next load will rebuild it")
+            elapsed = time.perf_counter() - start
+            logger.info(
+                f"Upserted {upserted} and deleted {len(stale_ids)} incidents "
+                f"({self.backend.count()} of {len(row_hashes)} in the vector store) in {elapsed:.1f}s, "
+                f"{len(row_hashes) / elapsed if elapsed else 0:.0f} rows/s"
+            )
                 
         except Exception as e:
             logger.error(f"Error loading historical incidents: {str(e)}")
@@ -632,81 +941,590 @@ class EnhancedIncidentAnalysisSystem:
             print("Invalid choice. Using single-line input.")
             return input("\nPlease describe the incident: ").strip()
 
-    def analyze_incident(self, incident_description, similarity_threshold=50, max_similar=2):
+    def analyze_incident(self, incident_description, similarity_threshold=50, max_similar=2,
+                         concurrent=True, fast=False, hybrid=True, where=None, same_category=False,
+                         timings=None):
         """
         Analyze an incident and find similar historical cases.
+
+        The root cause analysis does not depend on retrieval, so by default it
+        runs on the engine's thread pool while the vector query and the
+        similarity analysis run on the calling thread, overlapping the two
+        Groq round-trips. The result structure is the same in both modes.
+
+        In fast mode the similarity LLM call is skipped and each case's
+        similarity_score is derived from its embedding distance (see
+        embedding_similarity_scores); explain_similarity can run the LLM
+        comparison later for individual cases.
+
+        With same_category=True retrieval waits for the root cause analysis and
+        only searches historical incidents of the category it assigned, falling
+        back to the whole corpus when that category has no matches.
+
+        Args:
+            incident_description (str): Free-text description of the incident
+            similarity_threshold (int): Minimum similarity score (0-100) to keep a case
+            max_similar (int): Maximum number of similar incidents returned
+            concurrent (bool): Overlap the root cause call with retrieval and similarity
+            fast (bool): Score similarity from embedding distances instead of the LLM
+            hybrid (bool): Fuse lexical (BM25) and vector retrieval, see _retrieve
+            where (dict, optional): Metadata prefilter, e.g. from
+                services.incident_metadata.build_where
+            same_category (bool): Restrict retrieval to the root cause category
+            timings (dict, optional): Filled with per-stage wall-clock seconds for
+                'root_cause', 'retrieval', 'similarity' and 'total'
+
+        Returns:
+            dict: 'current_incident' (description and root cause analysis) and
+                'similar_incidents' (list of matching historical cases)
         """
+        timings = {} if timings is None else timings
+        start = time.perf_counter()
         try:
             # Get root cause analysis
-            root_analysis = self.analyze_root_cause(incident_description)
+            if concurrent:
+                root_future = self._executor.submit(
+                    self._timed, timings, 'root_cause', self.analyze_root_cause, incident_description
+                )
+            else:
+                root_analysis = self._timed(timings, 'root_cause', self.analyze_root_cause, incident_description)
             
-            # Find similar incidents using ChromaDB
-            similar_incidents = self.collection.query(
-                query_texts=[incident_description],
-                n_results=5,  # Query more than needed to filter by similarity score
-                include=['metadatas', 'documents', 'distances']
+            retrieval_where = where
+            if same_category:
+                if concurrent:
+                    root_analysis = root_future.result()
+                category = self._category(root_analysis)
+                if category:
+                    retrieval_where = build_where(category=category, where=where)
+
+            # Find similar incidents, more than needed to filter by similarity score
+            similar_incidents = self._timed(
+                timings, 'retrieval', self._retrieve, [incident_description], hybrid=hybrid,
+                where=retrieval_where
             )
+            if not similar_incidents['ids'][0] and retrieval_where is not where:
+                similar_incidents = self._timed(
+                    timings, 'retrieval', self._retrieve, [incident_description], hybrid=hybrid, where=where
+                )
             
             # Get detailed similarity analysis
+            historical_cases = []
+            similarity_analysis = []
             if similar_incidents and len(similar_incidents['documents'][0]) > 0:
                 historical_cases = similar_incidents['documents'][0]
-                similarity_analysis = self.analyze_similarity(incident_description, historical_cases)
-                
-                # Prepare results structure
-                result = {
-                    'current_incident': {
-                        'description': incident_description,
-                        'analysis': root_analysis
-                    },
-                    'similar_incidents': []
-                }
-                
-                # Process similar incidents
-                for i, (incident, metadata) in enumerate(zip(historical_cases, similar_incidents['metadatas'][0])):
-                    if i >= len(similarity_analysis):
-                        continue
-                    
-                    similarity_score = similarity_analysis[i]['score']
-                    if similarity_score >= similarity_threshold:
-                        incident_data = {
-                            'incident_id': metadata.get('incident_id', ''),
-                            'description': metadata.get('description', '').strip(),
-                            'actions_taken': metadata.get('actions_taken', '').strip(),
-                            'participants': metadata.get('participants', '').strip(),
-                            'similarity_score': similarity_score
-                        }
-                        
-                        # Only add if we have valid data
-                        if any(incident_data.values()):
-                            result['similar_incidents'].append(incident_data)
-                
-                # Sort by similarity score and limit to max_similar
-                result['similar_incidents'] = sorted(
-                    result['similar_incidents'],
-                    key=lambda x: x['similarity_score'],
-                    reverse=True
-                )[:max_similar]
-                
-                return result
-            else:
-                return {
-                    'current_incident': {
-                        'description': incident_description,
-                        'analysis': root_analysis
-                    },
-                    'similar_incidents': []
-                }
+                if fast:
+                    similarity_analysis = self.embedding_similarity_scores(similar_incidents['distances'][0])
+                else:
+                    similarity_analysis = self._timed(
+                        timings, 'similarity', self.analyze_similarity, incident_description, historical_cases
+                    )
+
+            if concurrent:
+                root_analysis = root_future.result()
+
+            return self._build_result(
+                incident_description,
+                root_analysis,
+                historical_cases,
+                similar_incidents['metadatas'][0] if historical_cases else [],
+                similarity_analysis,
+                similarity_threshold,
+                max_similar,
+                similar_incidents['matched_identifiers'][0] if historical_cases else [],
+                similar_incidents['near_duplicates'][0] if historical_cases else []
+            )
                 
         except Exception as e:
             logger.error(f"Error analyzing incident: {str(e)}")
             raise
+        finally:
+            timings['total'] = round(time.perf_counter() - start, 3)
+            logger.info(f"Incident analysis timings (s): {timings}")
+
+    def analyze_incidents(self, incident_descriptions, similarity_threshold=50, max_similar=2,
+                          max_concurrency=4, fast=False, hybrid=True, where=None, timings=None):
+        """
+        Analyze many incidents at once, e.g. for backfills and bulk triage.
+
+        All descriptions are embedded in one batch and retrieved with a single
+        multi-query vector search. The root cause and similarity LLM calls for
+        every incident are then fanned out over a thread pool that never has
+        more than max_concurrency calls in flight.
+
+        Args:
+            incident_descriptions (list): Free-text incident descriptions
+            similarity_threshold (int): Minimum similarity score (0-100) to keep a case
+            max_similar (int): Maximum number of similar incidents per result
+            max_concurrency (int): Maximum number of concurrent LLM calls
+            fast (bool): Score similarity from embedding distances instead of the LLM
+            hybrid (bool): Fuse lexical (BM25) and vector retrieval, see _retrieve
+            where (dict, optional): Metadata prefilter applied to every query
+            timings (dict, optional): Filled with wall-clock seconds for
+                'embedding', 'retrieval', 'llm' and 'total'
+
+        Returns:
+            list: One result per description, in input order, shaped like
+                analyze_incident's. An item whose root cause or similarity
+                LLM call failed, or whose result could not be built, instead
+                has an 'error' key with the failure message, an empty
+                'analysis' and an empty 'similar_incidents' list; retry
+                exactly those items.
+        """
+        timings = {} if timings is None else timings
+        start = time.perf_counter()
+        descriptions = list(incident_descriptions)
+        if not descriptions:
+            return []
+
+        try:
+            embeddings = self._timed(timings, 'embedding', self._embed_queries, descriptions)
+            similar_incidents = self._timed(
+                timings, 'retrieval', self._retrieve,
+                descriptions, hybrid=hybrid, query_embeddings=embeddings, where=where
+            )
+
+            llm_start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=max_concurrency,
+                                    thread_name_prefix="incident-batch") as executor:
+                root_futures = [executor.submit(self.analyze_root_cause, description)
+                                for description in descriptions]
+                if not fast:
+                    similarity_futures = [
+                        executor.submit(self._similarity_analysis, description, cases) if cases else None
+                        for description, cases in zip(descriptions, similar_incidents['documents'])
+                    ]
+
+                results = []
+                for i, description in enumerate(descriptions):
+                    try:
+                        if fast:
+                            similarity_analysis = self.embedding_similarity_scores(similar_incidents['distances'][i])
+                        else:
+                            similarity_future = similarity_futures[i]
+                            similarity_analysis = similarity_future.result() if similarity_future else []
+                        root_analysis = root_futures[i].result()
+                        if root_analysis == ROOT_CAUSE_FAILED:
+                            raise RuntimeError("Root cause analysis failed")
+                        results.append(self._build_result(
+                            description,
+                            root_analysis,
+                            similar_incidents['documents'][i],
+                            similar_incidents['metadatas'][i],
+                            similarity_analysis,
+                            similarity_threshold,
+                            max_similar,
+                            similar_incidents['matched_identifiers'][i],
+                            similar_incidents['near_duplicates'][i]
+                        ))
+                    except Exception as e:
+                        logger.error(f"Error analyzing incident {i}: {str(e)}")
+                        results.append({
+                            'current_incident': {'description': description, 'analysis': {}},
+                            'similar_incidents': [],
+                            'error': str(e)
+                        })
+            timings['llm'] = round(time.perf_counter() - llm_start, 3)
+            return results
+
+        except Exception as e:
+            logger.error(f"Error analyzing incident batch: {str(e)}")
+            raise
+        finally:
+            timings['total'] = round(time.perf_counter() - start, 3)
+            logger.info(f"Batch analysis of {len(descriptions)} incidents timings (s): {timings}")
+
+    def find_similar_incidents(self, incident_description, similarity_threshold=50, max_similar=2,
+                               hybrid=True, where=None):
+        """
+        Retrieve similar historical incidents scored by embedding distance only.
+
+        No LLM call is made, so this returns in the time of one vector query
+        and is suitable for rendering the similar-incident list immediately.
+
+        Args:
+            incident_description (str): Free-text description of the incident
+            similarity_threshold (int): Minimum similarity score (0-100) to keep a case
+            max_similar (int): Maximum number of similar incidents returned
+            hybrid (bool): Fuse lexical (BM25) and vector retrieval, see _retrieve
+            where (dict, optional): Metadata prefilter, e.g. from
+                services.incident_metadata.build_where
+
+        Returns:
+            list: Similar incidents shaped like analyze_incident's 'similar_incidents'
+        """
+        similar_incidents = self._retrieve([incident_description], hybrid=hybrid, where=where)
+        return self._build_result(
+            incident_description,
+            {},
+            similar_incidents['documents'][0],
+            similar_incidents['metadatas'][0],
+            self.embedding_similarity_scores(similar_incidents['distances'][0]),
+            similarity_threshold,
+            max_similar,
+            similar_incidents['matched_identifiers'][0],
+            similar_incidents['near_duplicates'][0]
+        )['similar_incidents']
+
+    def _retrieve(self, incident_descriptions, n_results=5, hybrid=True, query_embeddings=None, where=None):
+        """
+        Retrieve candidate historical incidents for one or more descriptions.
+
+        With hybrid=True the vector ranking is fused with a BM25 ranking by
+        reciprocal rank fusion, so exact matches on ticket numbers, hostnames,
+        error codes and transaction codes are not lost to embedding search.
+        Distances for cases found only lexically are computed from their
+        stored embeddings, keeping every candidate scoreable.
+
+        A where filter is pushed down into the vector search; lexical hits
+        are checked against the same filter before fusion.
+
+        Lexical hits on near-duplicate cluster members count for their
+        representative, and near-identical cases left in the result are
+        folded into the best-ranked one (see _fold_near_duplicates).
+
+        Args:
+            incident_descriptions (list): Query descriptions
+            n_results (int): Candidates returned per description
+            hybrid (bool): Fuse lexical and vector rankings
+            query_embeddings (list, optional): Precomputed embeddings of the descriptions
+            where (dict, optional): Metadata prefilter (ChromaDB where syntax)
+
+        Returns:
+            dict: Chroma-shaped nested lists of 'ids', 'documents', 'metadatas',
+                'distances', 'matched_identifiers' and 'near_duplicates', one inner
+                list per description
+        """
+        if query_embeddings is None:
+            query_embeddings = self._embed_queries(incident_descriptions)
+        n_candidates = n_results * HYBRID_CANDIDATE_MULTIPLIER if hybrid else n_results
+        vector_results = self.backend.query(
+            query_embeddings=query_embeddings,
+            n_results=n_candidates,
+            include=['metadatas', 'documents', 'distances'],
+            where=where
+        )
+        if not hybrid:
+            vector_results['matched_identifiers'] = [[[] for _ in ids] for ids in vector_results['ids']]
+            return self._fold_near_duplicates(incident_descriptions, vector_results, hybrid)
+
+        results = {key: [] for key in ('ids', 'documents', 'metadatas', 'distances', 'matched_identifiers')}
+        for i, description in enumerate(incident_descriptions):
+            cases = {
+                incident_id: (document, metadata, distance)
+                for incident_id, document, metadata, distance in zip(
+                    vector_results['ids'][i], vector_results['documents'][i],
+                    vector_results['metadatas'][i], vector_results['distances'][i]
+                )
+            }
+            lexical_ids = [doc_id for doc_id, _ in self.lexical_index.search(description, n_candidates)]
+            if self.near_duplicates is not None:
+                lexical_ids = list(dict.fromkeys(self.near_duplicates.representative(doc_id)
+                                                 for doc_id in lexical_ids))
+            if where:
+                unknown_ids = [doc_id for doc_id in lexical_ids if doc_id not in cases]
+                stored = self.backend.get(unknown_ids, include=['metadatas']) if unknown_ids else {'ids': []}
+                allowed = set(cases) | {
+                    incident_id for incident_id, metadata in zip(stored['ids'], stored.get('metadatas') or [])
+                    if matches_where(metadata, where)
+                }
+                lexical_ids = [doc_id for doc_id in lexical_ids if doc_id in allowed]
+            fused_ids = [doc_id for doc_id, _ in reciprocal_rank_fusion([vector_results['ids'][i], lexical_ids])]
+            fused_ids = fused_ids[:n_results]
+
+            missing_ids = [doc_id for doc_id in fused_ids if doc_id not in cases]
+            if missing_ids:
+                stored = self.backend.get(missing_ids, include=['documents', 'metadatas', 'embeddings'])
+                query = np.asarray(query_embeddings[i], dtype=np.float32)
+                query = query / (np.linalg.norm(query) or 1.0)
+                for incident_id, document, metadata, embedding in zip(
+                        stored['ids'], stored['documents'], stored['metadatas'], stored['embeddings']):
+                    embedding = np.asarray(embedding, dtype=np.float32)
+                    embedding = embedding / (np.linalg.norm(embedding) or 1.0)
+                    cases[incident_id] = (document, metadata, float(np.sum((query - embedding) ** 2)))
+                fused_ids = [doc_id for doc_id in fused_ids if doc_id in cases]
+
+            matched = self.lexical_index.matching_identifiers(description, fused_ids)
+            results['ids'].append(fused_ids)
+            results['documents'].append([cases[doc_id][0] for doc_id in fused_ids])
+            results['metadatas'].append([cases[doc_id][1] for doc_id in fused_ids])
+            results['distances'].append([cases[doc_id][2] for doc_id in fused_ids])
+            results['matched_identifiers'].append([matched[doc_id] for doc_id in fused_ids])
+        return self._fold_near_duplicates(incident_descriptions, results, hybrid)
+
+    def _fold_near_duplicates(self, incident_descriptions, results, hybrid):
+        """
+        Collapse near-identical retrieved cases and list every case's near-duplicates.
+
+        Adds 'near_duplicates' to results: per case, the members of its cluster
+        followed by any cases folded into it with their own members. In hybrid
+        mode, identifiers a near-duplicate shares with the query are credited to
+        the kept case.
+        """
+        results['near_duplicates'] = []
+        for i, description in enumerate(incident_descriptions):
+            if self.near_duplicates is None:
+                results['near_duplicates'].append([[] for _ in results['ids'][i]])
+                continue
+            ids = results['ids'][i]
+            kept = self.near_duplicates.collapse(ids, results['documents'][i], results['metadatas'][i])
+            near_duplicates = []
+            for index, folded in kept:
+                group = self.near_duplicates.members(ids[index])
+                for incident_id in folded:
+                    group += [incident_id] + self.near_duplicates.members(incident_id)
+                if group and hybrid:
+                    shared = self.lexical_index.matching_identifiers(description, group)
+                    results['matched_identifiers'][i][index] = sorted(
+                        set(results['matched_identifiers'][i][index]).union(*shared.values())
+                    )
+                near_duplicates.append(group)
+            for key in ('ids', 'documents', 'metadatas', 'distances', 'matched_identifiers'):
+                results[key][i] = [results[key][i][index] for index, _ in kept]
+            results['near_duplicates'].append(near_duplicates)
+        return results
+
+    def _embed_queries(self, incident_descriptions):
+        """
+        Embed query descriptions through the shared query embedding cache.
+
+        Page reruns repeat the same description, so a hit skips the ONNX
+        forward pass entirely. Historical incidents are embedded at ingest and
+        never go through this cache.
+        """
+        return get_query_embedding_cache().embed(
+            f"{EMBEDDING_MODEL}/{get_llm_provider().mode}",
+            list(incident_descriptions),
+            self.embedding_function
+        )
+
+    def _category(self, root_analysis):
+        """Return the category named in a root cause analysis, or None."""
+        value = str(root_analysis.get('CATEGORY', '')).lower()
+        return next((category for category in self.categories if category.lower() in value), None)
+
+    def explain_similarity(self, incident_description, similar_incident):
+        """
+        Run the LLM comparison for a single similar incident on demand.
+
+        Args:
+            incident_description (str): Free-text description of the current incident
+            similar_incident (dict): One entry of 'similar_incidents'
+
+        Returns:
+            dict or None: 'score', 'patterns' and 'solution' from analyze_similarity
+        """
+        analysis = self.analyze_similarity(incident_description, [similar_incident['description']])
+        return analysis[0] if analysis else None
+
+    @staticmethod
+    def embedding_similarity_scores(distances):
+        """
+        Convert vector distances into calibrated 0-100 similarity scores.
+
+        Distances are squared L2 between unit embeddings, so cosine similarity
+        is 1 - d/2; it is mapped linearly from SIMILARITY_COSINE_FLOOR (0) to
+        SIMILARITY_COSINE_CEILING (100) and clipped.
+
+        Args:
+            distances (list): Distances of the retrieved cases, nearest first
+
+        Returns:
+            list: One {'case', 'score'} entry per distance, in the same order
+        """
+        scores = []
+        for i, distance in enumerate(distances):
+            cosine = 1.0 - distance / 2.0
+            scaled = (cosine - SIMILARITY_COSINE_FLOOR) / (SIMILARITY_COSINE_CEILING - SIMILARITY_COSINE_FLOOR)
+            scores.append({'case': str(i + 1), 'score': round(min(max(scaled, 0.0), 1.0) * 100, 1)})
+        return scores
+
+    @staticmethod
+    def _build_result(incident_description, root_analysis, documents, metadatas, similarity_analysis,
+                      similarity_threshold, max_similar, matched_identifiers=None, near_duplicates=None):
+        """
+        Assemble the analysis result for one incident.
+
+        Args:
+            incident_description (str): Description that was analyzed
+            root_analysis (dict): Output of analyze_root_cause
+            documents (list): Descriptions of the retrieved historical cases, nearest first
+            metadatas (list): Metadata of the same cases
+            similarity_analysis (list): Output of analyze_similarity for those cases
+            similarity_threshold (int): Minimum similarity score (0-100) to keep a case
+            max_similar (int): Maximum number of similar incidents returned
+            matched_identifiers (list, optional): Per case, the identifiers it shares
+                verbatim with the query; such cases are kept regardless of score
+                and listed first
+            near_duplicates (list, optional): Per case, the IDs of its near-duplicates
+
+        Returns:
+            dict: 'current_incident' and 'similar_incidents' as returned by analyze_incident
+        """
+        # Prepare results structure
+        result = {
+            'current_incident': {
+                'description': incident_description,
+                'analysis': root_analysis
+            },
+            'similar_incidents': []
+        }
+            
+        # Process similar incidents
+        for i, (document, metadata) in enumerate(zip(documents, metadatas)):
+            if i >= len(similarity_analysis):
+                continue
+            
+            similarity_score = similarity_analysis[i]['score']
+            matched = list(matched_identifiers[i]) if matched_identifiers and i < len(matched_identifiers) else []
+            duplicates = list(near_duplicates[i]) if near_duplicates and i < len(near_duplicates) else []
+            if similarity_score >= similarity_threshold or matched:
+                incident_data = {
+                    'incident_id': metadata.get('incident_id', ''),
+                    # Older ingests also copied the description into metadata
+                    'description': (metadata.get('description') or document or '').strip(),
+                    'actions_taken': metadata.get('actions_taken', '').strip(),
+                    'participants': metadata.get('participants', '').strip(),
+                    'similarity_score': similarity_score,
+                    'matched_identifiers': matched,
+                    'near_duplicates': duplicates
+                }
+                
+                # Only add if we have valid data
+                if any(incident_data.values()):
+                    result['similar_incidents'].append(incident_data)
+        
+        # Exact identifier matches first, then by similarity score; limit to max_similar
+        result['similar_incidents'] = sorted(
+            result['similar_incidents'],
+            key=lambda x: (bool(x['matched_identifiers']), x['similarity_score']),
+            reverse=True
+        )[:max_similar]
+        
+        return result
+
+    @staticmethod
+    def _timed(timings, stage, func, *args, **kwargs):
+        """Call func and record its wall-clock duration under timings[stage]."""
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            timings[stage] = round(time.perf_counter() - start, 3)
+
+    def _cached_completion(self, prompt, temperature):
+        """
+        Run a single-prompt Groq completion through the LLM provider and response cache.
+
+        Args:
+            prompt (str): User prompt
+            temperature (float): Sampling temperature
+
+        Returns:
+            str: Stripped completion text
+        """
+        model = GROQ_MODEL
+        messages = [{"role": "user", "content": prompt}]
+        params = {"temperature": temperature}
+        response = get_llm_provider().complete(
+            model, messages, params,
+            lambda: self.groq_client.chat.completions.create(
+                messages=messages, model=model, **params
+            ).choices[0].message.content
+        )
+        return response.strip()
+
+    def _streamed_completion(self, prompt, temperature):
+        """
+        Stream a single-prompt Groq completion, sharing cache entries with _cached_completion.
+
+        Args:
+            prompt (str): User prompt
+            temperature (float): Sampling temperature
+
+        Returns:
+            iterator: Completion text chunks
+        """
+        model = GROQ_MODEL
+        messages = [{"role": "user", "content": prompt}]
+        params = {"temperature": temperature}
+
+        def stream():
+            for chunk in self.groq_client.chat.completions.create(
+                    messages=messages, model=model, stream=True, **params):
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+        return get_llm_provider().stream(model, messages, params, stream)
 
     def analyze_root_cause(self, incident_description):
         """
         Analyze root cause using Groq LLM.
         """
         try:
-            prompt = f"""Analyze this IT incident with technical precision:
+            response = self._cached_completion(self._root_cause_prompt(incident_description), temperature=0.1)
+            analysis = self._parse_root_cause(response)
+            
+            # Validate category
+            if 'CATEGORY' in analysis:
+                analysis['CATEGORY'] = self._validated_field('CATEGORY', analysis['CATEGORY'])
+            
+            return analysis
+            
+        except Exception as e:
+            logger.error(f"Error in root cause analysis: {str(e)}")
+            return dict(ROOT_CAUSE_FAILED)
+
+    def stream_root_cause(self, incident_description):
+        """
+        Stream the root cause analysis field by field as tokens arrive.
+
+        The field being written is yielded again with complete=False each time
+        its text grows, and once more with complete=True when the next field
+        starts or the response ends. Completed fields equal those returned by
+        analyze_root_cause, and the finished response is written to the shared
+        LLM cache, so either method answers a repeated description from cache.
+
+        Args:
+            incident_description (str): Free-text description of the incident
+
+        Yields:
+            tuple: (key (str), value (str), complete (bool), failed (bool)); on
+                failure the fields not yet completed are yielded from
+                ROOT_CAUSE_FAILED with failed=True, so a partly streamed
+                analysis is never mistaken for a finished one
+        """
+        completed = set()
+        partial = {}
+        try:
+            text = ''
+            for chunk in self._streamed_completion(self._root_cause_prompt(incident_description), temperature=0.1):
+                text += chunk
+                analysis = self._parse_root_cause(self._settled_text(text.lstrip()))
+                keys = list(analysis)
+                # A field is complete once a later field has started
+                for key in keys[:-1]:
+                    if key not in completed:
+                        completed.add(key)
+                        yield key, self._validated_field(key, analysis[key]), True, False
+                if keys and keys[-1] not in completed and analysis[keys[-1]] != partial.get(keys[-1]):
+                    partial[keys[-1]] = analysis[keys[-1]]
+                    yield keys[-1], analysis[keys[-1]], False, False
+
+            for key, value in self._parse_root_cause(text.strip()).items():
+                if key not in completed:
+                    completed.add(key)
+                    yield key, self._validated_field(key, value), True, False
+
+        except Exception as e:
+            logger.error(f"Error in root cause analysis: {str(e)}")
+            for key, value in ROOT_CAUSE_FAILED.items():
+                if key not in completed:
+                    yield key, value, True, True
+
+    @staticmethod
+    def _root_cause_prompt(incident_description):
+        """Build the root cause analysis prompt for an incident."""
+        return f"""Analyze this IT incident with technical precision:
 
 Incident Description: {incident_description}
 
@@ -732,57 +1550,10 @@ COMPONENT: [specific system]
 SOLUTION: [detailed steps]
 PREVENTION: [specific measures]"""
 
-            chat_completion = self.groq_client.chat.completions.create(
-                messages=[{"role": "user", "content": prompt}],
-                model="llama-3.1-8b-instant",
-                temperature=0.1
-            )
-            
-            response = chat_completion.choices[0].message.content.strip()
-            
-            # Parse response
-            analysis = {}
-            current_key = None
-            current_value = []
-            
-            for line in response.split('\n'):
-                if line.strip():
-                    if any(line.startswith(f"{key}:") for key in ['CATEGORY', 'ROOT_CAUSE', 'IMPACT', 'COMPONENT', 'SOLUTION', 'PREVENTION']):
-                        if current_key:
-                            analysis[current_key] = ' '.join(current_value)
-                        current_key = line.split(':', 1)[0].strip()
-                        current_value = [line.split(':', 1)[1].strip()]
-                    else:
-                        if current_key:
-                            current_value.append(line.strip())
-            
-            if current_key:
-                analysis[current_key] = ' '.join(current_value)
-            
-            # Validate category
-            if 'CATEGORY' in analysis:
-                if analysis['CATEGORY'] not in self.categories:
-                    analysis['CATEGORY'] = 'Unknown'
-            
-            return analysis
-            
-        except Exception as e:
-            logger.error(f"Error in root cause analysis: {str(e)}")
-            return {
-                'CATEGORY': 'Error',
-                'ROOT_CAUSE': 'Analysis failed',
-                'IMPACT': 'Unknown',
-                'COMPONENT': 'Unknown',
-                'SOLUTION': 'Analysis failed',
-                'PREVENTION': 'Analysis failed'
-            }
-
-    def analyze_similarity(self, current_incident, historical_incidents):
-        """
-        Analyze similarities between current and historical incidents.
-        """
-        try:
-            prompt = f"""Compare this incident with historical cases:
+    @staticmethod
+    def _similarity_prompt(current_incident, historical_incidents):
+        """Build the prompt comparing an incident with retrieved historical cases."""
+        return f"""Compare this incident with historical cases:
 
 Current Incident: {current_incident}
 
@@ -802,65 +1573,110 @@ SIMILARITY: [0-100]
 MATCH: [specific technical similarities]
 APPLICABLE_SOLUTION: [resolution steps]"""
 
-            chat_completion = self.groq_client.chat.completions.create(
-                messages=[{"role": "user", "content": prompt}],
-                model="llama-3.1-8b-instant",
-                temperature=0.2
-            )
-            
-            response = chat_completion.choices[0].message.content.strip()
-            
-            # Parse response
-            similarities = []
-            current_case = {}
-            
-            for line in response.split('\n'):
-                line = line.strip()
-                if not line:
-                    continue
-                    
-                if line.startswith('ID:'):
-                    if current_case and 'case' in current_case:
-                        similarities.append(current_case.copy())
-                    current_case = {'case': line.split(':', 1)[1].strip()}
-                elif line.startswith('SIMILARITY:'):
-                    try:
-                        score = float(line.split(':', 1)[1].strip())
-                        current_case['score'] = min(max(score, 0), 100)
-                    except (ValueError, IndexError):
-                        current_case['score'] = 0
-                elif line.startswith('MATCH:'):
-                    current_case['patterns'] = line.split(':', 1)[1].strip()
-                elif line.startswith('APPLICABLE_SOLUTION:'):
-                    current_case['solution'] = line.split(':', 1)[1].strip()
-            
-            # Add the last case if exists
-            if current_case and 'case' in current_case:
-                similarities.append(current_case.copy())
-            
-            # Validate and clean similarities
-            valid_similarities = []
-            required_keys = ['case', 'score', 'patterns', 'solution']
-            for sim in similarities:
-                if all(k in sim for k in required_keys):
-                    valid_similarities.append(sim)
-            
-            # Return unique top similarities
-            unique_similarities = []
-            seen_cases = set()
-            for sim in sorted(valid_similarities, key=lambda x: x.get('score', 0), reverse=True):
-                case_id = sim.get('case')
-                if case_id not in seen_cases:
-                    unique_similarities.append(sim)
-                    seen_cases.add(case_id)
-                    if len(unique_similarities) >= 3:
-                        break
-            
-            return unique_similarities
-            
+    @staticmethod
+    def _parse_root_cause(response):
+        """Parse 'KEY: value' lines of a root cause response into a dict, in response order."""
+        analysis = {}
+        current_key = None
+        current_value = []
+        
+        for line in response.split('\n'):
+            if line.strip():
+                if any(line.startswith(f"{key}:") for key in ROOT_CAUSE_KEYS):
+                    if current_key:
+                        analysis[current_key] = ' '.join(current_value)
+                    current_key = line.split(':', 1)[0].strip()
+                    current_value = [line.split(':', 1)[1].strip()]
+                else:
+                    if current_key:
+                        current_value.append(line.strip())
+        
+        if current_key:
+            analysis[current_key] = ' '.join(current_value)
+        return analysis
+
+    @staticmethod
+    def _settled_text(text):
+        """
+        Drop a trailing partial line that could still turn into a field header.
+
+        While streaming, "ROOT_C" must not be appended to the previous field's
+        value before the rest of the header arrives.
+        """
+        head, _, tail = text.rpartition('\n')
+        tail = tail.strip()
+        if tail and any(f"{key}:".startswith(tail) for key in ROOT_CAUSE_KEYS):
+            return head
+        return text
+
+    def _validated_field(self, key, value):
+        """Map a CATEGORY outside self.categories to 'Unknown'; other fields pass through."""
+        if key == 'CATEGORY' and value not in self.categories:
+            return 'Unknown'
+        return value
+
+    def analyze_similarity(self, current_incident, historical_incidents):
+        """
+        Analyze similarities between current and historical incidents.
+        """
+        try:
+            return self._similarity_analysis(current_incident, historical_incidents)
         except Exception as e:
             logger.error(f"Error in similarity analysis: {str(e)}")
             return []
 
+    def _similarity_analysis(self, current_incident, historical_incidents):
+        """analyze_similarity without the error handling; LLM and parsing errors propagate."""
+        prompt = self._similarity_prompt(current_incident, historical_incidents)
+        response = self._cached_completion(prompt, temperature=0.2)
+        
+        # Parse response
+        similarities = []
+        current_case = {}
+        
+        for line in response.split('\n'):
+            line = line.strip()
+            if not line:
+                continue
+                
+            if line.startswith('ID:'):
+                if current_case and 'case' in current_case:
+                    similarities.append(current_case.copy())
+                current_case = {'case': line.split(':', 1)[1].strip()}
+            elif line.startswith('SIMILARITY:'):
+                try:
+                    score = float(line.split(':', 1)[1].strip())
+                    current_case['score'] = min(max(score, 0), 100)
+                except (ValueError, IndexError):
+                    current_case['score'] = 0
+            elif line.startswith('MATCH:'):
+                current_case['patterns'] = line.split(':', 1)[1].strip()
+            elif line.startswith('APPLICABLE_SOLUTION:'):
+                current_case['solution'] = line.split(':', 1)[1].strip()
+        
+        # Add the last case if exists
+        if current_case and 'case' in current_case:
+            similarities.append(current_case.copy())
+        
+        # Validate and clean similarities
+        valid_similarities = []
+        required_keys = ['case', 'score', 'patterns', 'solution']
+        for sim in similarities:
+            if all(k in sim for k in required_keys):
+                valid_similarities.append(sim)
+        
+        # Return unique top similarities
+        unique_similarities = []
+        seen_cases = set()
+        for sim in sorted(valid_similarities, key=lambda x: x.get('score', 0), reverse=True):
+            case_id = sim.get('case')
+            if case_id not in seen_cases:
+                unique_similarities.append(sim)
+                seen_cases.add(case_id)
+                if len(unique_similarities) >= 3:
+                    break
+        
+        return unique_similarities
+
 
 # Removed the main function and direct script execution logic
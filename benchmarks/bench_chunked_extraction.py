@@ -0,0 +1,97 @@
+# benchmarks/bench_chunked_extraction.py
+"""
+Chunked transcript extraction benchmark: latency versus transcript length and workers.
+
+Generates bridge-call transcripts of increasing length and extracts them
+with IncidentExtractor for each worker count, using the synthetic LLM
+provider with --llm-latency-ms of simulated API time per call. Reports the
+number of chunks, wall-clock extraction time and the speedup over
+extracting the chunks one at a time. Responses are never cached in
+synthetic mode, so every run makes every call.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_chunked_extraction
+    python -m benchmarks.bench_chunked_extraction --paragraphs 500 5000 --workers 1 4 8 --output chunked.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SPEAKERS = ["MIM", "Network lead", "DBA", "Service desk", "Application owner", "Vendor engineer"]
+LINES = [
+    "users in the region still cannot reach the VPN gateway",
+    "we restarted the primary gateway and are monitoring the tunnels",
+    "the database failover completed, replication lag is back to normal",
+    "next update to stakeholders is due at the top of the hour",
+    "the vendor confirmed a firmware defect on the edge switches",
+    "workaround is to route traffic through the secondary data center",
+]
+
+
+def _transcript(rng, paragraphs):
+    start = 9 * 60
+    return "\n".join(
+        f"{(start + i // 4) // 60:02d}:{(start + i // 4) % 60:02d} UTC {rng.choice(SPEAKERS)}: "
+        f"{rng.choice(LINES)}, {' '.join(rng.choice(LINES).split()[:6])}."
+        for i in range(paragraphs)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--paragraphs', type=int, nargs='+', default=[200, 2000, 10000],
+                        help="Transcript lengths in paragraphs (one speaker turn each)")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--chunk-tokens', type=int, default=6000)
+    parser.add_argument('--llm-latency-ms', type=float, default=1000.0)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    os.environ.update({
+        'OPENAI_API_KEY': os.environ.get('OPENAI_API_KEY', 'benchmark'),
+        'GROQ_API_KEY': os.environ.get('GROQ_API_KEY', 'benchmark'),
+        'LLM_PROVIDER_MODE': 'synthetic',
+        'LLM_PROVIDER_LATENCY_MS': str(args.llm_latency_ms),
+        'LLM_CACHE_PATH': os.path.join(tempfile.mkdtemp(prefix="bench_chunked_"), 'llm_cache.sqlite3'),
+    })
+    sys.path.insert(0, REPO_ROOT)
+    from services.incident_extraction import IncidentExtractor, estimate_tokens, split_transcript
+
+    rng = np.random.default_rng(args.seed)
+    results = []
+    for paragraphs in args.paragraphs:
+        transcript = _transcript(rng, paragraphs)
+        chunks = len(split_transcript(transcript, args.chunk_tokens))
+        serial_seconds = None
+        for workers in args.workers:
+            extractor = IncidentExtractor(chunk_tokens=args.chunk_tokens, workers=workers)
+            start = time.perf_counter()
+            extractor.extract(transcript)
+            seconds = time.perf_counter() - start
+            if serial_seconds is None:
+                serial_seconds = seconds
+            result = {
+                'paragraphs': paragraphs,
+                'tokens': estimate_tokens(transcript),
+                'chunks': chunks,
+                'workers': workers,
+                'seconds': round(seconds, 3),
+                'speedup': round(serial_seconds / seconds, 2),
+            }
+            print(json.dumps(result))
+            results.append(result)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
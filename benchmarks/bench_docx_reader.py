@@ -0,0 +1,164 @@
+# benchmarks/bench_docx_reader.py
+"""
+DOCX reader benchmark: streaming iterparse reader vs python-docx.
+
+Generates bridge-call transcripts of roughly the requested .docx sizes
+(timestamped speaker paragraphs interleaved with bridge log tables) and
+reads each with:
+
+- python-docx: docx.Document(...).paragraphs, the former
+  IncidentManager.read_docx, which skips tables
+- streaming: services.docx_reader.read_docx_text, paragraphs and table
+  rows in document order
+
+Per reader and size the report gives wall-clock time, peak RSS growth
+while reading, the number of blocks (paragraphs, plus table rows for the
+streaming reader) and characters of text returned. Every (size, reader)
+pair runs in a fresh process so memory figures do not leak between runs.
+python-docx needs several times the uncompressed XML size in memory; the
+largest sizes may not fit on small machines.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_docx_reader
+    python -m benchmarks.bench_docx_reader --sizes-mb 1 10 50 --output docx_reader.json
+"""
+
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+import numpy as np
+from benchmarks.bench_pipeline import SERVICES, SYMPTOMS, PeakRss
+
+READERS = ['python-docx', 'streaming']
+SPEAKERS = ["MIM", "Network Team", "Service Owner", "Vendor", "DBA"]
+TABLE_ROWS = 40
+CHUNK_BLOCKS = 2000
+
+
+def _escape(text):
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def _paragraph(text):
+    return f'<w:p><w:r><w:t xml:space="preserve">{_escape(text)}</w:t></w:r></w:p>'
+
+
+def _table(rng, start_minute):
+    rows = []
+    for i in range(TABLE_ROWS):
+        minute = start_minute + i
+        cells = [f"{minute // 60 % 24:02d}:{minute % 60:02d} UTC",
+                 SPEAKERS[rng.integers(len(SPEAKERS))],
+                 f"{SYMPTOMS[rng.integers(len(SYMPTOMS))]} on {SERVICES[rng.integers(len(SERVICES))]}, "
+                 f"ticket #{rng.integers(1_000_000, 9_999_999)}"]
+        rows.append('<w:tr>' + ''.join(f'<w:tc>{_paragraph(cell)}</w:tc>' for cell in cells) + '</w:tr>')
+    return '<w:tbl><w:tblPr/>' + ''.join(rows) + '</w:tbl>'
+
+
+def _block_chunk(rng, start_minute):
+    blocks = []
+    for i in range(CHUNK_BLOCKS):
+        if i % 50 == 49:
+            blocks.append(_table(rng, start_minute + i))
+            continue
+        minute = start_minute + i
+        blocks.append(_paragraph(
+            f"{minute // 60 % 24:02d}:{minute % 60:02d} UTC {SPEAKERS[rng.integers(len(SPEAKERS))]}: "
+            f"{SYMPTOMS[rng.integers(len(SYMPTOMS))]} on {SERVICES[rng.integers(len(SERVICES))]}, "
+            f"checked host srv{rng.integers(100, 999)} and change CHG{rng.integers(1_000_000, 9_999_999)}."
+        ))
+    return ''.join(blocks)
+
+
+def _write_docx(path, size_mb, seed):
+    """Write a transcript of about size_mb by streaming generated blocks into a python-docx template."""
+    import docx
+    template = io.BytesIO()
+    docx.Document().save(template)
+    rng = np.random.default_rng(seed)
+    with zipfile.ZipFile(template) as source, open(path, 'wb') as raw, \
+            zipfile.ZipFile(raw, 'w', zipfile.ZIP_DEFLATED) as target:
+        xml = source.read('word/document.xml').decode('utf-8')
+        body_start = xml.index('<w:body>') + len('<w:body>')
+        section = xml.index('<w:sectPr')
+        for item in source.infolist():
+            if item.filename != 'word/document.xml':
+                target.writestr(item, source.read(item))
+        with target.open('word/document.xml', 'w') as document:
+            document.write(xml[:body_start].encode('utf-8'))
+            minute = 0
+            while raw.tell() < size_mb * 1024 * 1024:
+                document.write(_block_chunk(rng, minute).encode('utf-8'))
+                minute += CHUNK_BLOCKS
+            document.write(xml[section:].encode('utf-8'))
+
+
+def run_case(path, reader):
+    """Read one document with one reader, measuring time and memory."""
+    if reader == 'python-docx':
+        import docx
+
+        def read(file_path):
+            document = docx.Document(file_path)
+            return [paragraph.text for paragraph in document.paragraphs if paragraph.text.strip()]
+    else:
+        from services.docx_reader import iter_docx_blocks
+
+        def read(file_path):
+            return list(iter_docx_blocks(file_path))
+
+    with PeakRss() as rss:
+        baseline_mb = rss.peak_mb
+        start = time.perf_counter()
+        blocks = read(path)
+        seconds = time.perf_counter() - start
+    return {
+        'reader': reader,
+        'seconds': round(seconds, 3),
+        'peak_rss_growth_mb': round(rss.peak_mb - baseline_mb, 1),
+        'blocks': len(blocks),
+        'characters': sum(len(block) for block in blocks),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes-mb', type=float, nargs='+', default=[1, 10, 50], help="Target .docx sizes")
+    parser.add_argument('--readers', nargs='+', default=READERS, choices=READERS)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = []
+    workdir = tempfile.mkdtemp(prefix="bench_docx_reader_")
+    context = multiprocessing.get_context('spawn')
+    try:
+        for size_mb in args.sizes_mb:
+            path = os.path.join(workdir, f"transcript_{size_mb}mb.docx")
+            _write_docx(path, size_mb, args.seed)
+            with zipfile.ZipFile(path) as archive:
+                xml_mb = archive.getinfo('word/document.xml').file_size / (1024 * 1024)
+            for reader in args.readers:
+                with context.Pool(1) as pool:
+                    result = pool.apply(run_case, (path, reader))
+                result = {'docx_mb': round(os.path.getsize(path) / (1024 * 1024), 1),
+                          'document_xml_mb': round(xml_mb, 1), **result}
+                print(json.dumps(result))
+                results.append(result)
+            os.remove(path)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# benchmarks/bench_hybrid_retrieval.py
+"""
+Hybrid retrieval benchmark: vector-only vs BM25 + vector fusion.
+
+Builds a NumpyVectorIndex and a BM25Index over a synthetic corpus whose
+incidents mention ticket numbers, hostnames, error codes and SAP
+transaction codes, then times EnhancedIncidentAnalysisSystem._retrieve per
+query with hybrid off and on. Query embeddings are precomputed so the
+figures cover retrieval only. Half of the queries quote an identifier from
+one target incident; identifier recall@k reports how often that incident is
+returned. The run fails (exit code 1) when the hybrid p95 latency exceeds
+--budget-ms at any size.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_hybrid_retrieval
+    python -m benchmarks.bench_hybrid_retrieval --sizes 10000 --budget-ms 200 --output hybrid.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import shutil
+import sys
+import tempfile
+import time
+import numpy as np
+
+CHUNK_SIZE = 5000
+WORDS = (
+    "network outage vpn latency printer email login password reset disk full "
+    "database timeout backup failed certificate expired firewall switch router "
+    "order entry invoice posting delivery warehouse users remote office slow "
+    "crash restart patch update memory cpu job batch interface idoc queue"
+).split()
+TRANSACTIONS = ["VA01", "VA02", "ME21N", "MIGO", "FB60", "VL01N", "SM37", "ST22"]
+
+
+def _unit_vectors(rng, n, dim):
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _incident_text(rng, number):
+    words = " ".join(rng.choice(WORDS, size=20))
+    return (f"INC{number:07d} {words} on sap-prd-app{number % 997:03d}.corp "
+            f"error 0x{number * 2654435761 % (1 << 32):08x} in {TRANSACTIONS[number % len(TRANSACTIONS)]}")
+
+
+def _percentile(values, q):
+    return round(float(np.percentile(values, q)) * 1000, 3)
+
+
+def run_case(size, dim, n_queries, k, seed):
+    """Build both indexes with ``size`` incidents and time retrieval against them."""
+    from History.Similar_Incidents3 import EnhancedIncidentAnalysisSystem
+    from services.lexical_index import BM25Index
+    from services.vector_index import NumpyVectorIndex
+
+    rng = np.random.default_rng(seed)
+    workdir = tempfile.mkdtemp(prefix="bench_hybrid_")
+    try:
+        backend = NumpyVectorIndex(workdir, embedding_function=None)
+        lexical_index = BM25Index(f"{workdir}/bm25_index.json")
+
+        start = time.perf_counter()
+        for offset in range(0, size, CHUNK_SIZE):
+            n = min(CHUNK_SIZE, size - offset)
+            ids = [f"INC{offset + i:07d}" for i in range(n)]
+            documents = [_incident_text(rng, offset + i) for i in range(n)]
+            backend.upsert(
+                ids=ids,
+                documents=documents,
+                metadatas=[{'incident_id': incident_id} for incident_id in ids],
+                embeddings=_unit_vectors(rng, n, dim)
+            )
+            for incident_id, document in zip(ids, documents):
+                lexical_index.add(incident_id, document)
+        backend.persist()
+        lexical_index.persist()
+        build_seconds = time.perf_counter() - start
+
+        # Only the retrieval path is exercised, so the engine's ingest and
+        # LLM clients are not needed
+        engine = EnhancedIncidentAnalysisSystem.__new__(EnhancedIncidentAnalysisSystem)
+        engine.backend = backend
+        engine.lexical_index = lexical_index
+        engine.near_duplicates = None
+
+        targets = rng.integers(0, size, n_queries)
+        queries = []
+        for i, target in enumerate(targets):
+            text = " ".join(rng.choice(WORDS, size=12))
+            if i % 2 == 0:
+                identifier = _incident_text(rng, int(target)).split()[0]
+                text = f"{text} see ticket {identifier}"
+            queries.append(text)
+        query_embeddings = _unit_vectors(rng, n_queries, dim)
+
+        result = {'size': size, 'dim': dim, 'k': k, 'build_seconds': round(build_seconds, 3)}
+        for mode, hybrid in (('vector', False), ('hybrid', True)):
+            for i in range(min(5, n_queries)):
+                engine._retrieve([queries[i]], n_results=k, hybrid=hybrid, query_embeddings=query_embeddings[i:i + 1])
+            latencies = []
+            hits = 0
+            for i, query in enumerate(queries):
+                start = time.perf_counter()
+                retrieved = engine._retrieve([query], n_results=k, hybrid=hybrid,
+                                             query_embeddings=query_embeddings[i:i + 1])
+                latencies.append(time.perf_counter() - start)
+                if i % 2 == 0 and f"INC{targets[i]:07d}" in retrieved['ids'][0]:
+                    hits += 1
+            result[f'{mode}_p50_ms'] = _percentile(latencies, 50)
+            result[f'{mode}_p95_ms'] = _percentile(latencies, 95)
+            result[f'{mode}_identifier_recall_at_k'] = round(hits / max(1, (n_queries + 1) // 2), 3)
+        backend.close()
+        return result
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--budget-ms', type=float, default=200.0,
+                        help="Maximum acceptable hybrid p95 latency per query")
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = []
+    context = multiprocessing.get_context('spawn')
+    for size in args.sizes:
+        with context.Pool(1) as pool:
+            result = pool.apply(run_case, (size, args.dim, args.queries, args.k, args.seed))
+        result['within_budget'] = result['hybrid_p95_ms'] <= args.budget_ms
+        print(json.dumps(result))
+        results.append(result)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if not all(result['within_budget'] for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+# benchmarks/bench_pipeline.py
+"""
+End-to-end pipeline benchmark: upload -> extract -> summarize -> similar incidents.
+
+Drives the same calls as the Streamlit pages with generated DOCX transcripts
+and synthetic historical corpora of increasing size:
+
+- read_docx: IncidentManager.read_docx on an in-memory DOCX
+- extract_incident: IncidentExtractor.extract, the single extraction call
+  shared by the Incident Details and Incident Summary pages
+- load_historical_incidents: full ingest, then an incremental re-run
+  after 1% new rows are appended
+- analyze_incident: root cause, retrieval and LLM similarity scoring
+
+LLM and embedding calls use the synthetic provider (services.llm_provider),
+so no network is needed and the figures measure the application's own
+overhead plus --llm-latency-ms of simulated API time per call. Every corpus
+size runs in a fresh process in its own working directory, with fixed
+seeds, so runs are comparable across commits. Per stage the report gives
+p50/p95 latency, throughput and the peak RSS sampled while the stage ran.
+
+Generated rows differ mostly in digits, which near-duplicate clustering
+masks, so clustering is off by default (--near-duplicate-threshold 0) and
+every row is embedded and stored. Each case reports stored_rows, the
+vector store size after the full load, next to the generated size.
+
+With --baseline, p95 latencies are compared against an earlier report and
+the run fails (exit code 1) when any stage slowed down by more than
+--tolerance.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_pipeline --output pipeline.json
+    python -m benchmarks.bench_pipeline --sizes 1000 --baseline pipeline.json --tolerance 0.25
+"""
+
+import argparse
+import csv
+import io
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVICES = ["LAN Connectivity", "VPN Service", "ERP Support", "Printing Services", "Email Security"]
+SYMPTOMS = [
+    "users unable to log in", "orders stuck in the interface queue", "network latency above 800ms",
+    "printer fleet offline", "phishing emails reported", "database storage full", "VPN tunnel drops",
+]
+
+
+class PeakRss:
+    """Context manager sampling the process RSS on a thread and keeping the peak in MB."""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.peak_mb = 0.0
+        self._stop = threading.Event()
+
+    @staticmethod
+    def current_mb():
+        try:
+            with open('/proc/self/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        return int(line.split()[1]) / 1024
+        except OSError:
+            pass
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    def _sample(self):
+        while not self._stop.is_set():
+            self.peak_mb = max(self.peak_mb, self.current_mb())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.peak_mb = self.current_mb()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak_mb = max(self.peak_mb, self.current_mb())
+
+
+def _transcript_docx(rng, paragraphs):
+    """Build an in-memory DOCX bridge-call transcript."""
+    import docx
+    document = docx.Document()
+    document.add_heading(f"Major Incident INC{rng.integers(1_000_000, 9_999_999)}", level=1)
+    for i in range(paragraphs):
+        speaker = ["MIM", "Network Team", "Service Owner", "Vendor"][i % 4]
+        document.add_paragraph(
+            f"{speaker}: {SYMPTOMS[rng.integers(len(SYMPTOMS))]} on {SERVICES[rng.integers(len(SERVICES))]}, "
+            f"next update at {10 + i % 12}:00 UTC."
+        )
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def _historical_corpus(rng, path, start, count):
+    """Write (or extend) a synthetic historical incidents export with the spreadsheet's columns."""
+    with open(path, 'a' if start else 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        if not start:
+            writer.writerow(['Incidents', 'Description', 'Actions Taken', 'Participants', 'Additional Info'])
+        for i in range(start, start + count):
+            service = SERVICES[rng.integers(len(SERVICES))]
+            writer.writerow([
+                f"INT{i:07d} - {SYMPTOMS[rng.integers(len(SYMPTOMS))].capitalize()}",
+                f" - Business impact: {SYMPTOMS[rng.integers(len(SYMPTOMS))]}.\n"
+                f"   - Ticket number and service Offering: #{i:07d}, {service}.\n"
+                f"   - Workaround Available: {'Yes' if i % 3 else 'No'}.",
+                "1. Logs reviewed.\n2. Vendor engaged.\n3. Configuration reset.",
+                "1. MIM\n2. Service Owner",
+                "1. Root cause under review."
+            ])
+
+
+def _stage(results, name, func, items, unit='calls'):
+    """Run func over items, recording per-call latency, throughput and peak RSS."""
+    latencies = []
+    with PeakRss() as rss:
+        start = time.perf_counter()
+        for item in items:
+            call_start = time.perf_counter()
+            func(item)
+            latencies.append(time.perf_counter() - call_start)
+        elapsed = time.perf_counter() - start
+    results[name] = {
+        'n': len(latencies),
+        'p50_ms': round(float(np.percentile(latencies, 50)) * 1000, 3),
+        'p95_ms': round(float(np.percentile(latencies, 95)) * 1000, 3),
+        f'{unit}_per_second': round(len(latencies) / elapsed, 2) if elapsed else None,
+        'peak_rss_mb': round(rss.peak_mb, 1),
+    }
+
+
+def run_case(size, args):
+    """Benchmark every stage against a historical corpus of ``size`` incidents."""
+    workdir = tempfile.mkdtemp(prefix="bench_pipeline_")
+    os.environ.update({
+        'OPENAI_API_KEY': os.environ.get('OPENAI_API_KEY', 'benchmark'),
+        'GROQ_API_KEY': os.environ.get('GROQ_API_KEY', 'benchmark'),
+        'LLM_PROVIDER_MODE': 'synthetic',
+        'LLM_PROVIDER_LATENCY_MS': str(args.llm_latency_ms),
+        'LLM_CACHE_PATH': os.path.join(workdir, 'llm_cache.sqlite3'),
+    })
+    sys.path.insert(0, REPO_ROOT)
+    # The engine keeps its stores in relative directories
+    os.chdir(workdir)
+    try:
+        from History.Similar_Incidents3 import EnhancedIncidentAnalysisSystem
+        from services.incident_extraction import IncidentExtractor
+        from services.incident_manager import IncidentManager
+
+        rng = np.random.default_rng(args.seed)
+        transcripts = [_transcript_docx(rng, args.paragraphs) for _ in range(args.transcripts)]
+        corpus_path = os.path.join(workdir, 'historical_incidents.csv')
+        _historical_corpus(rng, corpus_path, 0, size)
+
+        results = {}
+        manager = IncidentManager()
+        extractor = IncidentExtractor(os.environ['OPENAI_API_KEY'])
+        texts = []
+        _stage(results, 'read_docx', lambda data: texts.append(manager.read_docx(io.BytesIO(data))), transcripts)
+        details = []
+        _stage(results, 'extract_incident',
+               lambda text: details.append(extractor.extract(text)['detailed_issue_info']), texts)
+
+        engine = EnhancedIncidentAnalysisSystem(retrieval_backend=args.backend,
+                                                near_duplicate_threshold=args.near_duplicate_threshold)
+        _stage(results, 'load_historical_incidents', engine.load_historical_incidents, [corpus_path], unit='files')
+        results['load_historical_incidents']['rows_per_second'] = round(
+            size / (results['load_historical_incidents']['p50_ms'] / 1000), 1
+        )
+        stored_rows = engine.backend.count()
+        # Grow the corpus by 1% so the re-run exercises the incremental diff
+        _historical_corpus(rng, corpus_path, size, max(1, size // 100))
+        _stage(results, 'load_historical_incidents_incremental', engine.load_historical_incidents,
+               [corpus_path], unit='files')
+
+        descriptions = [" ".join(f"{key}: {value}" for key, value in detail.items()) for detail in details]
+        _stage(results, 'analyze_incident', engine.analyze_incident, descriptions)
+        engine.close()
+        return {'size': size, 'stored_rows': stored_rows, 'stages': results}
+    finally:
+        os.chdir(REPO_ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=REPO_ROOT, text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _regressions(report, baseline, tolerance):
+    """Return stages whose p95 grew by more than tolerance relative to the baseline report."""
+    previous = {(case['size'], stage): metrics['p95_ms']
+                for case in baseline['results'] for stage, metrics in case['stages'].items()}
+    regressions = []
+    for case in report['results']:
+        for stage, metrics in case['stages'].items():
+            before = previous.get((case['size'], stage))
+            if before and metrics['p95_ms'] > before * (1 + tolerance):
+                regressions.append({'size': case['size'], 'stage': stage,
+                                    'baseline_p95_ms': before, 'p95_ms': metrics['p95_ms']})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 50_000],
+                        help="Historical corpus sizes")
+    parser.add_argument('--backend', default='numpy', choices=['numpy', 'chroma'])
+    parser.add_argument('--transcripts', type=int, default=20, help="Generated DOCX transcripts per size")
+    parser.add_argument('--paragraphs', type=int, default=200, help="Paragraphs per transcript")
+    parser.add_argument('--llm-latency-ms', type=float, default=0.0,
+                        help="Simulated latency per LLM call; 0 measures application overhead only")
+    parser.add_argument('--near-duplicate-threshold', type=float, default=0.0,
+                        help="Near-duplicate clustering threshold; 0 stores every generated row")
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--output', help="Write the report as JSON to this file")
+    parser.add_argument('--baseline', help="Earlier report to compare p95 latencies against")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="Allowed fractional p95 slowdown against the baseline")
+    args = parser.parse_args()
+
+    report = {
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {key: value for key, value in vars(args).items() if key not in ('output', 'baseline')},
+        'results': [],
+    }
+    context = multiprocessing.get_context('spawn')
+    for size in args.sizes:
+        with context.Pool(1) as pool:
+            result = pool.apply(run_case, (size, args))
+        print(json.dumps(result))
+        report['results'].append(result)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = _regressions(report, json.load(f), args.tolerance)
+        report['regressions'] = regressions
+        for regression in regressions:
+            print(f"REGRESSION: {json.dumps(regression)}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+# benchmarks/bench_quantization.py
+"""
+Quantized vector storage benchmark: recall@k versus memory for NumpyVectorIndex.
+
+Builds the index in each quantization mode from clustered synthetic
+embeddings (MiniLM's 384 dimensions by default; real incident embeddings
+cluster by topic, which makes near neighbours harder to separate than
+uniformly random vectors), then reopens it with each rescore factor and
+measures:
+
+- recall@k against exact float32 search over the same vectors
+- single-query latency (p50/p95)
+- scan_mb: size of the matrix a query scans (float32, float16 or int8 plus
+  per-row scales), i.e. what must stay resident for fast queries
+- rss_after_queries_mb: resident memory growth from reopening the index
+  and running the queries
+- disk_mb: total index size on disk (the float32 matrix is always kept for
+  rescoring)
+
+float16 costs little recall but converts every scanned block back to
+float32, which NumPy may do far slower than the matrix multiply itself;
+int8 dequantizes cheaply and needs the least memory.
+
+Every (size, mode, rescore factor) case runs in a fresh process so memory
+figures do not leak between runs.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_quantization
+    python -m benchmarks.bench_quantization --sizes 100000 --rescore-factors 1 2 4 8 --output quantization.json
+"""
+
+import argparse
+import gc
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+from benchmarks.bench_vector_index import CHUNK_SIZE, _dir_size_mb, _percentile, _rss_mb
+
+MODES = ['none', 'float16', 'int8']
+
+
+def _normalize(vectors):
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _clustered_vectors(rng, centers, n, spread):
+    """Unit vectors scattered around randomly chosen cluster centers."""
+    noise = rng.standard_normal((n, centers.shape[1])).astype(np.float32)
+    return _normalize(centers[rng.integers(len(centers), size=n)] + spread * noise / np.sqrt(centers.shape[1]))
+
+
+def _exact_top_k(matrix_path, dim, size, queries, k, block_size=65536):
+    """Ground-truth top-k rows by exact float32 search over the stored matrix."""
+    matrix = np.memmap(matrix_path, dtype=np.float32, mode='r', shape=(size, dim))
+    best_scores = np.empty((len(queries), 0), dtype=np.float32)
+    best_rows = np.empty((len(queries), 0), dtype=np.int64)
+    for start in range(0, size, block_size):
+        block = matrix[start:start + block_size]
+        scores = np.concatenate([best_scores, queries @ block.T], axis=1)
+        rows = np.concatenate([best_rows, np.broadcast_to(np.arange(start, start + len(block)),
+                                                          (len(queries), len(block)))], axis=1)
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        best_scores = np.take_along_axis(scores, top, axis=1)
+        best_rows = np.take_along_axis(rows, top, axis=1)
+    return best_rows
+
+
+def run_case(size, mode, rescore_factor, args):
+    """Build a quantized index, reopen it and measure recall, latency and memory."""
+    from services.vector_index import NumpyVectorIndex
+
+    rng = np.random.default_rng(args.seed)
+    workdir = tempfile.mkdtemp(prefix=f"bench_quantization_{mode}_")
+    try:
+        centers = _normalize(rng.standard_normal((args.clusters, args.dim)).astype(np.float32))
+        backend = NumpyVectorIndex(workdir, embedding_function=None, quantization=mode)
+        for offset in range(0, size, CHUNK_SIZE):
+            n = min(CHUNK_SIZE, size - offset)
+            ids = [f"INC{offset + i:09d}" for i in range(n)]
+            backend.upsert(ids=ids, documents=[''] * n, metadatas=[{}] * n,
+                           embeddings=_clustered_vectors(rng, centers, n, args.spread))
+        backend.persist()
+        backend.close()
+        del backend
+        gc.collect()
+
+        queries = _clustered_vectors(rng, centers, args.queries, args.spread)
+        baseline_mb = _rss_mb()
+        start = time.perf_counter()
+        backend = NumpyVectorIndex(workdir, embedding_function=None, quantization=mode,
+                                   rescore_factor=rescore_factor)
+        open_seconds = time.perf_counter() - start
+
+        latencies, found = [], []
+        for query in queries:
+            start = time.perf_counter()
+            result = backend.query(query_embeddings=[query], n_results=args.k, include=('distances',))
+            latencies.append(time.perf_counter() - start)
+            found.append({int(incident_id[3:]) for incident_id in result['ids'][0]})
+        rss_mb = _rss_mb() - baseline_mb
+
+        scan = backend._matrix if backend._quantized is None else backend._quantized
+        scan_bytes = scan[:size].nbytes + (backend._scales[:size].nbytes if backend._scales is not None else 0)
+        backend.close()
+
+        exact = _exact_top_k(os.path.join(workdir, 'embeddings.f32'), args.dim, size, queries, args.k)
+        recall = np.mean([len(rows & set(expected.tolist())) / args.k for rows, expected in zip(found, exact)])
+        return {
+            'size': size,
+            'quantization': mode,
+            'rescore_factor': rescore_factor if mode != 'none' else None,
+            'k': args.k,
+            'recall_at_k': round(float(recall), 4),
+            'query_p50_ms': _percentile(latencies, 50),
+            'query_p95_ms': _percentile(latencies, 95),
+            'open_seconds': round(open_seconds, 3),
+            'scan_mb': round(scan_bytes / (1024 * 1024), 1),
+            'rss_after_queries_mb': round(rss_mb, 1),
+            'disk_mb': round(_dir_size_mb(workdir), 1),
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--modes', nargs='+', default=MODES, choices=MODES)
+    parser.add_argument('--rescore-factors', type=int, nargs='+', default=[1, 4],
+                        help="Shortlist sizes per result to rescore in float32 (quantized modes only)")
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--clusters', type=int, default=200)
+    parser.add_argument('--spread', type=float, default=1.0,
+                        help="Noise around cluster centers; smaller values make neighbours harder to rank")
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = []
+    context = multiprocessing.get_context('spawn')
+    for size in args.sizes:
+        for mode in args.modes:
+            for rescore_factor in (args.rescore_factors if mode != 'none' else [1]):
+                with context.Pool(1) as pool:
+                    result = pool.apply(run_case, (size, mode, rescore_factor, args))
+                print(json.dumps(result))
+                results.append(result)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# benchmarks/bench_spreadsheet_cache.py
+"""
+Historical spreadsheet read benchmark: XLSX parsing vs the columnar cache.
+
+Writes a synthetic incident workbook (the Incidents/Description/Actions
+Taken/Participants columns of the real export, plus a date column) and
+measures a full read of its rows three ways:
+
+- xlsx: iter_incident_rows, openpyxl in read-only mode (every ingest
+  before the cache)
+- convert: the first iter_cached_incident_rows read, parsing the workbook
+  while writing the Arrow cache
+- cached: later iter_cached_incident_rows reads, memory-mapping the cache
+
+and checks that the cached rows match the parsed ones as ingest sees them
+(cell values as strings). Every size runs in a fresh process so caches and
+memory figures do not leak between runs.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_spreadsheet_cache
+    python -m benchmarks.bench_spreadsheet_cache --sizes 10000 100000 --output spreadsheet_cache.json
+"""
+
+import argparse
+import datetime
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+from benchmarks.bench_vector_index import _dir_size_mb, _rss_mb
+
+WORDS = ("vpn outage users unable to connect region gateway latency sap job failed database "
+         "restart server disk full certificate expired firewall rule printer queue email delay").split()
+
+
+def _write_workbook(path, size, seed):
+    import openpyxl
+    rng = np.random.default_rng(seed)
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(['Incidents', 'Description', 'Actions Taken', 'Participants', 'Date'])
+    start = datetime.datetime(2023, 1, 1)
+    for i in range(size):
+        sheet.append([
+            f"INC{i:09d}",
+            ' '.join(rng.choice(WORDS, size=60)),
+            ' '.join(rng.choice(WORDS, size=30)),
+            'MIM, Network team, Service desk',
+            start + datetime.timedelta(hours=int(i))
+        ])
+    workbook.save(path)
+
+
+def _timed_read(rows):
+    start = time.perf_counter()
+    result = list(rows)
+    return time.perf_counter() - start, result
+
+
+def run_case(size, args):
+    """Write a workbook of ``size`` rows and time reading it with and without the cache."""
+    from services.incident_reader import iter_cached_incident_rows, iter_incident_rows
+    from services.ingest_manifest import IngestManifest
+
+    workdir = tempfile.mkdtemp(prefix="bench_spreadsheet_cache_")
+    try:
+        file_path = os.path.join(workdir, 'incidents.xlsx')
+        cache_dir = os.path.join(workdir, 'cache')
+        _write_workbook(file_path, size, args.seed)
+        sha256 = IngestManifest.file_sha256(file_path)
+
+        xlsx_seconds, parsed = _timed_read(iter_incident_rows(file_path))
+        convert_seconds, _ = _timed_read(iter_cached_incident_rows(file_path, cache_dir, sha256))
+        baseline_mb = _rss_mb()
+        cached_seconds = []
+        for _ in range(args.repeats):
+            seconds, cached = _timed_read(iter_cached_incident_rows(file_path, cache_dir, sha256))
+            cached_seconds.append(seconds)
+        rss_mb = _rss_mb() - baseline_mb
+
+        matches = all(
+            {name: str(value) for name, value in expected.items()} == row
+            for expected, row in zip(parsed, cached)
+        ) and len(parsed) == len(cached)
+        return {
+            'size': size,
+            'xlsx_mb': round(os.path.getsize(file_path) / (1024 * 1024), 1),
+            'cache_mb': round(_dir_size_mb(cache_dir), 1),
+            'xlsx_seconds': round(xlsx_seconds, 3),
+            'convert_seconds': round(convert_seconds, 3),
+            'cached_seconds': round(min(cached_seconds), 3),
+            'speedup': round(xlsx_seconds / min(cached_seconds), 1),
+            'cached_read_rss_mb': round(rss_mb, 1),
+            'rows_match': matches,
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 50_000])
+    parser.add_argument('--repeats', type=int, default=3, help="Cached reads per size; the fastest is reported")
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = []
+    context = multiprocessing.get_context('spawn')
+    for size in args.sizes:
+        with context.Pool(1) as pool:
+            result = pool.apply(run_case, (size, args))
+        print(json.dumps(result))
+        results.append(result)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+# benchmarks/bench_vector_index.py
+"""
+Retrieval backend benchmark: NumpyVectorIndex vs ChromaDB.
+
+Builds each backend from synthetic unit-length embeddings (MiniLM's 384
+dimensions by default) and measures build time, single-query latency
+(p50/p95), batched query throughput, resident memory and on-disk size.
+Every (backend, size) pair runs in a fresh process so memory figures do not
+leak between runs. Embedding cost is excluded: both backends are given
+precomputed vectors.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_vector_index
+    python -m benchmarks.bench_vector_index --sizes 10000 100000 --output vector_index.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import shutil
+import tempfile
+import time
+import numpy as np
+
+CHUNK_SIZE = 5000
+
+
+def _rss_mb():
+    """Current resident set size in MB (Linux), falling back to peak RSS."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return _peak_rss_mb()
+
+
+def _peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _dir_size_mb(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total / (1024 * 1024)
+
+
+def _unit_vectors(rng, n, dim):
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _open_backend(name, path):
+    if name == 'numpy':
+        from services.vector_index import NumpyVectorIndex
+        return NumpyVectorIndex(path, embedding_function=None)
+    from services.vector_index import ChromaBackend
+    return ChromaBackend(path, 'bench_incidents', embedding_function=None)
+
+
+def _percentile(values, q):
+    return round(float(np.percentile(values, q)) * 1000, 3)
+
+
+def run_case(backend_name, size, dim, n_queries, batch_size, k, seed):
+    """Build one backend with ``size`` vectors and time queries against it."""
+    rng = np.random.default_rng(seed)
+    workdir = tempfile.mkdtemp(prefix=f"bench_{backend_name}_")
+    try:
+        baseline_mb = _rss_mb()
+        backend = _open_backend(backend_name, workdir)
+
+        start = time.perf_counter()
+        for offset in range(0, size, CHUNK_SIZE):
+            n = min(CHUNK_SIZE, size - offset)
+            ids = [f"INC{offset + i:09d}" for i in range(n)]
+            backend.upsert(
+                ids=ids,
+                documents=[f"Synthetic incident {incident_id}" for incident_id in ids],
+                metadatas=[{'incident_id': incident_id} for incident_id in ids],
+                embeddings=_unit_vectors(rng, n, dim)
+            )
+        backend.persist()
+        build_seconds = time.perf_counter() - start
+        built_mb = _rss_mb()
+
+        queries = _unit_vectors(rng, n_queries, dim)
+        include = ('metadatas', 'documents', 'distances')
+        for query in queries[:5]:
+            backend.query(query_embeddings=[query], n_results=k, include=include)
+
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            backend.query(query_embeddings=[query], n_results=k, include=include)
+            latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for offset in range(0, n_queries, batch_size):
+            backend.query(query_embeddings=queries[offset:offset + batch_size], n_results=k, include=include)
+        batched_seconds = time.perf_counter() - start
+
+        result = {
+            'backend': backend_name,
+            'size': size,
+            'dim': dim,
+            'k': k,
+            'build_seconds': round(build_seconds, 3),
+            'query_p50_ms': _percentile(latencies, 50),
+            'query_p95_ms': _percentile(latencies, 95),
+            'batched_queries_per_second': round(n_queries / batched_seconds, 1),
+            'rss_after_build_mb': round(built_mb - baseline_mb, 1),
+            'peak_rss_mb': round(_peak_rss_mb(), 1),
+            'disk_mb': round(_dir_size_mb(workdir), 1),
+        }
+        backend.close()
+        return result
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--backends', nargs='+', default=['numpy', 'chroma'], choices=['numpy', 'chroma'])
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = []
+    context = multiprocessing.get_context('spawn')
+    for size in args.sizes:
+        for backend_name in args.backends:
+            with context.Pool(1) as pool:
+                result = pool.apply(run_case, (backend_name, size, args.dim, args.queries,
+                                               args.batch_size, args.k, args.seed))
+            print(json.dumps(result))
+            results.append(result)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,34 @@ class Settings:
         OPENAI_API_KEY (str): OpenAI API authentication key
         GROQ_API_KEY (str): GROQ API authentication key
         DEFAULT_RECIPIENTS (list): Default email recipients for notifications
+        HISTORICAL_INCIDENTS_FILE (str): Excel file of historical incidents for similarity search
+        RETRIEVAL_BACKEND (str): Vector store for historical incidents, "chroma" or "numpy"
+        VECTOR_QUANTIZATION (str): NumPy index scan storage, "none", "float16" or "int8"
+        VECTOR_RESCORE_FACTOR (int): Quantized shortlist size per result, rescored in float32
+        LLM_CACHE_PATH (str): SQLite file backing the LLM response cache
+        LLM_CACHE_TTL_SECONDS (int): Lifetime of cached LLM responses
+        LLM_CACHE_MAX_ENTRIES (int): Maximum number of cached LLM responses
+        LLM_CACHE_MAX_BYTES (int): Maximum total size of cached LLM responses
+        LLM_PROVIDER_MODE (str): "live", "record", "replay" or "synthetic", see services.llm_provider
+        LLM_RECORDINGS_PATH (str): Directory of recorded LLM and embedding responses
+        LLM_PROVIDER_LATENCY_MS (float): Simulated latency per request in replay and synthetic modes
+        QUERY_EMBEDDING_CACHE_PATH (str): SQLite file backing the query embedding cache
+        QUERY_EMBEDDING_CACHE_SIZE (int): Query embeddings kept in memory per process
+        QUERY_EMBEDDING_CACHE_MAX_ENTRIES (int): Query embeddings kept on disk
+        INGEST_BATCH_SIZE (int): Historical incidents embedded and written per batch
+        INGEST_EMBED_WORKERS (int): Processes embedding historical incidents, 0 for in-process
+        NEAR_DUPLICATE_THRESHOLD (float): Jaccard similarity at which historical incidents are
+            clustered as near-duplicates, 0 to store and return every incident
+        ANALYSIS_STORE_PATH (str): SQLite file of completed incident analyses
+        SPREADSHEET_CACHE_DIR (str): Directory of columnar copies of historical .xlsx
+            files, empty to parse the workbook on every ingest
+        PREFETCH_WORKERS (int): Threads analyzing uploaded incidents in the background,
+            0 to analyze only when the Similar Historical Incidents page is opened
+        EXTRACTION_CHUNK_TOKENS (int): Transcript tokens per extraction call; longer
+            transcripts are extracted in chunks
+        EXTRACTION_WORKERS (int): Transcript chunks extracted concurrently
+        ANALYSIS_WORKERS (int): Threads running the root cause and similarity LLM calls
+            of analyze_incident, shared by every session using the engine
         
     Raises:
         ValueError: If required environment variables are missing
@@ -22,6 +50,34 @@ class Settings:
         self.OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
         self.GROQ_API_KEY = os.getenv("GROQ_API_KEY")
         self.DEFAULT_RECIPIENTS = os.getenv("RECIPIENTS_EMAILS", "").split(",")
+        self.HISTORICAL_INCIDENTS_FILE = os.getenv(
+            "HISTORICAL_INCIDENTS_FILE",
+            r'C:\Users\gurhegde\OneDrive - Deloitte (O365D)\CAI Playground\Pratik-Tasks\Unilever POC\Integration 1.2\History\Incidents_4X3.xlsx'
+        )
+        self.RETRIEVAL_BACKEND = os.getenv("RETRIEVAL_BACKEND", "chroma")
+        self.VECTOR_QUANTIZATION = os.getenv("VECTOR_QUANTIZATION", "none")
+        self.VECTOR_RESCORE_FACTOR = int(os.getenv("VECTOR_RESCORE_FACTOR", 4))
+        self.LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "./llm_cache/responses.sqlite3")
+        self.LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", 7 * 24 * 3600))
+        self.LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 5000))
+        self.LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", 100 * 1024 * 1024))
+        self.LLM_PROVIDER_MODE = os.getenv("LLM_PROVIDER_MODE", "live")
+        self.LLM_RECORDINGS_PATH = os.getenv("LLM_RECORDINGS_PATH", "./llm_recordings")
+        self.LLM_PROVIDER_LATENCY_MS = float(os.getenv("LLM_PROVIDER_LATENCY_MS", 0))
+        self.QUERY_EMBEDDING_CACHE_PATH = os.getenv(
+            "QUERY_EMBEDDING_CACHE_PATH", "./llm_cache/query_embeddings.sqlite3"
+        )
+        self.QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", 1024))
+        self.QUERY_EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("QUERY_EMBEDDING_CACHE_MAX_ENTRIES", 50000))
+        self.INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", 100))
+        self.INGEST_EMBED_WORKERS = int(os.getenv("INGEST_EMBED_WORKERS", 0))
+        self.NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", 0.8))
+        self.ANALYSIS_STORE_PATH = os.getenv("ANALYSIS_STORE_PATH", "./analysis_store/analyses.sqlite3")
+        self.SPREADSHEET_CACHE_DIR = os.getenv("SPREADSHEET_CACHE_DIR", "./spreadsheet_cache")
+        self.PREFETCH_WORKERS = int(os.getenv("PREFETCH_WORKERS", 2))
+        self.EXTRACTION_CHUNK_TOKENS = int(os.getenv("EXTRACTION_CHUNK_TOKENS", 6000))
+        self.EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", 4))
+        self.ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", 8))
         
         if not self.OPENAI_API_KEY:
             logging.error("Missing required OPENAI_API_KEY environment variable")
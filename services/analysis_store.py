@@ -0,0 +1,194 @@
+# services/analysis_store.py
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from config.settings import Settings
+
+class AnalysisStore:
+    """
+    Local store of completed incident analyses.
+
+    Streamlit reruns the page script on every interaction, so the similar
+    incidents page reads a stored result instead of repeating retrieval and
+    the root cause call. Results are keyed by incident ID, a hash of
+    everything the analysis was computed from (input_hash) and the analysis
+    version, a fingerprint of the models and prompts that produced it, so a
+    changed description, filter, historical corpus, model or prompt is
+    recomputed rather than served stale.
+
+    Attributes:
+        path (str): SQLite database file
+
+    Example:
+        >>> store = get_analysis_store()
+        >>> input_hash = AnalysisStore.input_hash(description, categories, corpus_sha256)
+        >>> result = store.get("INC123456", input_hash, engine.analysis_version())
+        >>> if result is None:
+        ...     store.put("INC123456", input_hash, engine.analysis_version(), analyze())
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS analyses (
+                incident_id TEXT NOT NULL,
+                input_hash TEXT NOT NULL,
+                version TEXT NOT NULL,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (incident_id, input_hash, version)
+            )"""
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def input_hash(*inputs):
+        """
+        Hash the inputs an analysis was computed from.
+
+        Args:
+            *inputs: JSON-serializable values (description, filters, corpus fingerprint, ...)
+
+        Returns:
+            str: Hex digest identifying the inputs
+        """
+        payload = json.dumps(inputs, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, incident_id, input_hash, version):
+        """
+        Return a stored analysis, or None if there is none for these inputs and version.
+
+        Returns:
+            dict or None: The result as stored by put(), with 'stored_at' (epoch seconds) added
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, created_at FROM analyses WHERE incident_id = ? AND input_hash = ? AND version = ?",
+                (str(incident_id), input_hash, version)
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            result = json.loads(row[0])
+        except ValueError as e:
+            logging.warning(f"Ignoring unreadable stored analysis for {incident_id}: {e}")
+            return None
+        result['stored_at'] = row[1]
+        return result
+
+    def put(self, incident_id, input_hash, version, result):
+        """
+        Store an analysis, replacing any earlier one for the same inputs and version.
+
+        Args:
+            incident_id (str): Incident the analysis belongs to
+            input_hash (str): Value of input_hash() for the analysis inputs
+            version (str): Analysis version (models and prompts)
+            result (dict): JSON-serializable analysis result
+        """
+        payload = json.dumps({key: value for key, value in result.items() if key != 'stored_at'},
+                             ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO analyses (incident_id, input_hash, version, result, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (str(incident_id), input_hash, version, payload, time.time())
+            )
+            self._conn.commit()
+
+    def iter_results(self, version=None, batch_size=500):
+        """
+        Iterate over stored analyses, oldest first, reading batch_size rows at a time.
+
+        Args:
+            version (str, optional): Only yield analyses of this version
+
+        Yields:
+            tuple: (incident_id, version, result, created_at)
+        """
+        query = "SELECT incident_id, version, result, created_at FROM analyses"
+        params = ()
+        if version is not None:
+            query += " WHERE version = ?"
+            params = (version,)
+        with self._lock:
+            cursor = self._conn.execute(query + " ORDER BY created_at", params)
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            for incident_id, row_version, payload, created_at in rows:
+                try:
+                    result = json.loads(payload)
+                except ValueError as e:
+                    logging.warning(f"Ignoring unreadable stored analysis for {incident_id}: {e}")
+                    continue
+                yield incident_id, row_version, result, created_at
+
+    def delete(self, incident_id):
+        """Remove every stored analysis of an incident."""
+        with self._lock:
+            self._conn.execute("DELETE FROM analyses WHERE incident_id = ?", (str(incident_id),))
+            self._conn.commit()
+
+    def count(self):
+        """Return the number of stored analyses."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+
+    def clear(self):
+        """Remove every stored analysis."""
+        with self._lock:
+            self._conn.execute("DELETE FROM analyses")
+            self._conn.commit()
+
+
+def describe_incident(detailed_issue_info):
+    """Flatten extracted issue details into the incident description that is analyzed."""
+    return " ".join(f"{key}: {value}" for key, value in detailed_issue_info.items())
+
+
+def analysis_key(engine, incident_description, categories=()):
+    """
+    Return the (input_hash, version) an analysis of these inputs is stored under.
+
+    Args:
+        engine (EnhancedIncidentAnalysisSystem): Engine computing the analysis
+        incident_description (str): Description that is analyzed
+        categories (iterable): Category filter of the similar incidents search
+
+    Returns:
+        tuple: (input_hash, version) for AnalysisStore.get and put
+    """
+    input_hash = AnalysisStore.input_hash(
+        incident_description, sorted(categories), engine.corpus_fingerprint()
+    )
+    return input_hash, engine.analysis_version()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_analysis_store():
+    """
+    Return the process-wide analysis store configured from Settings.
+
+    Returns:
+        AnalysisStore: Shared store instance
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = AnalysisStore(Settings().ANALYSIS_STORE_PATH)
+        return _store
@@ -0,0 +1,222 @@
+# services/bulk_extraction.py
+"""
+Command-line batch extraction of a directory of DOCX transcripts.
+
+Post-incident reviews need hundreds of historical transcripts re-extracted
+at once, which the Streamlit app can only do one upload at a time. This
+tool reads transcripts in a process pool (DOCX parsing is CPU-bound),
+extracts them on a thread pool with at most --concurrency API calls in
+flight, and appends one JSON line per transcript to the output file:
+
+    {"source_file": "2024/INC123.docx", "source_size": 48213, "source_mtime_ns": ...,
+     "status": "ok", "error": null, "extracted_at": "2024-06-01T10:00:00+00:00",
+     "details": {...}}
+
+details follows services.export.INCIDENT_DETAILS_SCHEMA; it is null when
+status is "error". Reading only runs ahead of extraction by a bounded
+number of transcripts, so memory does not grow with the directory.
+
+The output file is also the checkpoint: every line is flushed as soon as
+its transcript is done, and a rerun skips transcripts that already have an
+"ok" line for the same path, size and modification time. Failed
+transcripts are retried; when a file has several lines, the last one is
+current. A line cut short by a crash is discarded on resume.
+
+Long transcripts are extracted in chunks (see IncidentExtractor); their
+chunks are extracted one after another here so that --concurrency bounds
+the total number of concurrent API calls.
+
+Usage (from the repository root):
+    python -m services.bulk_extraction transcripts/ --output extractions.jsonl
+    python -m services.bulk_extraction transcripts/ --output extractions.jsonl --recursive --read-workers 4 --concurrency 8
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from tqdm import tqdm
+from services.docx_reader import read_docx_text
+from services.export import incident_details_record
+from services.incident_extraction import IncidentExtractor
+
+
+def find_transcripts(directory, recursive=False):
+    """
+    List the DOCX transcripts of a directory, sorted by path.
+
+    Word's "~$" lock files are skipped.
+
+    Returns:
+        list: Paths relative to directory
+    """
+    paths = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith('.docx') and not name.startswith('~$'):
+                paths.append(os.path.relpath(os.path.join(root, name), directory))
+        if not recursive:
+            break
+    return paths
+
+
+def _source_key(source_file, stat):
+    return source_file, stat.st_size, stat.st_mtime_ns
+
+
+def load_checkpoint(output_path):
+    """
+    Read which transcripts an earlier run already extracted.
+
+    A trailing partial line left by an interrupted run is truncated away so
+    new lines can be appended.
+
+    Args:
+        output_path (str): JSON Lines output of earlier runs
+
+    Returns:
+        set: (source_file, source_size, source_mtime_ns) of transcripts whose
+            latest line has status "ok"
+    """
+    if not os.path.exists(output_path):
+        return set()
+    latest = {}
+    with open(output_path, 'rb+') as f:
+        data = f.read()
+        end = data.rfind(b'\n') + 1
+        if end < len(data):
+            logging.warning(f"Discarding an incomplete last line of {output_path}")
+            f.truncate(end)
+    for line in data[:end].splitlines():
+        try:
+            record = json.loads(line)
+            latest[record['source_file']] = record
+        except (ValueError, KeyError):
+            continue
+    return {(record['source_file'], record['source_size'], record['source_mtime_ns'])
+            for record in latest.values() if record.get('status') == 'ok'}
+
+
+def _read(path):
+    """Read one transcript in a worker process."""
+    return read_docx_text(path)
+
+
+def _extract(extractor, text):
+    return incident_details_record(**extractor.extract(text))
+
+
+def run(directory, output_path, recursive=False, read_workers=None, concurrency=4):
+    """
+    Extract every transcript of a directory not yet in the output file.
+
+    Args:
+        directory (str): Directory of .docx transcripts
+        output_path (str): JSON Lines file to append results to
+        recursive (bool): Include subdirectories
+        read_workers (int, optional): DOCX reading processes, defaults to the CPU count
+        concurrency (int): Maximum concurrent extraction API calls
+
+    Returns:
+        dict: Counts of 'ok', 'error' and 'skipped' transcripts
+    """
+    done = load_checkpoint(output_path)
+    keys = [_source_key(source_file, os.stat(os.path.join(directory, source_file)))
+            for source_file in find_transcripts(directory, recursive)]
+    pending = [key for key in keys if key not in done]
+    counts = {'ok': 0, 'error': 0, 'skipped': len(keys) - len(pending)}
+    logging.info(f"{len(pending)} transcripts to extract, {counts['skipped']} already done")
+    if not pending:
+        return counts
+
+    extractor = IncidentExtractor(workers=1)
+    readers = ProcessPoolExecutor(max_workers=read_workers or os.cpu_count(),
+                                  mp_context=multiprocessing.get_context('spawn'))
+    extractors = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="bulk-extraction")
+    progress = tqdm(total=len(pending), unit=" transcripts", desc="Extracting transcripts")
+    start = time.perf_counter()
+    # Future -> source key, for reads and extractions in flight
+    reading, extracting = {}, {}
+    queue = iter(pending)
+    try:
+        with open(output_path, 'a', encoding='utf-8') as output:
+
+            def write(key, details=None, error=None):
+                record = {
+                    'source_file': key[0],
+                    'source_size': key[1],
+                    'source_mtime_ns': key[2],
+                    'status': 'error' if error else 'ok',
+                    'error': error,
+                    'extracted_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                    'details': details
+                }
+                output.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+                output.flush()
+                counts[record['status']] += 1
+                progress.update(1)
+
+            def fill():
+                # Keep reads at most two transcripts per extraction slot ahead
+                while len(reading) + len(extracting) < 2 * concurrency:
+                    key = next(queue, None)
+                    if key is None:
+                        return
+                    reading[readers.submit(_read, os.path.join(directory, key[0]))] = key
+
+            fill()
+            while reading or extracting:
+                finished, _ = wait(list(reading) + list(extracting), return_when=FIRST_COMPLETED)
+                for future in finished:
+                    if future in reading:
+                        key = reading.pop(future)
+                        try:
+                            text = future.result()
+                        except Exception as e:
+                            logging.error(f"Error reading {key[0]}: {e}")
+                            write(key, error=f"read: {e}")
+                            continue
+                        extracting[extractors.submit(_extract, extractor, text)] = key
+                    else:
+                        key = extracting.pop(future)
+                        try:
+                            write(key, details=future.result())
+                        except Exception as e:
+                            write(key, error=f"extract: {e}")
+                fill()
+    finally:
+        progress.close()
+        readers.shutdown(wait=True, cancel_futures=True)
+        extractors.shutdown(wait=True, cancel_futures=True)
+
+    elapsed = time.perf_counter() - start
+    logging.info(
+        f"Extracted {counts['ok']} transcripts ({counts['error']} failed) in {elapsed:.1f}s, "
+        f"{(counts['ok'] + counts['error']) / elapsed if elapsed else 0:.2f} transcripts/s"
+    )
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('directory', help="Directory of .docx transcripts")
+    parser.add_argument('--output', required=True, help="JSON Lines file to append results to; also the checkpoint")
+    parser.add_argument('--recursive', action='store_true', help="Include subdirectories")
+    parser.add_argument('--read-workers', type=int, help="DOCX reading processes (default: CPU count)")
+    parser.add_argument('--concurrency', type=int, default=4, help="Maximum concurrent extraction API calls")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    counts = run(args.directory, args.output, recursive=args.recursive,
+                 read_workers=args.read_workers, concurrency=args.concurrency)
+    print(f"{counts['ok']} extracted, {counts['error']} failed, {counts['skipped']} already done")
+    return 1 if counts['error'] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
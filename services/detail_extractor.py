@@ -1,7 +1,7 @@
 # services/detail_extractor.py
 import openai
-import json
 import logging
+from services.incident_extraction import IncidentExtractor
 
 class IncidentDetailExtractor:
     """
@@ -29,6 +29,10 @@ class IncidentDetailExtractor:
     def extract_detailed_issue_info(self, transcript):
         """
         Extract structured incident details from transcript text.
+
+        Shares one extraction call with IncidentManager.extract_incident_details
+        (see services.incident_extraction); identical transcripts are answered
+        from the shared LLM response cache.
         
         Args:
             transcript (str): Raw incident transcript
@@ -36,32 +40,8 @@ class IncidentDetailExtractor:
         Returns:
             dict: Structured incident data or None if extraction fails
         """
-        template = {
-            "issue_id": "ID",
-            "issue_location": "Location",
-            "issue_description": {
-                "business_impact": "Impact details",
-                "affected_location": "Location and users affected",
-                "ticket_number": "Ticket ID",
-                "service_offering": "Impacted service",
-                "workaround_available": "Yes/No"
-            },
-            "actions_taken": ["Actions list"],
-            "participants": ["Participant list"],
-            "additional_info": ["Additional information items"]
-        }
-
         try:
-            response = openai.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": f"Extract incident details in this JSON format: {json.dumps(template)}"},
-                    {"role": "user", "content": transcript}
-                ],
-                temperature=0.5,
-                max_tokens=1000
-            )
-            return json.loads(response.choices[0].message.content)
+            return IncidentExtractor().extract(transcript)['detailed_issue_info']
         except Exception as e:
             logging.error(f"Extraction failed: {e}")
             return None
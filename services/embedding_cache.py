@@ -0,0 +1,189 @@
+# services/embedding_cache.py
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+import numpy as np
+from config.settings import Settings
+
+_WHITESPACE = re.compile(r"\s+")
+
+class QueryEmbeddingCache:
+    """
+    Two-level cache of query embeddings keyed on normalized text.
+
+    Page reruns re-submit the same concatenated incident description, so its
+    embedding is kept in an in-memory LRU in front of a SQLite table that
+    survives restarts and is shared by every process on the node. Keys hash
+    the model name with the text after Unicode NFC normalisation, whitespace
+    collapsing and lowercasing (the default MiniLM model is uncased).
+
+    Attributes:
+        path (str): SQLite database file
+        max_memory_entries (int): Embeddings kept in the in-process LRU
+        max_disk_entries (int): Embeddings kept on disk; least recently used are evicted
+        hits (int): Texts served from either level
+        misses (int): Texts that had to be embedded
+
+    Example:
+        >>> cache = get_query_embedding_cache()
+        >>> embeddings = cache.embed("all-MiniLM-L6-v2", [description], embedding_function)
+        >>> backend.query(query_embeddings=embeddings, n_results=5)
+    """
+
+    def __init__(self, path, max_memory_entries=1024, max_disk_entries=50000):
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                vector BLOB NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_accessed ON embeddings (accessed_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def normalize(text):
+        """Return the form of text used for cache keys."""
+        return _WHITESPACE.sub(' ', unicodedata.normalize('NFC', str(text))).strip().lower()
+
+    @classmethod
+    def make_key(cls, model, text):
+        """Return the cache key for a text embedded by model."""
+        payload = f"{model}\x1f{cls.normalize(text)}"
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _remember(self, key, vector):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _lookup(self, keys, now):
+        """Return key -> vector for every key found in memory or on disk."""
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[key] = self._memory[key]
+            missing = [key for key in keys if key not in found]
+            if missing:
+                placeholders = ','.join('?' * len(missing))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", missing
+                ).fetchall()
+                for key, blob in rows:
+                    vector = np.frombuffer(blob, dtype=np.float32)
+                    found[key] = vector
+                    self._remember(key, vector)
+                if rows:
+                    self._conn.executemany(
+                        "UPDATE embeddings SET accessed_at = ? WHERE key = ?",
+                        [(now, key) for key, _ in rows]
+                    )
+                    self._conn.commit()
+        return found
+
+    def _store(self, vectors, now):
+        with self._lock:
+            for key, vector in vectors.items():
+                self._remember(key, vector)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, accessed_at) VALUES (?, ?, ?)",
+                [(key, vector.tobytes(), now) for key, vector in vectors.items()]
+            )
+            excess = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0] - self.max_disk_entries
+            if excess > 0:
+                self._conn.execute(
+                    "DELETE FROM embeddings WHERE key IN "
+                    "(SELECT key FROM embeddings ORDER BY accessed_at ASC LIMIT ?)",
+                    (excess,)
+                )
+            self._conn.commit()
+
+    def embed(self, model, texts, embedding_function):
+        """
+        Return embeddings for texts, computing only those not already cached.
+
+        Misses are embedded together in one call to embedding_function, with
+        repeated texts embedded once.
+
+        Args:
+            model (str): Name identifying the embedding model
+            texts (list): Texts to embed
+            embedding_function (callable): Maps a list of texts to their embeddings
+
+        Returns:
+            list: One float32 numpy vector per text, in input order
+        """
+        now = time.time()
+        keys = [self.make_key(model, text) for text in texts]
+        found = self._lookup(list(dict.fromkeys(keys)), now)
+
+        pending = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in pending:
+                pending[key] = text
+        self.hits += len(keys) - sum(key not in found for key in keys)
+        self.misses += len(pending)
+        if pending:
+            logging.debug(f"Embedding {len(pending)} uncached queries")
+            embeddings = embedding_function(list(pending.values()))
+            fresh = {key: np.asarray(embedding, dtype=np.float32)
+                     for key, embedding in zip(pending, embeddings)}
+            self._store(fresh, now)
+            found.update(fresh)
+        return [found[key] for key in keys]
+
+    def stats(self):
+        """Return hit/miss counters together with the entry count at each level."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            return {'hits': self.hits, 'misses': self.misses,
+                    'memory_entries': len(self._memory), 'disk_entries': entries}
+
+    def clear(self):
+        """Remove every cached embedding."""
+        with self._lock:
+            self._memory.clear()
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_query_embedding_cache():
+    """
+    Return the process-wide query embedding cache configured from Settings.
+
+    Returns:
+        QueryEmbeddingCache: Shared cache instance
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            settings = Settings()
+            _cache = QueryEmbeddingCache(
+                settings.QUERY_EMBEDDING_CACHE_PATH,
+                max_memory_entries=settings.QUERY_EMBEDDING_CACHE_SIZE,
+                max_disk_entries=settings.QUERY_EMBEDDING_CACHE_MAX_ENTRIES
+            )
+        return _cache
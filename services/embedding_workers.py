@@ -0,0 +1,69 @@
+# services/embedding_workers.py
+"""
+Process pool for embedding historical incidents during ingest.
+
+The ONNX embedding model runs in the calling process, so a serial ingest
+keeps one core busy. EmbeddingPool spreads batches over worker processes,
+each loading its own copy of the model once, and hands the vectors back to
+the ingest loop, which remains the only writer to the vector store.
+
+Workers are started with the "spawn" method (forking a process that already
+runs ONNX or Streamlit threads is unsafe) and build the same provider-wrapped
+embedding function as the engine, so record/replay/synthetic modes apply.
+
+Example:
+    >>> with EmbeddingPool(workers=8) as pool:
+    ...     future = pool.submit(documents)
+    ...     backend.upsert(ids, documents, metadatas, embeddings=future.result())
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+_embedding_function = None
+
+
+def _init_worker():
+    global _embedding_function
+    from chromadb.utils import embedding_functions
+    from services.llm_provider import get_llm_provider
+    _embedding_function = get_llm_provider().embedding_function(
+        embedding_functions.DefaultEmbeddingFunction()
+    )
+
+
+def embed_documents(documents):
+    """Embed documents in a worker process, returning a float32 matrix."""
+    return np.asarray(_embedding_function(documents), dtype=np.float32)
+
+
+class EmbeddingPool:
+    """
+    Worker processes computing document embeddings.
+
+    Attributes:
+        workers (int): Number of worker processes
+    """
+
+    def __init__(self, workers):
+        self.workers = workers
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker
+        )
+
+    def submit(self, documents):
+        """Queue a batch of documents; the future resolves to their embedding matrix."""
+        return self._executor.submit(embed_documents, list(documents))
+
+    def close(self):
+        """Stop the workers, cancelling batches that have not started."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,116 @@
+# services/engine_registry.py
+"""
+Process-wide registry of incident analysis engines.
+
+Streamlit reruns every page script per interaction and per session, so the
+analysis engine (Groq client, ChromaDB client/collection and the ONNX
+embedding model) is owned here instead of by the pages. All sessions in the
+server process share one engine per (API key, historical file, retrieval
+backend, vector quantization, near-duplicate threshold) combination.
+
+Example:
+    >>> from services import engine_registry
+    >>> engine_registry.warm_up(background=True)   # at app start
+    >>> engine = engine_registry.get_engine()      # in a page
+    >>> engine_registry.shutdown()                 # at process exit
+"""
+
+import atexit
+import logging
+import os
+import threading
+from config.settings import Settings
+from History.Similar_Incidents3 import EnhancedIncidentAnalysisSystem
+
+_lock = threading.Lock()
+_engines = {}
+_warm = set()
+
+
+def _resolve(groq_api_key, historical_incidents_file):
+    """Fill in missing arguments from Settings and build the registry key."""
+    settings = Settings()
+    groq_api_key = groq_api_key or settings.GROQ_API_KEY
+    historical_incidents_file = historical_incidents_file or settings.HISTORICAL_INCIDENTS_FILE
+    key = (groq_api_key, os.path.abspath(historical_incidents_file), settings.RETRIEVAL_BACKEND,
+           settings.VECTOR_QUANTIZATION, settings.VECTOR_RESCORE_FACTOR, settings.NEAR_DUPLICATE_THRESHOLD)
+    return groq_api_key, historical_incidents_file, key
+
+
+def get_engine(groq_api_key=None, historical_incidents_file=None):
+    """
+    Return the shared analysis engine, creating it on first use.
+
+    Args:
+        groq_api_key (str, optional): Groq API key, defaults to Settings
+        historical_incidents_file (str, optional): Excel file to ingest, defaults to Settings
+
+    Returns:
+        EnhancedIncidentAnalysisSystem: Engine shared by every session in the process
+    """
+    groq_api_key, historical_incidents_file, key = _resolve(groq_api_key, historical_incidents_file)
+    with _lock:
+        engine = _engines.get(key)
+        if engine is None:
+            logging.info("Creating shared incident analysis engine")
+            engine = EnhancedIncidentAnalysisSystem(
+                groq_api_key=groq_api_key,
+                historical_incidents_file=historical_incidents_file,
+                retrieval_backend=key[2],
+                quantization=key[3],
+                rescore_factor=key[4],
+                near_duplicate_threshold=key[5]
+            )
+            _engines[key] = engine
+        return engine
+
+
+def warm_up(groq_api_key=None, historical_incidents_file=None, background=False):
+    """
+    Create the shared engine and load its embedding model ahead of first use.
+
+    Safe to call on every Streamlit rerun; only the first call does any work.
+
+    Args:
+        groq_api_key (str, optional): Groq API key, defaults to Settings
+        historical_incidents_file (str, optional): Excel file to ingest, defaults to Settings
+        background (bool): Run in a daemon thread so the caller is not blocked
+
+    Returns:
+        threading.Thread or None: The warm-up thread when one was started
+    """
+    groq_api_key, historical_incidents_file, key = _resolve(groq_api_key, historical_incidents_file)
+    with _lock:
+        if key in _warm:
+            return None
+        _warm.add(key)
+
+    def _warm_engine():
+        try:
+            get_engine(groq_api_key, historical_incidents_file).warm_up()
+        except Exception as e:
+            logging.error(f"Error warming up analysis engine: {e}")
+            with _lock:
+                _warm.discard(key)
+            if not background:
+                raise
+
+    if background:
+        thread = threading.Thread(target=_warm_engine, name="engine-warm-up", daemon=True)
+        thread.start()
+        return thread
+    _warm_engine()
+    return None
+
+
+def shutdown():
+    """Close every shared engine and empty the registry."""
+    with _lock:
+        engines = list(_engines.values())
+        _engines.clear()
+        _warm.clear()
+    for engine in engines:
+        engine.close()
+
+
+atexit.register(shutdown)
@@ -0,0 +1,408 @@
+# services/export.py
+"""
+Schema-stable JSON Lines and Parquet export of incident data.
+
+Reporting jobs load exports into analytics tooling, so every record of a
+kind has the same columns in the same order and with the same types,
+whatever the LLM returned: missing fields are null, scalars given where a
+list is expected become one-item lists, and values of the wrong type are
+coerced (or nulled when they cannot be). Three kinds are exported:
+
+- ANALYSIS_SCHEMA: root cause analysis and similar incidents of an incident
+- INCIDENT_DETAILS_SCHEMA: details extracted from an incident transcript
+- PHASE_HISTORY_SCHEMA: one row per phase of the incident timer
+
+Writers stream: JsonlWriter writes each record as it arrives and
+ParquetWriter buffers rows into row groups, so bulk exports of many
+incidents run in constant memory. Timestamps are written as ISO-8601
+strings in JSON Lines and as Parquet timestamps.
+
+Example:
+    >>> data = export_bytes(ANALYSIS_SCHEMA, [analysis_record(result, "INC123456")], "parquet")
+    >>> with open_writer("analyses.jsonl", ANALYSIS_SCHEMA) as writer:
+    ...     writer.write_many(records)
+
+Usage (bulk export of the analysis store, from the repository root):
+    python -m services.export analyses.parquet
+"""
+
+import argparse
+import io
+import json
+import os
+from datetime import datetime, timezone
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+SCHEMA_VERSION = 1
+FORMATS = ('jsonl', 'parquet')
+MIME_TYPES = {
+    'jsonl': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet'
+}
+
+SIMILAR_INCIDENT_TYPE = pa.struct([
+    ('incident_id', pa.string()),
+    ('description', pa.string()),
+    ('actions_taken', pa.string()),
+    ('participants', pa.string()),
+    ('similarity_score', pa.float64()),
+    ('matched_identifiers', pa.list_(pa.string())),
+    ('near_duplicates', pa.list_(pa.string()))
+])
+
+ANALYSIS_SCHEMA = pa.schema([
+    ('schema_version', pa.int32()),
+    ('incident_id', pa.string()),
+    ('analysis_version', pa.string()),
+    ('analyzed_at', pa.timestamp('ms', tz='UTC')),
+    ('description', pa.string()),
+    ('category', pa.string()),
+    ('root_cause', pa.string()),
+    ('impact', pa.string()),
+    ('component', pa.string()),
+    ('solution', pa.string()),
+    ('prevention', pa.string()),
+    ('similar_incidents', pa.list_(SIMILAR_INCIDENT_TYPE))
+])
+
+INCIDENT_DETAILS_SCHEMA = pa.schema([
+    ('schema_version', pa.int32()),
+    # IncidentManager.extract_incident_details
+    ('incident_id', pa.string()),
+    ('status', pa.string()),
+    ('short_description', pa.string()),
+    ('outage_time', pa.string()),
+    ('mim_notified_time', pa.string()),
+    ('reported_by', pa.string()),
+    ('description', pa.string()),
+    ('business_impact', pa.string()),
+    ('impacted_services', pa.list_(pa.string())),
+    ('next_update', pa.string()),
+    ('bridge_details', pa.struct([
+        ('platform', pa.string()),
+        ('meeting_id', pa.string()),
+        ('passcode', pa.string())
+    ])),
+    ('resolution_teams', pa.list_(pa.string())),
+    # IncidentDetailExtractor.extract_detailed_issue_info
+    ('issue_id', pa.string()),
+    ('issue_location', pa.string()),
+    ('issue_description', pa.struct([
+        ('business_impact', pa.string()),
+        ('affected_location', pa.string()),
+        ('ticket_number', pa.string()),
+        ('service_offering', pa.string()),
+        ('workaround_available', pa.string())
+    ])),
+    ('actions_taken', pa.list_(pa.string())),
+    ('participants', pa.list_(pa.string())),
+    ('additional_info', pa.list_(pa.string()))
+])
+
+# Phase times are the timer's local wall-clock times, hence no time zone
+PHASE_HISTORY_SCHEMA = pa.schema([
+    ('schema_version', pa.int32()),
+    ('incident_id', pa.string()),
+    ('phase', pa.string()),
+    ('start_time', pa.timestamp('ms')),
+    ('end_time', pa.timestamp('ms')),
+    ('duration_minutes', pa.float64()),
+    ('ongoing', pa.bool_())
+])
+
+
+def _conform(value, type_):
+    """Coerce value to the Python representation of an Arrow type, or None."""
+    if value is None:
+        return None
+    if pa.types.is_struct(type_):
+        if not isinstance(value, dict):
+            return None
+        return {field.name: _conform(value.get(field.name), field.type) for field in type_}
+    if pa.types.is_list(type_):
+        if isinstance(value, (str, dict)) or not hasattr(value, '__iter__'):
+            value = [value]
+        return [_conform(item, type_.value_type) for item in value]
+    if pa.types.is_string(type_):
+        if isinstance(value, (dict, list)):
+            return json.dumps(value, ensure_ascii=False)
+        return str(value)
+    if pa.types.is_timestamp(type_):
+        if isinstance(value, (int, float)):
+            value = datetime.fromtimestamp(value, timezone.utc)
+        elif isinstance(value, str):
+            try:
+                value = datetime.fromisoformat(value)
+            except ValueError:
+                return None
+        if not isinstance(value, datetime):
+            return None
+        if type_.tz is None:
+            return value.replace(tzinfo=None, microsecond=0)
+        if value.tzinfo is None:
+            value = value.astimezone()
+        return value.astimezone(timezone.utc).replace(microsecond=0)
+    try:
+        if pa.types.is_boolean(type_):
+            return bool(value)
+        if pa.types.is_integer(type_):
+            return int(value)
+        if pa.types.is_floating(type_):
+            return float(value)
+    except (TypeError, ValueError):
+        return None
+    raise TypeError(f"Unsupported export column type: {type_}")
+
+
+def conform(schema, record):
+    """
+    Conform a record to an export schema.
+
+    Args:
+        schema (pyarrow.Schema): One of the export schemas
+        record (dict): Field values; unknown keys are dropped
+
+    Returns:
+        dict: Exactly the schema's fields, in order, with schema_version set
+    """
+    record = dict(record, schema_version=SCHEMA_VERSION)
+    return {field.name: _conform(record.get(field.name), field.type) for field in schema}
+
+
+def analysis_record(result, incident_id=None, analysis_version=None, analyzed_at=None):
+    """
+    Flatten an analysis result into an ANALYSIS_SCHEMA record.
+
+    Args:
+        result (dict): Result with 'current_incident' and 'similar_incidents',
+            as built by the similar incidents page or analyze_incident
+        incident_id (str, optional): Defaults to result['incident_id']
+        analysis_version (str, optional): Engine analysis_version() of the result
+        analyzed_at (float or datetime, optional): Defaults to result['stored_at']
+
+    Returns:
+        dict: Conformed record
+    """
+    current = result.get('current_incident') or {}
+    analysis = current.get('analysis') or {}
+    return conform(ANALYSIS_SCHEMA, {
+        'incident_id': incident_id if incident_id is not None else result.get('incident_id'),
+        'analysis_version': analysis_version,
+        'analyzed_at': analyzed_at if analyzed_at is not None else result.get('stored_at'),
+        'description': current.get('description'),
+        'category': analysis.get('CATEGORY'),
+        'root_cause': analysis.get('ROOT_CAUSE'),
+        'impact': analysis.get('IMPACT'),
+        'component': analysis.get('COMPONENT'),
+        'solution': analysis.get('SOLUTION'),
+        'prevention': analysis.get('PREVENTION'),
+        'similar_incidents': result.get('similar_incidents') or []
+    })
+
+
+def incident_details_record(incident_data, detailed_issue_info=None):
+    """
+    Combine both transcript extractions into an INCIDENT_DETAILS_SCHEMA record.
+
+    Args:
+        incident_data (dict): Output of IncidentManager.extract_incident_details
+        detailed_issue_info (dict, optional): Output of
+            IncidentDetailExtractor.extract_detailed_issue_info
+
+    Returns:
+        dict: Conformed record
+    """
+    return conform(INCIDENT_DETAILS_SCHEMA, {**(detailed_issue_info or {}), **(incident_data or {})})
+
+
+def phase_records(phase_history, incident_id=None):
+    """
+    Convert the incident timer's phase rows into PHASE_HISTORY_SCHEMA records.
+
+    Args:
+        phase_history (list): Rows as built by ui.counter.export_phase_data;
+            an 'End Time' of 'Ongoing' marks the current phase
+        incident_id (str, optional): Incident the timer belongs to
+
+    Returns:
+        list: Conformed records
+    """
+    records = []
+    for row in phase_history:
+        end_time = row.get('End Time')
+        ongoing = end_time == 'Ongoing'
+        records.append(conform(PHASE_HISTORY_SCHEMA, {
+            'incident_id': incident_id,
+            'phase': row.get('Phase'),
+            'start_time': row.get('Start Time'),
+            'end_time': None if ongoing else end_time,
+            'duration_minutes': row.get('Duration (minutes)'),
+            'ongoing': ongoing
+        }))
+    return records
+
+
+class JsonlWriter:
+    """
+    Streaming JSON Lines writer, one conformed record per line.
+
+    Attributes:
+        schema (pyarrow.Schema): Export schema of the records
+        count (int): Records written so far
+    """
+
+    def __init__(self, file, schema):
+        self.schema = schema
+        self.count = 0
+        self._owned = isinstance(file, (str, os.PathLike))
+        self._file = open(file, 'wb') if self._owned else file
+
+    def write(self, record):
+        """Conform and write one record."""
+        line = json.dumps(conform(self.schema, record), ensure_ascii=False, default=datetime.isoformat)
+        self._file.write(line.encode('utf-8') + b'\n')
+        self.count += 1
+
+    def write_many(self, records):
+        """Conform and write every record of an iterable."""
+        for record in records:
+            self.write(record)
+
+    def close(self):
+        """Flush the output, closing it if this writer opened it."""
+        if self._owned:
+            self._file.close()
+        else:
+            self._file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ParquetWriter:
+    """
+    Streaming Parquet writer, one row group per batch_size records.
+
+    Attributes:
+        schema (pyarrow.Schema): Export schema of the records
+        batch_size (int): Records buffered per row group
+        count (int): Records written so far
+    """
+
+    def __init__(self, file, schema, batch_size=10000):
+        self.schema = schema
+        self.batch_size = batch_size
+        self.count = 0
+        self._rows = []
+        self._writer = pq.ParquetWriter(file, schema)
+
+    def write(self, record):
+        """Conform and buffer one record, writing a row group when the buffer is full."""
+        self._rows.append(conform(self.schema, record))
+        self.count += 1
+        if len(self._rows) >= self.batch_size:
+            self._flush()
+
+    def write_many(self, records):
+        """Conform and write every record of an iterable."""
+        for record in records:
+            self.write(record)
+
+    def _flush(self):
+        if self._rows:
+            self._writer.write_table(pa.Table.from_pylist(self._rows, schema=self.schema))
+            self._rows = []
+
+    def close(self):
+        """Write the buffered records and the Parquet footer."""
+        self._flush()
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_writer(file, schema, fmt=None):
+    """
+    Open a streaming export writer.
+
+    Args:
+        file (str or file object): Output path or binary file object
+        schema (pyarrow.Schema): Export schema of the records
+        fmt (str, optional): "jsonl" or "parquet"; taken from the file
+            extension of a path when omitted
+
+    Returns:
+        JsonlWriter or ParquetWriter: Writer to use as a context manager
+
+    Raises:
+        ValueError: If the format is unknown
+    """
+    if fmt is None and isinstance(file, (str, os.PathLike)):
+        fmt = os.path.splitext(file)[1].lstrip('.').lower()
+    if fmt == 'jsonl':
+        return JsonlWriter(file, schema)
+    if fmt == 'parquet':
+        return ParquetWriter(file, schema)
+    raise ValueError(f"Unknown export format {fmt!r}, expected one of {FORMATS}")
+
+
+def export_bytes(schema, records, fmt):
+    """
+    Export records in memory, e.g. for st.download_button.
+
+    Args:
+        schema (pyarrow.Schema): Export schema of the records
+        records (iterable): Records to conform and write
+        fmt (str): "jsonl" or "parquet"
+
+    Returns:
+        bytes: The exported file
+    """
+    buffer = io.BytesIO()
+    with open_writer(buffer, schema, fmt) as writer:
+        writer.write_many(records)
+    return buffer.getvalue()
+
+
+def export_analyses(path, fmt=None, store=None, version=None):
+    """
+    Stream every stored analysis into a JSON Lines or Parquet file.
+
+    Args:
+        path (str): Output file
+        fmt (str, optional): "jsonl" or "parquet", by default from the file extension
+        store (AnalysisStore, optional): Defaults to the configured store
+        version (str, optional): Only export analyses of this analysis version
+
+    Returns:
+        int: Number of analyses written
+    """
+    if store is None:
+        from services.analysis_store import get_analysis_store
+        store = get_analysis_store()
+    with open_writer(path, ANALYSIS_SCHEMA, fmt) as writer:
+        for incident_id, analysis_version, result, stored_at in store.iter_results(version=version):
+            writer.write(analysis_record(result, incident_id, analysis_version, stored_at))
+    return writer.count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('output', help="Output file, .jsonl or .parquet")
+    parser.add_argument('--format', choices=FORMATS, help="Override the format implied by the extension")
+    parser.add_argument('--version', help="Only export analyses of this analysis version")
+    args = parser.parse_args()
+    count = export_analyses(args.output, fmt=args.format, version=args.version)
+    print(f"Exported {count} analyses to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
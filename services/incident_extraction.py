@@ -0,0 +1,295 @@
+# services/incident_extraction.py
+import json
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+import openai
+from config.settings import Settings
+from services.llm_provider import get_llm_provider
+
+# One template covering what the Incident Details page, the Incident Summary
+# page and the similar incidents search need, so a transcript is sent once
+EXTRACTION_TEMPLATE = {
+    "incident_id": "ID number",
+    "status": "MAJOR INCIDENT",
+    "short_description": "Brief description",
+    "outage_time": "Time in UTC",
+    "mim_notified_time": "Time in UTC",
+    "reported_by": "Name and role",
+    "description": "Incident description",
+    "business_impact": "Business impact description",
+    "impacted_services": ["List", "of", "impacted", "services"],
+    "next_update": "Time in UTC",
+    "bridge_details": {
+        "platform": "e.g. Zoom",
+        "meeting_id": "Meeting ID",
+        "passcode": "Passcode"
+    },
+    "resolution_teams": ["List of teams involved in the resolution"],
+    "issue_location": "Location",
+    "affected_location": "Location and users affected",
+    "ticket_number": "Ticket ID",
+    "service_offering": "Impacted service",
+    "workaround_available": "Yes/No",
+    "actions_taken": ["Actions list"],
+    "participants": ["Participant list"],
+    "additional_info": ["Additional information items"]
+}
+
+# Fields of IncidentManager.extract_incident_details' result
+INCIDENT_DATA_FIELDS = (
+    "incident_id", "status", "short_description", "outage_time", "mim_notified_time", "reported_by",
+    "description", "business_impact", "impacted_services", "next_update", "bridge_details",
+    "resolution_teams"
+)
+
+# How chunk extractions are merged: the earliest non-empty value (first
+# reported times and descriptions), the latest one (fields that change as the
+# call goes on), or the union of list items in transcript order
+LATEST_FIELDS = ("status", "next_update", "workaround_available")
+LIST_FIELDS = ("impacted_services", "resolution_teams", "actions_taken", "participants", "additional_info")
+
+# Rough size of an OpenAI token in characters of English text
+CHARS_PER_TOKEN = 4
+
+_EMPTY_VALUES = {"", "n/a", "na", "none", "unknown", "not mentioned", "not available", "not specified"}
+_NORMALIZE_PATTERN = re.compile(r"[^\w:]+")
+_UTC_PATTERN = re.compile(r"\b(utc|gmt)\b")
+_NAME_SEPARATOR_PATTERN = re.compile(r"\s*(?:\(|,| - | – )")
+
+
+def estimate_tokens(text):
+    """Estimate the number of tokens of text."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def split_transcript(transcript, max_tokens):
+    """
+    Split a transcript into chunks of at most max_tokens, on paragraph boundaries.
+
+    Paragraphs are packed greedily in order; a single paragraph longer than
+    the budget is split between words.
+
+    Args:
+        transcript (str): Transcript with one paragraph per line, as read_docx returns it
+        max_tokens (int): Token budget per chunk
+
+    Returns:
+        list: Chunk texts, in transcript order
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    pieces = []
+    for paragraph in transcript.split("\n"):
+        while len(paragraph) > max_chars:
+            cut = paragraph.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            pieces.append(paragraph[:cut])
+            paragraph = paragraph[cut:].lstrip()
+        pieces.append(paragraph)
+
+    chunks, current, size = [], [], 0
+    for piece in pieces:
+        if current and size + len(piece) + 1 > max_chars:
+            chunks.append("\n".join(current))
+            current, size = [], 0
+        current.append(piece)
+        size += len(piece) + 1
+    if current:
+        chunks.append("\n".join(current))
+    return [chunk for chunk in chunks if chunk.strip()]
+
+
+def _parse_json_object(text):
+    """Parse a model response that must be a JSON object; anything else raises ValueError."""
+    parsed = json.loads(text)
+    if not isinstance(parsed, dict):
+        raise ValueError("Extraction response is not a JSON object")
+    return parsed
+
+
+def _is_empty(value):
+    if isinstance(value, (list, dict)):
+        return not value
+    return value is None or str(value).strip().lower() in _EMPTY_VALUES
+
+
+def _item_key(field, item):
+    """Normalized form under which list items are considered duplicates."""
+    text = json.dumps(item, sort_keys=True) if isinstance(item, dict) else str(item)
+    if field == "participants":
+        # "Jane Doe (Network)" and "Jane Doe - network lead" are the same person
+        text = _NAME_SEPARATOR_PATTERN.split(text, maxsplit=1)[0]
+    text = _UTC_PATTERN.sub(" ", text.lower())
+    return " ".join(_NORMALIZE_PATTERN.sub(" ", text).split())
+
+
+def merge_extractions(extractions):
+    """
+    Merge per-chunk extractions of one transcript into a single extraction.
+
+    The result depends only on the chunk order, not on which chunk finished
+    first: scalar fields take the first non-empty value (LATEST_FIELDS the
+    last one), dictionaries are merged per key the same way, and list fields
+    are concatenated with duplicate actions, participants and timestamps
+    dropped (compared case-, punctuation- and time zone label-insensitively;
+    of duplicate participants the most detailed entry is kept).
+
+    Args:
+        extractions (list): Chunk extractions following EXTRACTION_TEMPLATE, in transcript order
+
+    Returns:
+        dict: Merged extraction following EXTRACTION_TEMPLATE
+    """
+    merged = {}
+    for field, template in EXTRACTION_TEMPLATE.items():
+        values = [extraction.get(field) for extraction in extractions]
+        if field in LIST_FIELDS:
+            items = {}
+            for value in values:
+                if _is_empty(value):
+                    continue
+                for item in value if isinstance(value, list) else [value]:
+                    if _is_empty(item):
+                        continue
+                    key = _item_key(field, item)
+                    if key not in items or len(str(item)) > len(str(items[key])):
+                        items[key] = item
+            merged[field] = list(items.values())
+        elif isinstance(template, dict):
+            merged[field] = {}
+            for key in template:
+                sub_values = [value.get(key) for value in values if isinstance(value, dict)]
+                merged[field][key] = next((value for value in sub_values if not _is_empty(value)), "")
+        else:
+            ordered = reversed(values) if field in LATEST_FIELDS else values
+            merged[field] = next((value for value in ordered if not _is_empty(value)), "")
+    return merged
+
+
+def split_extraction(extracted):
+    """
+    Split a unified extraction into the two shapes the pages consume.
+
+    Args:
+        extracted (dict): Model output following EXTRACTION_TEMPLATE
+
+    Returns:
+        dict: 'incident_data' as returned by IncidentManager.extract_incident_details
+            and 'detailed_issue_info' as returned by
+            IncidentDetailExtractor.extract_detailed_issue_info
+    """
+    return {
+        'incident_data': {field: extracted[field] for field in INCIDENT_DATA_FIELDS if field in extracted},
+        'detailed_issue_info': {
+            "issue_id": extracted.get("incident_id", ""),
+            "issue_location": extracted.get("issue_location", ""),
+            "issue_description": {
+                "business_impact": extracted.get("business_impact", ""),
+                "affected_location": extracted.get("affected_location", ""),
+                "ticket_number": extracted.get("ticket_number", ""),
+                "service_offering": extracted.get("service_offering", ""),
+                "workaround_available": extracted.get("workaround_available", "")
+            },
+            "actions_taken": extracted.get("actions_taken", []),
+            "participants": extracted.get("participants", []),
+            "additional_info": extracted.get("additional_info", [])
+        }
+    }
+
+
+class IncidentExtractor:
+    """
+    Extracts every structured field of an incident transcript in one LLM call.
+
+    The Incident Details and Incident Summary pages used to send the same
+    transcript to the model twice with overlapping schemas. This service
+    asks once, for the union of both, and splits the answer into each
+    page's shape. Identical transcripts are answered from the shared LLM
+    response cache.
+
+    Transcripts longer than chunk_tokens (multi-hour bridge calls) would
+    overflow the context window or be truncated, so they are split on
+    paragraph boundaries (split_transcript), the chunks are extracted
+    concurrently on up to workers threads, and the results are combined by
+    merge_extractions.
+
+    Attributes:
+        model (str): OpenAI chat model used for extraction
+        params (dict): Request parameters per call
+        chunk_tokens (int): Transcript tokens per call, defaults to Settings.EXTRACTION_CHUNK_TOKENS
+        workers (int): Chunks extracted concurrently, defaults to Settings.EXTRACTION_WORKERS
+
+    Example:
+        >>> extraction = IncidentExtractor(api_key).extract("Incident report...")
+        >>> extraction['incident_data']['incident_id']
+        'INC123456'
+        >>> extraction['detailed_issue_info']['issue_description']['ticket_number']
+        'INC123456'
+    """
+
+    model = "gpt-3.5-turbo"
+    params = {"temperature": 0.5, "max_tokens": 2000}
+
+    def __init__(self, api_key=None, chunk_tokens=None, workers=None):
+        if api_key:
+            openai.api_key = api_key
+        if chunk_tokens is None or workers is None:
+            settings = Settings()
+            chunk_tokens = chunk_tokens or settings.EXTRACTION_CHUNK_TOKENS
+            workers = workers or settings.EXTRACTION_WORKERS
+        self.chunk_tokens = chunk_tokens
+        self.workers = workers
+
+    def extract(self, transcript):
+        """
+        Extract incident details from transcript text.
+
+        Args:
+            transcript (str): Raw incident transcript
+
+        Returns:
+            dict: 'incident_data' and 'detailed_issue_info', see split_extraction
+
+        Raises:
+            Exception: If an API call fails or does not return a JSON object
+        """
+        try:
+            if estimate_tokens(transcript) <= self.chunk_tokens:
+                return split_extraction(self._extract_chunk(transcript))
+
+            chunks = split_transcript(transcript, self.chunk_tokens)
+            logging.info(f"Extracting a {estimate_tokens(transcript)}-token transcript in {len(chunks)} chunks")
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(chunks)),
+                                    thread_name_prefix="extraction") as executor:
+                extractions = list(executor.map(
+                    self._extract_chunk, chunks, range(1, len(chunks) + 1), [len(chunks)] * len(chunks)
+                ))
+            return split_extraction(merge_extractions(extractions))
+        except Exception as e:
+            logging.error(f"Error extracting incident details: {e}")
+            raise
+
+    def _extract_chunk(self, text, part=None, parts=None):
+        """Extract EXTRACTION_TEMPLATE from a whole transcript or one part of it."""
+        instructions = (
+            "You are an expert at extracting incident management information. "
+            "Extract the following details from the provided transcript and return them "
+            f"in valid JSON format: {json.dumps(EXTRACTION_TEMPLATE)}"
+        )
+        if part is not None:
+            instructions += (
+                f" The transcript is part {part} of {parts} of a longer bridge call transcript. "
+                "Only report what this part states; use empty strings and lists for anything it does not mention."
+            )
+        messages = [
+            {"role": "system", "content": instructions},
+            {"role": "user", "content": text}
+        ]
+        content = get_llm_provider().complete(
+            self.model, messages, self.params,
+            lambda: openai.chat.completions.create(
+                model=self.model, messages=messages, **self.params
+            ).choices[0].message.content,
+            validate=_parse_json_object
+        )
+        return _parse_json_object(content)
@@ -1,9 +1,10 @@
 # services/incident_manager.py
-import docx
 import openai
-import json
 import logging
 from config.settings import Settings
+from services.docx_reader import read_docx_text
+from services.incident_extraction import IncidentExtractor
+from services.llm_provider import get_llm_provider
 
 class IncidentManager:
     """
@@ -42,7 +43,8 @@ class IncidentManager:
             file: BytesIO or file object containing DOCX document
             
         Output:
-            str: Plain text content of the document with paragraphs joined by newlines
+            str: Plain text content of the document with paragraphs and
+                table rows (cells joined by " | ") on separate lines
             
         Example:
             >>> manager = IncidentManager()
@@ -61,19 +63,17 @@ class IncidentManager:
             
         Raises:
             Exception: If there's an error reading the DOCX file
+
+        The document XML is stream-parsed in document order instead of being
+        loaded into a python-docx object model, see services.docx_reader.
         """
         try:
-            doc = docx.Document(file)
-            full_text = []
-            for paragraph in doc.paragraphs:
-                if paragraph.text.strip():
-                    full_text.append(paragraph.text)
-            return "\n".join(full_text)
+            return read_docx_text(file)
         except Exception as e:
             logging.error(f"Error reading DOCX file: {e}")
             raise
 
-    def call_openai_api(self, system_content, user_content):
+    def call_openai_api(self, system_content, user_content, validate=None):
         """
         Makes a completion request to OpenAI's API.
         
@@ -93,9 +93,14 @@ class IncidentManager:
         """
         Make a call to OpenAI's API for text processing.
         
+        Identical requests are answered from the shared LLM response cache;
+        the configured LLM provider may record, replay or synthesise responses.
+        
         Args:
             system_content (str): Instructions for the AI model
             user_content (str): The actual content to be processed
+            validate (callable, optional): Check applied to a fresh response
+                before it is cached
             
         Returns:
             str: The processed response from OpenAI
@@ -103,17 +108,20 @@ class IncidentManager:
         Raises:
             Exception: If there's an error calling the OpenAI API
         """
+        model = "gpt-3.5-turbo"
+        messages = [
+            {"role": "system", "content": system_content},
+            {"role": "user", "content": user_content}
+        ]
+        params = {"temperature": 0.7, "max_tokens": 1500}
         try:
-            response = openai.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": system_content},
-                    {"role": "user", "content": user_content}
-                ],
-                temperature=0.7,
-                max_tokens=1500
+            return get_llm_provider().complete(
+                model, messages, params,
+                lambda: openai.chat.completions.create(
+                    model=model, messages=messages, **params
+                ).choices[0].message.content,
+                validate=validate
             )
-            return response.choices[0].message.content
         except Exception as e:
             logging.error(f"OpenAI API error: {e}")
             raise
@@ -144,32 +152,9 @@ class IncidentManager:
             >>> details = extract_incident_details("Major outage occurred...")
             >>> print(details['incident_id'])
             "INC123456"
-        """
-        system_content = """You are an expert at extracting incident management information. 
-        Extract the following details from the provided transcript and return them in valid JSON format:
-        {
-            "incident_id": "ID number",
-            "status": "MAJOR INCIDENT",
-            "short_description": "Brief description",
-            "outage_time": "Time in UTC",
-            "mim_notified_time": "Time in UTC",
-            "reported_by": "Name and role",
-            "description": "Incident description",
-            "business_impact": "Business impact description",
-            "impacted_services": ["List", "of", "impacted", "services"],
-            "next_update": "Time in UTC",
-            "bridge_details": {
-                "platform": "e.g. Zoom",
-                "meeting_id": "Meeting ID",
-                "passcode": "Passcode"
-            },
-            "resolution_teams": ["List of teams involved in the resolution"]
-        }"""
 
-        try:
-            json_response = self.call_openai_api(system_content, transcript)
-            incident_data = json.loads(json_response)
-            return incident_data
-        except Exception as e:
-            logging.error(f"Error extracting incident details: {e}")
-            raise
+        The transcript is extracted by services.incident_extraction, whose
+        single call also yields the Incident Summary details; callers that
+        need both should use IncidentExtractor directly.
+        """
+        return IncidentExtractor().extract(transcript)['incident_data']
@@ -0,0 +1,150 @@
+# services/incident_metadata.py
+"""
+Filterable metadata for historical incidents.
+
+Ingest stores a category, the impacted service and the incident date with
+every historical incident so retrieval can be narrowed before the vector
+search (see build_where). Explicit spreadsheet columns win when present;
+otherwise the service is parsed from the "Ticket number and service
+Offering" line of the description and the category is inferred from
+keywords, using the same four categories as the root cause analysis.
+"""
+
+import datetime
+import re
+
+CATEGORY_KEYWORDS = {
+    'Software': {'software', 'application', 'app', 'sap', 'erp', 'crash', 'bug', 'patch', 'upgrade',
+                 'database', 'email', 'outlook', 'portal', 'website', 'interface', 'job', 'dump'},
+    'Hardware': {'hardware', 'server', 'disk', 'printer', 'laptop', 'desktop', 'memory', 'cpu', 'power',
+                 'ups', 'storage', 'battery', 'device', 'aging', 'replacement'},
+    'Network': {'network', 'vpn', 'lan', 'wan', 'wifi', 'wireless', 'switch', 'router', 'latency',
+                'dns', 'dhcp', 'bandwidth', 'connectivity', 'packet', 'gateway', 'outage'},
+    'Security': {'security', 'breach', 'phishing', 'malware', 'virus', 'ransomware', 'unauthorized',
+                 'vulnerability', 'firewall', 'certificate', 'password', 'intrusion', 'attack'},
+}
+
+CATEGORY_COLUMNS = ('Category',)
+SERVICE_COLUMNS = ('Service Offering', 'Impacted Service', 'Service')
+DATE_COLUMNS = ('Date', 'Opened', 'Created', 'Incident Date')
+
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+_SERVICE_PATTERN = re.compile(r"service\s+offering\s*:\s*(?:#?\w+\s*,\s*)?([^\n.]+)", re.IGNORECASE)
+_DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%m/%d/%Y', '%d-%m-%Y', '%d.%m.%Y')
+
+
+def classify_category(text):
+    """
+    Infer an incident category from keywords.
+
+    Args:
+        text (str): Incident title, description and notes
+
+    Returns:
+        str: One of CATEGORY_KEYWORDS, or '' when no keyword matches
+    """
+    words = _WORD_PATTERN.findall(str(text).lower())
+    counts = {category: sum(word in keywords for word in words)
+              for category, keywords in CATEGORY_KEYWORDS.items()}
+    category, hits = max(counts.items(), key=lambda item: item[1])
+    return category if hits else ''
+
+
+def parse_service_offering(description):
+    """Return the service named on the description's "service Offering" line, or ''."""
+    match = _SERVICE_PATTERN.search(str(description))
+    return match.group(1).strip() if match else ''
+
+
+def date_key(value):
+    """
+    Convert a date to the integer YYYYMMDD form stored in metadata.
+
+    Integers keep range filters ($gte/$lte) working in every backend.
+
+    Args:
+        value: datetime, date or string in one of _DATE_FORMATS
+
+    Returns:
+        int: YYYYMMDD, or 0 when the value is empty or unparseable
+    """
+    if isinstance(value, datetime.datetime):
+        value = value.date()
+    if isinstance(value, datetime.date):
+        return value.year * 10000 + value.month * 100 + value.day
+    text = str(value or '').strip()[:10]
+    for date_format in _DATE_FORMATS:
+        try:
+            return date_key(datetime.datetime.strptime(text, date_format))
+        except ValueError:
+            continue
+    return 0
+
+
+def _first_column(row, columns):
+    for column in columns:
+        value = row.get(column)
+        if value not in (None, ''):
+            return value
+    return ''
+
+
+def incident_metadata(row, incident_id, description, actions_taken):
+    """
+    Derive the filterable metadata for one historical incident row.
+
+    Args:
+        row (dict): Spreadsheet row from iter_incident_rows
+        incident_id (str): Incident title/ID
+        description (str): Incident description
+        actions_taken (str): Resolution notes
+
+    Returns:
+        dict: 'category', 'service' and 'incident_date' (YYYYMMDD, 0 if unknown)
+    """
+    category = str(_first_column(row, CATEGORY_COLUMNS)).strip()
+    if category.lower() in (name.lower() for name in CATEGORY_KEYWORDS):
+        category = category.capitalize()
+    else:
+        category = classify_category(f"{incident_id} {description} {actions_taken}")
+    service = str(_first_column(row, SERVICE_COLUMNS)).strip() or parse_service_offering(description)
+    return {
+        'category': category,
+        'service': service,
+        'incident_date': date_key(_first_column(row, DATE_COLUMNS)),
+    }
+
+
+def build_where(category=None, service=None, date_from=None, date_to=None, where=None):
+    """
+    Build a ChromaDB-style metadata filter accepted by every RetrievalBackend.
+
+    Args:
+        category (str or list, optional): Category, or any of several categories
+        service (str or list, optional): Impacted service, or any of several
+        date_from (optional): Earliest incident date, inclusive
+        date_to (optional): Latest incident date, inclusive
+        where (dict, optional): Additional filter to combine with the above
+
+    Returns:
+        dict or None: Filter for RetrievalBackend.query, None when unfiltered
+
+    Example:
+        >>> build_where(category="Network", date_from="2024-01-01")
+        {'$and': [{'category': 'Network'}, {'incident_date': {'$gte': 20240101}}]}
+    """
+    conditions = [where] if where else []
+    for field, value in (('category', category), ('service', service)):
+        if isinstance(value, (list, tuple, set)):
+            # An empty selection means no restriction
+            if value:
+                conditions.append({field: {'$in': list(value)}})
+        elif value:
+            conditions.append({field: value})
+    if date_from:
+        conditions.append({'incident_date': {'$gte': date_key(date_from)}})
+    if date_to:
+        conditions.append({'incident_date': {'$lte': date_key(date_to)}})
+    if not conditions:
+        return None
+    return conditions[0] if len(conditions) == 1 else {'$and': conditions}
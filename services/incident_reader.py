@@ -0,0 +1,212 @@
+# services/incident_reader.py
+"""
+Streaming readers for historical incident exports.
+
+iter_incident_rows yields one row at a time from an .xlsx (openpyxl in
+read-only mode) or .csv export, so no reader ever holds the whole file.
+read_ahead_batches groups those rows into fixed-size batches on a
+background thread with a bounded queue: parsing overlaps with embedding,
+and a slow consumer blocks the reader instead of letting batches pile up.
+
+Parsing XLSX is by far the slowest part of reading, so
+iter_cached_incident_rows keeps a columnar copy of each workbook: the first
+read streams the rows into an Arrow IPC file named after the workbook's
+SHA-256, and later reads of the same content memory-map that file instead
+of parsing the workbook again.
+"""
+
+import csv
+import glob
+import logging
+import os
+import queue
+import threading
+import openpyxl
+import pyarrow as pa
+
+_END = object()
+
+
+def iter_incident_rows(file_path):
+    """
+    Yield the data rows of a historical incidents file as dictionaries.
+
+    Args:
+        file_path (str): Path to an .xlsx or .csv export whose first row holds the column names
+
+    Yields:
+        dict: Column name to cell value, with empty cells as ''
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == '.csv':
+        with open(file_path, newline='', encoding='utf-8-sig') as f:
+            for row in csv.DictReader(f):
+                yield {key: value if value is not None else '' for key, value in row.items()}
+        return
+
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(name).strip() if name is not None else '' for name in next(rows, ())]
+        for values in rows:
+            if all(value is None for value in values):
+                continue
+            yield {name: value if value is not None else '' for name, value in zip(header, values)}
+    finally:
+        workbook.close()
+
+
+def _cache_path(cache_dir, file_path, sha256):
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    return os.path.join(cache_dir, f"{stem}.{sha256}.arrow")
+
+
+def _read_cached_rows(cache_file):
+    """Yield rows from a columnar cache file, one memory-mapped record batch at a time."""
+    with pa.memory_map(cache_file, 'r') as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            yield from reader.get_batch(i).to_pylist()
+
+
+def _write_cached_rows(rows, cache_file, batch_size):
+    """
+    Yield rows while writing them to a columnar cache file.
+
+    The file only appears once every row has been read: an interrupted or
+    failed read leaves no partial cache behind.
+    """
+    tmp_path = f"{cache_file}.tmp"
+    writer = None
+    schema = None
+    batch = []
+    completed = False
+    try:
+        for row in rows:
+            if schema is None:
+                schema = pa.schema([(name, pa.string()) for name in row])
+                writer = pa.ipc.new_file(tmp_path, schema)
+            yield row
+            batch.append({name: str(row.get(name, '')) for name in schema.names})
+            if len(batch) >= batch_size:
+                writer.write_batch(pa.RecordBatch.from_pylist(batch, schema=schema))
+                batch = []
+        if writer is None:
+            writer = pa.ipc.new_file(tmp_path, pa.schema([]))
+        if batch:
+            writer.write_batch(pa.RecordBatch.from_pylist(batch, schema=schema))
+        completed = True
+    finally:
+        if writer is not None:
+            writer.close()
+        if completed:
+            os.replace(tmp_path, cache_file)
+        elif os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def iter_cached_incident_rows(file_path, cache_dir, sha256, batch_size=10000):
+    """
+    Yield the data rows of a historical incidents file, using a columnar cache for .xlsx.
+
+    Cell values are cached as strings, which is how ingest consumes them
+    (dates as ISO-8601 strings, which date_key still parses). Cache files
+    of earlier versions of the same workbook are removed when a new one is
+    written.
+
+    Args:
+        file_path (str): Path to an .xlsx or .csv export
+        cache_dir (str): Directory of cached workbooks; empty to disable caching
+        sha256 (str): SHA-256 of the file, e.g. from IngestManifest.check_source
+        batch_size (int): Rows per record batch in a new cache file
+
+    Yields:
+        dict: Column name to cell value, with empty cells as ''
+    """
+    if not cache_dir or os.path.splitext(file_path)[1].lower() != '.xlsx':
+        yield from iter_incident_rows(file_path)
+        return
+
+    cache_file = _cache_path(cache_dir, file_path, sha256)
+    if os.path.exists(cache_file):
+        try:
+            rows = _read_cached_rows(cache_file)
+            # Opening validates the footer before any row is handed out
+            first = next(rows, _END)
+        except (OSError, pa.ArrowInvalid) as e:
+            logging.warning(f"Ignoring unreadable spreadsheet cache {cache_file}: {e}")
+        else:
+            if first is not _END:
+                yield first
+                yield from rows
+            return
+
+    os.makedirs(cache_dir, exist_ok=True)
+    stem = glob.escape(os.path.splitext(os.path.basename(file_path))[0])
+    for stale in glob.glob(os.path.join(glob.escape(cache_dir), f"{stem}.*.arrow")):
+        if stale != cache_file:
+            os.remove(stale)
+    logging.info(f"Converting {file_path} to columnar cache {cache_file}")
+    yield from _write_cached_rows(iter_incident_rows(file_path), cache_file, batch_size)
+
+
+def read_ahead_batches(rows, batch_size=100, max_pending=2):
+    """
+    Group rows into batches, reading ahead on a background thread.
+
+    At most max_pending batches are buffered; the reader blocks until the
+    consumer catches up. Errors raised while reading are re-raised in the
+    consumer, and closing the generator early stops the reader.
+
+    Args:
+        rows (iterable): Source rows, e.g. from iter_incident_rows
+        batch_size (int): Rows per batch
+        max_pending (int): Maximum number of batches buffered ahead of the consumer
+
+    Yields:
+        list: Up to batch_size rows
+    """
+    batches = queue.Queue(maxsize=max_pending)
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                batches.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def read():
+        try:
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    if not put(batch):
+                        return
+                    batch = []
+            if batch and not put(batch):
+                return
+            put(_END)
+        except Exception as e:
+            logging.error(f"Error reading historical incidents: {e}")
+            put(e)
+        finally:
+            if hasattr(rows, 'close'):
+                rows.close()
+
+    reader = threading.Thread(target=read, name="incident-reader", daemon=True)
+    reader.start()
+    try:
+        while True:
+            item = batches.get()
+            if item is _END:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        reader.join()
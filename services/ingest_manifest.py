@@ -0,0 +1,115 @@
+# services/ingest_manifest.py
+import hashlib
+import json
+import logging
+import os
+
+class IngestManifest:
+    """
+    Persisted record of what has been ingested into the incident collection.
+
+    The manifest stores a fingerprint of the source spreadsheet (path, mtime,
+    size and SHA-256) together with one content hash per row ID. It lets
+    repeated loads skip an unchanged file entirely and, when the file did
+    change, upsert only new or modified rows and delete removed ones.
+
+    Attributes:
+        path (str): Location of the JSON manifest on disk
+        source (dict): Fingerprint of the last successfully ingested file
+        rows (dict): Mapping of row ID to content hash
+
+    Example:
+        >>> manifest = IngestManifest("./chroma_db/ingest_manifest.json")
+        >>> unchanged, fingerprint = manifest.check_source("History/Incidents_4X3.xlsx")
+        >>> manifest.rows.get(row_id) == IngestManifest.row_hash(*fields)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.source = {}
+        self.rows = {}
+        self._load()
+
+    def _load(self):
+        """Load the manifest from disk, starting empty if it is missing or corrupt."""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.source = data.get('source', {})
+            self.rows = data.get('rows', {})
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable ingest manifest {self.path}: {e}")
+            self.source = {}
+            self.rows = {}
+
+    def save(self):
+        """
+        Atomically write the manifest to disk.
+
+        Raises:
+            OSError: If the manifest cannot be written
+        """
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'source': self.source, 'rows': self.rows}, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        """Forget all ingested rows and remove the manifest file."""
+        self.source = {}
+        self.rows = {}
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    @staticmethod
+    def file_sha256(file_path, chunk_size=1 << 20):
+        """Return the SHA-256 hex digest of a file, read in chunks."""
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def row_hash(*fields):
+        """Return a stable content hash for one spreadsheet row."""
+        digest = hashlib.sha256()
+        for field in fields:
+            digest.update(str(field).encode('utf-8'))
+            digest.update(b'\x1f')
+        return digest.hexdigest()
+
+    def check_source(self, file_path):
+        """
+        Compare a source file against the fingerprint from the last ingest.
+
+        The cheap mtime/size check runs first; the file is only hashed when
+        those differ, so a touched-but-identical file is still recognised.
+
+        Args:
+            file_path (str): Path to the historical incidents file
+
+        Returns:
+            tuple: (unchanged (bool), fingerprint (dict) of the current file)
+        """
+        stat = os.stat(file_path)
+        fingerprint = {
+            'path': os.path.abspath(file_path),
+            'mtime': stat.st_mtime,
+            'size': stat.st_size,
+        }
+        previous = self.source
+        if (previous.get('path') == fingerprint['path']
+                and previous.get('mtime') == fingerprint['mtime']
+                and previous.get('size') == fingerprint['size']
+                and previous.get('sha256')):
+            fingerprint['sha256'] = previous['sha256']
+            return True, fingerprint
+
+        fingerprint['sha256'] = self.file_sha256(file_path)
+        unchanged = (previous.get('path') == fingerprint['path']
+                     and previous.get('sha256') == fingerprint['sha256'])
+        return unchanged, fingerprint
@@ -0,0 +1,280 @@
+# services/lexical_index.py
+"""
+BM25 inverted index over historical incidents, for hybrid retrieval.
+
+Embedding search is poor at exact tokens such as ticket numbers
+(INC0012345), hostnames (sap-prd-app01.corp), error codes (0x80070005)
+and SAP transaction codes (VA01). BM25Index keeps those tokens intact, is
+updated incrementally alongside the vector store during ingest, and its
+rankings are combined with vector rankings by reciprocal_rank_fusion.
+"""
+
+import json
+import logging
+import math
+import os
+import re
+import threading
+from collections import Counter
+import numpy as np
+
+# Whole tokens keep internal separators so hostnames, codes and paths
+# survive; their alphanumeric parts are indexed as well
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[._\-/:][a-z0-9]+)*")
+_PART_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    """
+    Split text into lowercase index terms.
+
+    Args:
+        text (str): Text to tokenize
+
+    Returns:
+        list: Terms, with compound tokens followed by their parts
+    """
+    terms = []
+    for token in _TOKEN_PATTERN.findall(str(text).lower()):
+        terms.append(token)
+        if not token.isalnum():
+            terms.extend(_PART_PATTERN.findall(token))
+    return terms
+
+
+def is_identifier(term):
+    """
+    Return True for terms that look like IDs, codes or hostnames rather than words.
+
+    A term qualifies when it contains a digit and either letters (VA01,
+    inc0012345, sap-prd-app01.corp) or is a number of at least 6 digits
+    (111111). Plain counts such as 1000, times and dates made only of
+    digits and separators, and words such as and/or do not.
+
+    Example:
+        >>> is_identifier("va01"), is_identifier("sap-prd-app01.corp"), is_identifier("111111")
+        (True, True, True)
+        >>> is_identifier("14:05"), is_identifier("2024-06-01"), is_identifier("1000")
+        (False, False, False)
+    """
+    if not any(c.isdigit() for c in term):
+        return False
+    return any(c.isalpha() for c in term) or (term.isdigit() and len(term) >= 6)
+
+
+def reciprocal_rank_fusion(rankings, k=60):
+    """
+    Merge several ranked ID lists with reciprocal rank fusion.
+
+    Args:
+        rankings (list): Lists of document IDs, each best first
+        k (int): Rank damping constant; 60 is the value from the original paper
+
+    Returns:
+        list: (doc_id, fused score) pairs, best first
+    """
+    scores = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class BM25Index:
+    """
+    Incrementally updatable BM25 inverted index persisted as JSON.
+
+    Postings are kept as dictionaries so single documents can be added and
+    removed cheaply; each term's postings are also compiled on first use
+    into NumPy arrays of document slots and frequencies, so scoring common
+    terms over large collections is vectorised instead of a Python loop.
+
+    Attributes:
+        path (str): JSON file the index is persisted to
+        k1 (float): BM25 term frequency saturation
+        b (float): BM25 document length normalisation
+        max_query_terms (int): Only the rarest query terms are scored, which
+            bounds latency for long, concatenated incident descriptions
+
+    Example:
+        >>> index = BM25Index("./chroma_db/bm25_index.json")
+        >>> index.add("INC0012345", "VA01 order entry fails on sap-prd-app01")
+        >>> index.persist()
+        >>> index.search("VA01 dumps for EU users", k=5)
+        [('INC0012345', 1.38)]
+    """
+
+    def __init__(self, path, k1=1.5, b=0.75, max_query_terms=32):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self.max_query_terms = max_query_terms
+        self._lock = threading.RLock()
+        self._load()
+
+    def _load(self):
+        self._reset()
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._postings = data['postings']
+            self._doc_lengths = data['doc_lengths']
+        except (OSError, ValueError, KeyError) as e:
+            logging.warning(f"Ignoring unreadable lexical index {self.path}: {e}")
+            self._reset()
+            return
+        self._total_length = sum(self._doc_lengths.values())
+        for doc_id, length in self._doc_lengths.items():
+            self._assign_slot(doc_id, length)
+        # The per-document term lists only speed up removal, so they are
+        # rebuilt from the postings instead of being persisted
+        for term, docs in self._postings.items():
+            for doc_id in docs:
+                self._doc_terms.setdefault(doc_id, []).append(term)
+
+    def _reset(self):
+        self._postings = {}
+        self._doc_lengths = {}
+        self._doc_terms = {}
+        self._total_length = 0
+        # Dense document slots backing the compiled posting arrays
+        self._slots = {}
+        self._slot_ids = []
+        self._free_slots = []
+        self._slot_lengths = np.zeros(1024, dtype=np.float32)
+        self._compiled = {}
+
+    def _assign_slot(self, doc_id, length):
+        if self._free_slots:
+            slot = self._free_slots.pop()
+            self._slot_ids[slot] = doc_id
+        else:
+            slot = len(self._slot_ids)
+            self._slot_ids.append(doc_id)
+            if slot >= len(self._slot_lengths):
+                self._slot_lengths = np.concatenate([self._slot_lengths, np.zeros_like(self._slot_lengths)])
+        self._slots[doc_id] = slot
+        self._slot_lengths[slot] = length
+
+    def _compiled_postings(self, term):
+        """Return (slots, frequencies) arrays for a term, compiling them on first use."""
+        compiled = self._compiled.get(term)
+        if compiled is None:
+            docs = self._postings[term]
+            compiled = (
+                np.fromiter((self._slots[doc_id] for doc_id in docs), dtype=np.int64, count=len(docs)),
+                np.fromiter(docs.values(), dtype=np.float32, count=len(docs))
+            )
+            self._compiled[term] = compiled
+        return compiled
+
+    def count(self):
+        """Return the number of indexed documents."""
+        return len(self._doc_lengths)
+
+    def add(self, doc_id, text):
+        """Index a document, replacing any previous version with the same ID."""
+        terms = Counter(tokenize(text))
+        with self._lock:
+            self._remove(doc_id)
+            for term, frequency in terms.items():
+                self._postings.setdefault(term, {})[doc_id] = frequency
+                self._compiled.pop(term, None)
+            length = sum(terms.values())
+            self._doc_lengths[doc_id] = length
+            self._assign_slot(doc_id, length)
+            self._doc_terms[doc_id] = list(terms)
+            self._total_length += length
+
+    def remove(self, doc_ids):
+        """Remove documents from the index."""
+        with self._lock:
+            for doc_id in doc_ids:
+                self._remove(doc_id)
+
+    def _remove(self, doc_id):
+        length = self._doc_lengths.pop(doc_id, None)
+        if length is None:
+            return
+        self._total_length -= length
+        slot = self._slots.pop(doc_id)
+        self._slot_ids[slot] = None
+        self._slot_lengths[slot] = 0
+        self._free_slots.append(slot)
+        for term in self._doc_terms.pop(doc_id, []):
+            docs = self._postings[term]
+            docs.pop(doc_id, None)
+            self._compiled.pop(term, None)
+            if not docs:
+                del self._postings[term]
+
+    def _query_terms(self, query):
+        """Return the distinct query terms present in the index, rarest first."""
+        terms = {term for term in tokenize(query) if term in self._postings}
+        return sorted(terms, key=lambda term: len(self._postings[term]))[:self.max_query_terms]
+
+    def search(self, query, k=10):
+        """
+        Rank documents against a query with BM25.
+
+        Args:
+            query (str): Query text
+            k (int): Number of results
+
+        Returns:
+            list: (doc_id, score) pairs, best first
+        """
+        with self._lock:
+            n_docs = len(self._doc_lengths)
+            if not n_docs:
+                return []
+            average_length = self._total_length / n_docs
+            scores = np.zeros(len(self._slot_ids), dtype=np.float32)
+            for term in self._query_terms(query):
+                slots, frequencies = self._compiled_postings(term)
+                idf = math.log(1 + (n_docs - len(slots) + 0.5) / (len(slots) + 0.5))
+                norm = self.k1 * (1 - self.b + self.b * self._slot_lengths[slots] / average_length)
+                # Slots are unique within one term, so fancy-index += is exact
+                scores[slots] += idf * frequencies * (self.k1 + 1) / (frequencies + norm)
+
+            matched = np.flatnonzero(scores)
+            if len(matched) > k:
+                matched = matched[np.argpartition(scores[matched], -k)[-k:]]
+            matched = matched[np.argsort(-scores[matched], kind='stable')]
+            return [(self._slot_ids[slot], float(scores[slot])) for slot in matched]
+
+    def matching_identifiers(self, query, doc_ids):
+        """
+        Find identifier-like query terms that occur verbatim in each document.
+
+        Args:
+            query (str): Query text
+            doc_ids (list): Documents to check
+
+        Returns:
+            dict: doc_id to the sorted list of shared identifier terms
+        """
+        identifiers = {term for term in tokenize(query) if is_identifier(term)}
+        with self._lock:
+            return {
+                doc_id: sorted(term for term in identifiers if doc_id in self._postings.get(term, {}))
+                for doc_id in doc_ids
+            }
+
+    def persist(self):
+        """Atomically write the index to disk."""
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'postings': self._postings, 'doc_lengths': self._doc_lengths}, f)
+            os.replace(tmp_path, self.path)
+
+    def clear(self):
+        """Remove every document and delete the persisted index."""
+        with self._lock:
+            self._reset()
+            if os.path.exists(self.path):
+                os.remove(self.path)
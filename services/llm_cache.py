@@ -0,0 +1,233 @@
+# services/llm_cache.py
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from config.settings import Settings
+
+class LLMResponseCache:
+    """
+    Disk-backed cache of LLM completion text shared by all call sites.
+
+    Entries are keyed on the model name, the request parameters and a hash of
+    the prompt messages, stored in a local SQLite file, expire after a TTL and
+    are evicted least-recently-used once the entry count or total size limit is
+    exceeded. Hit and miss counters are kept for the lifetime of the process.
+
+    Attributes:
+        path (str): SQLite database file
+        ttl_seconds (int): Entry lifetime; expired entries count as misses
+        max_entries (int): Maximum number of cached responses
+        max_bytes (int): Maximum total size of cached response text
+        hits (int): Lookups served from the cache
+        misses (int): Lookups that had to call the API
+
+    Example:
+        >>> cache = get_llm_cache()
+        >>> text = cache.get_or_call("gpt-3.5-turbo", messages, {"temperature": 0.7}, call_api)
+        >>> cache.stats()
+        {'hits': 1, 'misses': 0, 'entries': 12, 'bytes': 48211}
+    """
+
+    def __init__(self, path, ttl_seconds=86400, max_entries=5000, max_bytes=50 * 1024 * 1024):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model, messages, params):
+        """
+        Build the cache key for a completion request.
+
+        Args:
+            model (str): Model name
+            messages (list): Chat messages sent to the model
+            params (dict): Remaining request parameters (temperature, max_tokens, ...)
+
+        Returns:
+            str: Hex digest identifying the request
+        """
+        payload = json.dumps(
+            {'model': model, 'messages': messages, 'params': params},
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """
+        Return the cached response for a key, or None on a miss.
+
+        Args:
+            key (str): Key from make_key
+
+        Returns:
+            str or None: Cached response text
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def set(self, key, model, response):
+        """
+        Store a response and evict entries beyond the configured limits.
+
+        Args:
+            key (str): Key from make_key
+            model (str): Model name, kept for inspection
+            response (str): Completion text to cache
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, len(response.encode('utf-8')), now, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now):
+        """Drop expired entries, then least recently used ones over the limits."""
+        self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+        count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+
+        evict = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at ASC"):
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            evict.append((key,))
+            count -= 1
+            total -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", evict)
+        logging.info(f"Evicted {len(evict)} LLM cache entries")
+
+    def get_or_call(self, model, messages, params, call, validate=None):
+        """
+        Return a cached response or call the API and cache its result.
+
+        Args:
+            model (str): Model name
+            messages (list): Chat messages sent to the model
+            params (dict): Remaining request parameters
+            call (callable): Zero-argument function returning the completion text
+            validate (callable, optional): Called with fresh text before caching;
+                any exception it raises propagates and nothing is cached
+
+        Returns:
+            str: Completion text
+        """
+        key = self.make_key(model, messages, params)
+        cached = self.get(key)
+        if cached is not None:
+            logging.debug(f"LLM cache hit for {model}")
+            return cached
+
+        response = call()
+        if validate is not None:
+            validate(response)
+        self.set(key, model, response)
+        return response
+
+    def stream_or_call(self, model, messages, params, stream):
+        """
+        Yield a cached response, or stream it from the API and cache it once complete.
+
+        A cache hit yields the whole response as a single chunk. A stream that
+        fails or is abandoned part-way is not cached.
+
+        Args:
+            model (str): Model name
+            messages (list): Chat messages sent to the model
+            params (dict): Remaining request parameters, excluding the stream flag
+            stream (callable): Zero-argument function returning an iterator of text chunks
+
+        Yields:
+            str: Completion text chunks
+        """
+        key = self.make_key(model, messages, params)
+        cached = self.get(key)
+        if cached is not None:
+            logging.debug(f"LLM cache hit for {model}")
+            yield cached
+            return
+
+        chunks = []
+        for chunk in stream():
+            chunks.append(chunk)
+            yield chunk
+        self.set(key, model, ''.join(chunks))
+
+    def stats(self):
+        """Return hit/miss counters together with the current entry count and size."""
+        with self._lock:
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            return {'hits': self.hits, 'misses': self.misses, 'entries': entries, 'bytes': total}
+
+    def clear(self):
+        """Remove every cached response."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """
+    Return the process-wide LLM response cache configured from Settings.
+
+    Returns:
+        LLMResponseCache: Shared cache instance
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            settings = Settings()
+            _cache = LLMResponseCache(
+                settings.LLM_CACHE_PATH,
+                ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+                max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+                max_bytes=settings.LLM_CACHE_MAX_BYTES
+            )
+        return _cache
@@ -0,0 +1,309 @@
+# services/llm_provider.py
+"""
+Pluggable provider layer in front of the hosted LLM and embedding APIs.
+
+Every completion (OpenAI and Groq) and every embedding goes through the
+process-wide LLMProvider, whose mode is set by LLM_PROVIDER_MODE:
+
+- live: call the APIs through the shared LLM response cache (default)
+- record: as live, and also append every request/response pair to
+  LLM_RECORDINGS_PATH
+- replay: answer only from recordings, after LLM_PROVIDER_LATENCY_MS of
+  simulated latency; a request that was never recorded raises ReplayMissError
+- synthetic: generate schema-valid responses and deterministic embeddings
+  offline, after the same simulated latency
+
+Replay and synthetic modes never touch the network or the response cache, so
+benchmarks measure the application's own overhead and run air-gapped. The
+API key settings must still be present, but may be dummy values.
+
+Example:
+    >>> provider = get_llm_provider()
+    >>> text = provider.complete(model, messages, params, call_api, validate=json.loads)
+    >>> embed = provider.embedding_function(DefaultEmbeddingFunction())
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import numpy as np
+from chromadb.api.types import EmbeddingFunction
+from config.settings import Settings
+from services.llm_cache import LLMResponseCache, get_llm_cache
+
+PROVIDER_MODES = ('live', 'record', 'replay', 'synthetic')
+SYNTHETIC_EMBEDDING_DIM = 384
+
+_FORMAT_LINE_PATTERN = re.compile(r"^([A-Z_]+): \[(.*)\]$", re.MULTILINE)
+_CASE_PATTERN = re.compile(r"^Case (\d+):", re.MULTILINE)
+_CHOICES_PATTERN = re.compile(r"exactly one of: ([^\]\n]+)", re.IGNORECASE)
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+class ReplayMissError(LookupError):
+    """Raised in replay mode for a request that has no recording."""
+
+
+def _stable_int(*parts):
+    """Deterministic non-negative integer derived from text, stable across processes."""
+    digest = hashlib.sha256('\x1f'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+    return int(digest[:12], 16)
+
+
+def synthetic_completion(messages):
+    """
+    Generate a response that satisfies the prompt's requested output format.
+
+    Prompts embedding a JSON template get that template back as JSON.
+    Prompts listing 'KEY: [description]' lines get one line per key, repeated
+    per 'Case N:' when cases are listed; '[0-100]' placeholders get a score
+    and category-like fields one of the prompt's "exactly one of" choices.
+
+    Args:
+        messages (list): Chat messages of the request
+
+    Returns:
+        str: Deterministic response text for the request
+    """
+    prompt = '\n'.join(str(message.get('content', '')) for message in messages)
+
+    start, end = prompt.find('{'), prompt.rfind('}')
+    if start != -1 and end > start:
+        try:
+            return json.dumps(json.loads(prompt[start:end + 1]))
+        except ValueError:
+            pass
+
+    fields = _FORMAT_LINE_PATTERN.findall(prompt)
+    if not fields:
+        return "Synthetic response."
+    choices_match = _CHOICES_PATTERN.search(prompt)
+    choices = [choice.strip() for choice in choices_match.group(1).split(',')] if choices_match else []
+    cases = _CASE_PATTERN.findall(prompt) if 'For each case' in prompt else []
+
+    blocks = []
+    for case in cases or [None]:
+        lines = []
+        for key, placeholder in fields:
+            placeholder_lower = placeholder.lower()
+            if case is not None and 'case number' in placeholder_lower:
+                value = case
+            elif placeholder == '0-100':
+                value = 40 + _stable_int(prompt, case, key) % 56
+            elif choices and 'category' in placeholder_lower:
+                value = choices[_stable_int(prompt, key) % len(choices)]
+            else:
+                value = f"Synthetic {key.lower().replace('_', ' ')}"
+            lines.append(f"{key}: {value}")
+        blocks.append('\n'.join(lines))
+    return '\n\n'.join(blocks)
+
+
+def synthetic_embedding(text, dim=SYNTHETIC_EMBEDDING_DIM):
+    """
+    Deterministic unit vector from hashed words, so texts sharing words are close.
+
+    Args:
+        text (str): Text to embed
+        dim (int): Embedding dimensionality
+
+    Returns:
+        list: dim floats with unit L2 norm
+    """
+    vector = np.zeros(dim, dtype=np.float32)
+    for word in _WORD_PATTERN.findall(str(text).lower()):
+        vector[_stable_int(word) % dim] += 1.0
+    if not vector.any():
+        vector[0] = 1.0
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+class ProviderEmbeddingFunction(EmbeddingFunction):
+    """
+    ChromaDB embedding function routed through an LLMProvider.
+
+    Attributes:
+        provider (LLMProvider): Provider deciding how texts are embedded
+        inner: Real embedding function used in live and record modes
+    """
+
+    def __init__(self, provider, inner):
+        self.provider = provider
+        self.inner = inner
+
+    def __call__(self, input):
+        return self.provider.embed(list(input), self.inner)
+
+
+class LLMProvider:
+    """
+    Routes completions and embeddings according to the provider mode.
+
+    Recordings are appended as JSON lines to completions.jsonl and
+    embeddings.jsonl under recordings_path, keyed like the LLM response
+    cache, and loaded once on the first replayed request.
+
+    Attributes:
+        mode (str): One of PROVIDER_MODES
+        recordings_path (str): Directory holding the recordings
+        latency_seconds (float): Simulated latency per request in replay and synthetic modes
+    """
+
+    def __init__(self, mode='live', recordings_path='./llm_recordings', latency_ms=0):
+        if mode not in PROVIDER_MODES:
+            raise ValueError(f"Unknown LLM provider mode: {mode}")
+        self.mode = mode
+        self.recordings_path = recordings_path
+        self.latency_seconds = max(0.0, float(latency_ms)) / 1000
+        self._lock = threading.Lock()
+        self._recordings = None
+
+    @property
+    def offline(self):
+        """True when no request may reach the hosted APIs."""
+        return self.mode in ('replay', 'synthetic')
+
+    def _path(self, kind):
+        return os.path.join(self.recordings_path, f"{kind}.jsonl")
+
+    def _record(self, kind, key, value):
+        line = json.dumps({'key': key, 'value': value}, ensure_ascii=False)
+        with self._lock:
+            os.makedirs(self.recordings_path, exist_ok=True)
+            with open(self._path(kind), 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+
+    def _replay(self, kind, key):
+        with self._lock:
+            if self._recordings is None:
+                self._recordings = {'completions': {}, 'embeddings': {}}
+                for name, entries in self._recordings.items():
+                    if not os.path.exists(self._path(name)):
+                        continue
+                    with open(self._path(name), 'r', encoding='utf-8') as f:
+                        for line in f:
+                            if line.strip():
+                                entry = json.loads(line)
+                                entries[entry['key']] = entry['value']
+                logging.info(f"Loaded LLM recordings from {self.recordings_path}")
+        try:
+            return self._recordings[kind][key]
+        except KeyError:
+            raise ReplayMissError(f"No recorded {kind} entry for request {key[:12]}") from None
+
+    def _offline_response(self, model, messages, params):
+        if self.mode == 'replay':
+            return self._replay('completions', LLMResponseCache.make_key(model, messages, params))
+        return synthetic_completion(messages)
+
+    def complete(self, model, messages, params, call, validate=None):
+        """
+        Return the completion text for a request.
+
+        Args:
+            model (str): Model name
+            messages (list): Chat messages sent to the model
+            params (dict): Remaining request parameters
+            call (callable): Zero-argument function calling the hosted API
+            validate (callable, optional): Check applied to a fresh live response before it is cached
+
+        Returns:
+            str: Completion text
+
+        Raises:
+            ReplayMissError: In replay mode, for a request that was never recorded
+        """
+        if self.offline:
+            response = self._offline_response(model, messages, params)
+            time.sleep(self.latency_seconds)
+            return response
+
+        response = get_llm_cache().get_or_call(model, messages, params, call, validate=validate)
+        if self.mode == 'record':
+            self._record('completions', LLMResponseCache.make_key(model, messages, params), response)
+        return response
+
+    def stream(self, model, messages, params, stream):
+        """
+        Yield the completion text for a request in chunks.
+
+        Offline modes spread the simulated latency evenly over word-sized
+        chunks, so time to the full response matches complete().
+
+        Args:
+            model (str): Model name
+            messages (list): Chat messages sent to the model
+            params (dict): Remaining request parameters, excluding the stream flag
+            stream (callable): Zero-argument function returning an iterator of text chunks
+
+        Yields:
+            str: Completion text chunks
+        """
+        if self.offline:
+            chunks = re.findall(r"\S+\s*|\s+", self._offline_response(model, messages, params))
+            for chunk in chunks:
+                time.sleep(self.latency_seconds / len(chunks))
+                yield chunk
+            return
+
+        chunks = []
+        for chunk in get_llm_cache().stream_or_call(model, messages, params, stream):
+            chunks.append(chunk)
+            yield chunk
+        if self.mode == 'record':
+            self._record('completions', LLMResponseCache.make_key(model, messages, params), ''.join(chunks))
+
+    def embed(self, texts, inner):
+        """
+        Embed texts with the real model, recordings or the synthetic embedder.
+
+        Args:
+            texts (list): Texts to embed
+            inner (callable): Real embedding function for live and record modes
+
+        Returns:
+            list: One embedding (list of floats) per text
+        """
+        if self.mode == 'synthetic':
+            return [synthetic_embedding(text) for text in texts]
+        if self.mode == 'replay':
+            return [self._replay('embeddings', hashlib.sha256(text.encode('utf-8')).hexdigest())
+                    for text in texts]
+
+        embeddings = [np.asarray(embedding, dtype=np.float32).tolist() for embedding in inner(texts)]
+        if self.mode == 'record':
+            for text, embedding in zip(texts, embeddings):
+                self._record('embeddings', hashlib.sha256(text.encode('utf-8')).hexdigest(), embedding)
+        return embeddings
+
+    def embedding_function(self, inner):
+        """Wrap a ChromaDB embedding function; live mode returns it unchanged."""
+        return inner if self.mode == 'live' else ProviderEmbeddingFunction(self, inner)
+
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def get_llm_provider():
+    """
+    Return the process-wide LLM provider configured from Settings.
+
+    Returns:
+        LLMProvider: Shared provider instance
+    """
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            settings = Settings()
+            _provider = LLMProvider(
+                settings.LLM_PROVIDER_MODE,
+                recordings_path=settings.LLM_RECORDINGS_PATH,
+                latency_ms=settings.LLM_PROVIDER_LATENCY_MS
+            )
+            logging.info(f"LLM provider mode: {_provider.mode}")
+        return _provider
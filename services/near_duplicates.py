@@ -0,0 +1,308 @@
+# services/near_duplicates.py
+"""
+MinHash/LSH near-duplicate clustering of historical incidents.
+
+Historical exports contain re-opened, cloned and auto-generated tickets whose
+text is almost identical. At ingest NearDuplicateIndex assigns every incident
+either to an existing cluster or makes it the representative of a new one;
+only representatives are embedded and stored in the vector store, and each
+keeps the list of its members. At query time collapse() folds cases that are
+still near-identical (e.g. from an index built before clustering) into the
+best-ranked one, so the similarity prompt is not filled with copies.
+
+Texts are compared by the Jaccard similarity of their word 3-gram shingles,
+estimated from NUM_PERM MinHash values. Words containing digits (ticket
+numbers, timestamps, hostnames) are masked first, since those are exactly
+what differs between a ticket and its clones. Locality-sensitive hashing over
+BANDS bands finds candidate clusters without comparing against every
+representative (a pair becomes a candidate with probability 0.95 at Jaccard
+0.8 and 0.9999 at 0.9), and candidates are confirmed against the threshold.
+Incidents only cluster with the same category and service, so metadata
+filters keep working on representatives.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import zlib
+import numpy as np
+
+NUM_PERM = 128
+BANDS = 16
+SHINGLE_SIZE = 3
+
+_ROWS_PER_BAND = NUM_PERM // BANDS
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+_DIGIT_PATTERN = re.compile(r"\d")
+# Fixed seed: signatures are persisted and must not change between processes
+_PERMUTATIONS = np.random.default_rng(20240601).integers(
+    1, (1 << 61) - 1, size=(2, NUM_PERM), dtype=np.uint64
+)
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """
+    Return the set of word n-grams of text, with words containing digits masked.
+
+    Args:
+        text (str): Text to shingle
+        size (int): Words per shingle; shorter texts give one shingle
+
+    Returns:
+        set: Space-joined lowercase word n-grams
+    """
+    words = ['#' if _DIGIT_PATTERN.search(word) else word
+             for word in _WORD_PATTERN.findall(str(text).lower())]
+    if len(words) <= size:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def minhash(text):
+    """
+    Compute the MinHash signature of text's shingles.
+
+    Args:
+        text (str): Text to sign
+
+    Returns:
+        numpy.ndarray: NUM_PERM uint32 values
+    """
+    values = np.fromiter((zlib.crc32(shingle.encode('utf-8')) for shingle in shingles(text)),
+                         dtype=np.uint64)
+    if not len(values):
+        return np.full(NUM_PERM, _MAX_HASH, dtype=np.uint32)
+    a, b = _PERMUTATIONS
+    # uint64 products wrap around, which keeps the permutations deterministic
+    hashes = (values[:, np.newaxis] * a + b) % _MERSENNE_PRIME & _MAX_HASH
+    return hashes.min(axis=0).astype(np.uint32)
+
+
+def incident_text(document, metadata):
+    """Return the text an incident is compared by: its description and resolution notes."""
+    return f"{document} {metadata.get('actions_taken', '')}"
+
+
+class NearDuplicateIndex:
+    """
+    Persisted clusters of near-duplicate historical incidents.
+
+    Representatives' signatures are kept in memory with their LSH buckets and
+    saved next to the JSON cluster list as a NumPy array. Members are kept
+    by ID only; when a representative is removed its members are handed
+    back to the caller, who re-reads them from the source file to cluster
+    them again. persist() only writes when the clusters changed.
+
+    Attributes:
+        path (str): JSON file the clusters are persisted to
+        threshold (float): Minimum estimated Jaccard similarity to join a cluster
+
+    Example:
+        >>> index = NearDuplicateIndex("./chroma_db/near_duplicates.json", threshold=0.8)
+        >>> index.add("INC002", description, metadata)   # None: new representative
+        >>> index.add("INC003", copied_description, metadata)
+        'INC002'
+        >>> index.members("INC002")
+        ['INC003']
+    """
+
+    def __init__(self, path, threshold=0.8):
+        self.path = path
+        self.threshold = threshold
+        self._signatures_path = f"{os.path.splitext(path)[0]}.npy"
+        self._lock = threading.RLock()
+        self._load()
+
+    def _reset(self):
+        self._signatures = {}
+        self._partitions = {}
+        self._members = {}
+        self._member_of = {}
+        self._buckets = [{} for _ in range(BANDS)]
+        self._dirty = False
+
+    def _load(self):
+        self._reset()
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data['threshold'] != self.threshold:
+                logging.info("Near-duplicate threshold changed, discarding stored clusters")
+                return
+            signatures = np.load(self._signatures_path)
+            for incident_id, partition, signature in zip(data['ids'], data['partitions'], signatures):
+                self._add_representative(incident_id, partition, signature)
+            self._members = data['members']
+        except (OSError, ValueError, KeyError) as e:
+            logging.warning(f"Ignoring unreadable near-duplicate index {self.path}: {e}")
+            self._reset()
+            return
+        self._member_of = {member: representative
+                           for representative, members in self._members.items() for member in members}
+
+    @staticmethod
+    def _partition(metadata):
+        return f"{metadata.get('category', '')}\x1f{metadata.get('service', '')}"
+
+    @staticmethod
+    def _band_keys(partition, signature):
+        return [hash((partition, signature[band * _ROWS_PER_BAND:(band + 1) * _ROWS_PER_BAND].tobytes()))
+                for band in range(BANDS)]
+
+    def _add_representative(self, incident_id, partition, signature):
+        self._signatures[incident_id] = signature
+        self._partitions[incident_id] = partition
+        for buckets, key in zip(self._buckets, self._band_keys(partition, signature)):
+            buckets.setdefault(key, []).append(incident_id)
+
+    def _find_representative(self, partition, signature):
+        """Return the most similar representative at or above the threshold, or None."""
+        candidates = set()
+        for buckets, key in zip(self._buckets, self._band_keys(partition, signature)):
+            candidates.update(buckets.get(key, ()))
+        best, best_similarity = None, self.threshold
+        for candidate in candidates:
+            similarity = float(np.mean(self._signatures[candidate] == signature))
+            if similarity >= best_similarity:
+                best, best_similarity = candidate, similarity
+        return best
+
+    def count(self):
+        """Return the number of clustered incidents, representatives and members."""
+        return len(self._signatures) + len(self._member_of)
+
+    def representative_count(self):
+        """Return the number of clusters."""
+        return len(self._signatures)
+
+    def representative(self, incident_id):
+        """Return the representative of an incident's cluster (itself if it is one)."""
+        return self._member_of.get(incident_id, incident_id)
+
+    def members(self, incident_id):
+        """Return the incidents folded into a representative, in ingest order."""
+        return list(self._members.get(incident_id, ()))
+
+    def add(self, incident_id, document, metadata):
+        """
+        Cluster an incident that is not currently in the index.
+
+        Args:
+            incident_id (str): Incident ID
+            document (str): Incident description
+            metadata (dict): Incident metadata as stored in the vector store
+
+        Returns:
+            str or None: The representative it joined, or None when it became
+                the representative of a new cluster
+        """
+        partition = self._partition(metadata)
+        signature = minhash(incident_text(document, metadata))
+        with self._lock:
+            self._dirty = True
+            representative = self._find_representative(partition, signature)
+            if representative is None:
+                self._add_representative(incident_id, partition, signature)
+                return None
+            self._members.setdefault(representative, []).append(incident_id)
+            self._member_of[incident_id] = representative
+            return representative
+
+    def remove(self, incident_id):
+        """
+        Take an incident out of its cluster.
+
+        Removing a representative dissolves its cluster; its members are
+        returned so the caller can cluster them again.
+
+        Args:
+            incident_id (str): Incident ID
+
+        Returns:
+            list: IDs of the dissolved cluster's members, empty unless
+                incident_id was a representative
+        """
+        with self._lock:
+            representative = self._member_of.pop(incident_id, None)
+            if representative is not None:
+                self._dirty = True
+                self._members[representative].remove(incident_id)
+                if not self._members[representative]:
+                    del self._members[representative]
+                return []
+            signature = self._signatures.pop(incident_id, None)
+            if signature is None:
+                return []
+            self._dirty = True
+            partition = self._partitions.pop(incident_id)
+            for buckets, key in zip(self._buckets, self._band_keys(partition, signature)):
+                bucket = buckets[key]
+                bucket.remove(incident_id)
+                if not bucket:
+                    del buckets[key]
+            orphans = self._members.pop(incident_id, [])
+            for member in orphans:
+                del self._member_of[member]
+            return orphans
+
+    def collapse(self, ids, documents, metadatas):
+        """
+        Fold near-identical cases of a ranked result list into the best-ranked one.
+
+        Args:
+            ids (list): Case IDs, best first
+            documents (list): Descriptions of the same cases
+            metadatas (list): Metadata of the same cases
+
+        Returns:
+            list: (index of a kept case, IDs folded into it) pairs, in rank order
+        """
+        kept = []
+        for i, (document, metadata) in enumerate(zip(documents, metadatas)):
+            partition = self._partition(metadata)
+            signature = minhash(incident_text(document, metadata))
+            for keeper in kept:
+                if keeper[1] == partition and np.mean(keeper[2] == signature) >= self.threshold:
+                    keeper[3].append(ids[i])
+                    break
+            else:
+                kept.append((i, partition, signature, []))
+        return [(i, folded) for i, _, _, folded in kept]
+
+    def persist(self):
+        """Atomically write the clusters and signatures to disk, if they changed."""
+        with self._lock:
+            if not self._dirty and os.path.exists(self.path):
+                return
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            ids = list(self._signatures)
+            signatures = (np.stack([self._signatures[incident_id] for incident_id in ids]) if ids
+                          else np.empty((0, NUM_PERM), dtype=np.uint32))
+            tmp_path = f"{self._signatures_path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                np.save(f, signatures)
+            os.replace(tmp_path, self._signatures_path)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'threshold': self.threshold,
+                    'ids': ids,
+                    'partitions': [self._partitions[incident_id] for incident_id in ids],
+                    'members': self._members
+                }, f)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+
+    def clear(self):
+        """Remove every cluster and delete the persisted files."""
+        with self._lock:
+            self._reset()
+            for file_path in (self.path, self._signatures_path):
+                if os.path.exists(file_path):
+                    os.remove(file_path)
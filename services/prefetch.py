@@ -0,0 +1,192 @@
+# services/prefetch.py
+"""
+Background prefetch of the analyses a freshly uploaded incident will need.
+
+Uploading a transcript on the Incident Details page schedules the similar
+incidents search and root cause analysis on a small process-wide worker
+pool, and stores the result in the analysis store. By the time the user
+opens Similar Historical Incidents the analysis is usually stored already;
+if it is still running, the page attaches to the job and shows its current
+stage instead of starting the same LLM calls again.
+
+Jobs are keyed by incident and description, so reruns and other sessions
+looking at the same incident share one job. Finished jobs are kept for the
+pages to attach to, up to MAX_JOBS, oldest dropped first.
+
+Example:
+    >>> job = prefetch_analysis("INC123456", detailed_issue_info)
+    >>> job.stage
+    'Finding similar incidents'
+    >>> get_prefetcher().get(analysis_job_key("INC123456", description)).done()
+"""
+
+import atexit
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from config.settings import Settings
+from History.Similar_Incidents3 import ROOT_CAUSE_FAILED
+from services import engine_registry
+from services.analysis_store import analysis_key, describe_incident, get_analysis_store
+
+MAX_JOBS = 100
+
+
+class PrefetchJob:
+    """
+    A background computation and the stage it has reached.
+
+    Attributes:
+        key (tuple): Key the job was submitted under
+        stage (str): Human-readable description of the current step
+        future (concurrent.futures.Future): Resolves to the job's return value
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self.stage = "Queued"
+        self.future = None
+
+    def done(self):
+        """True once the job has finished, successfully or not."""
+        return self.future.done()
+
+    def failed(self):
+        """True when the job finished with an exception."""
+        return self.future.done() and not self.future.cancelled() and self.future.exception() is not None
+
+
+class Prefetcher:
+    """
+    Worker threads running prefetch jobs, deduplicated by key.
+
+    Attributes:
+        workers (int): Number of worker threads
+    """
+
+    def __init__(self, workers):
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, key, func, *args):
+        """
+        Run func(job, *args) in the background unless a job for key is pending or succeeded.
+
+        func receives the PrefetchJob first so it can report its stage.
+
+        Returns:
+            PrefetchJob: The new or already existing job
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and not job.failed():
+                self._jobs.move_to_end(key)
+                return job
+            job = PrefetchJob(key)
+            job.future = self._executor.submit(self._run, job, func, *args)
+            self._jobs[key] = job
+            while len(self._jobs) > MAX_JOBS:
+                oldest = next(iter(self._jobs))
+                if not self._jobs[oldest].done():
+                    break
+                del self._jobs[oldest]
+            return job
+
+    @staticmethod
+    def _run(job, func, *args):
+        try:
+            result = func(job, *args)
+            job.stage = "Done"
+            return result
+        except Exception as e:
+            logging.error(f"Prefetch job {job.key[:2]} failed: {e}")
+            job.stage = "Failed"
+            raise
+
+    def get(self, key):
+        """Return the job submitted under key, or None."""
+        with self._lock:
+            return self._jobs.get(key)
+
+    def close(self):
+        """Stop the workers, cancelling jobs that have not started."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def analysis_job_key(incident_id, incident_description):
+    """Key of the prefetched similar incidents analysis of an incident."""
+    return ('analysis', str(incident_id), incident_description)
+
+
+def _analyze(job, incident_id, incident_description):
+    """Compute and store the unfiltered similar incidents analysis, as the page would."""
+    job.stage = "Loading historical incidents"
+    engine = engine_registry.get_engine()
+    input_hash, version = analysis_key(engine, incident_description)
+    store = get_analysis_store()
+    result = store.get(incident_id, input_hash, version)
+    if result is not None:
+        return result
+
+    job.stage = "Finding similar incidents"
+    similar_incidents = engine.find_similar_incidents(incident_description)
+    job.stage = "Analyzing root cause"
+    root_analysis = engine.analyze_root_cause(incident_description)
+    result = {
+        'incident_id': incident_id,
+        'current_incident': {
+            'description': incident_description,
+            'analysis': root_analysis
+        },
+        'similar_incidents': similar_incidents
+    }
+    if root_analysis.get('ROOT_CAUSE') == ROOT_CAUSE_FAILED['ROOT_CAUSE']:
+        raise RuntimeError("Root cause analysis failed")
+    store.put(incident_id, input_hash, version, result)
+    return result
+
+
+def prefetch_analysis(incident_id, detailed_issue_info):
+    """
+    Schedule the similar incidents analysis of a freshly extracted incident.
+
+    Args:
+        incident_id (str): Incident ID, as used by the similar incidents page
+        detailed_issue_info (dict): Extracted issue details
+
+    Returns:
+        PrefetchJob or None: The job, or None when prefetching is disabled
+    """
+    prefetcher = get_prefetcher()
+    if prefetcher is None:
+        return None
+    incident_description = describe_incident(detailed_issue_info)
+    return prefetcher.submit(analysis_job_key(incident_id, incident_description), _analyze,
+                             str(incident_id), incident_description)
+
+
+_prefetcher = None
+_prefetcher_lock = threading.Lock()
+
+
+def get_prefetcher():
+    """
+    Return the process-wide prefetcher configured from Settings.
+
+    The prefetcher is closed at interpreter exit.
+
+    Returns:
+        Prefetcher or None: Shared instance, None when PREFETCH_WORKERS is 0
+    """
+    global _prefetcher
+    with _prefetcher_lock:
+        if _prefetcher is None:
+            workers = Settings().PREFETCH_WORKERS
+            if workers <= 0:
+                return None
+            _prefetcher = Prefetcher(workers)
+            atexit.register(_prefetcher.close)
+        return _prefetcher
@@ -0,0 +1,629 @@
+# services/vector_index.py
+"""
+Retrieval backends for the incident analysis system.
+
+EnhancedIncidentAnalysisSystem talks to its vector store through the small
+RetrievalBackend interface below, so the storage engine can be swapped
+without touching ingest or analysis code:
+
+- ChromaBackend: persistent ChromaDB collection (the original behaviour)
+- NumpyVectorIndex: exact in-process search over a memory-mapped float32
+  matrix, for historical sets that fit comfortably in RAM, optionally
+  scanning a float16 or int8 copy and rescoring the shortlist exactly
+
+Query results use ChromaDB's nested-list shape ({'ids': [[...]], ...}, one
+inner list per query) and squared L2 distances between unit vectors, so
+callers cannot tell the backends apart. Both accept ChromaDB's metadata
+filter syntax ("where") to restrict the search before scoring.
+"""
+
+import json
+import logging
+import operator
+import os
+import shutil
+import threading
+import numpy as np
+import chromadb
+from chromadb.errors import InvalidCollectionException
+
+logger = logging.getLogger(__name__)
+
+QUANTIZATION_MODES = ('none', 'float16', 'int8')
+# Rows dequantized per block while scanning a quantized matrix
+QUANTIZED_BLOCK_SIZE = 8192
+
+_COMPARISONS = {
+    '$eq': operator.eq,
+    '$ne': operator.ne,
+    '$gt': operator.gt,
+    '$gte': operator.ge,
+    '$lt': operator.lt,
+    '$lte': operator.le,
+}
+
+
+def matches_where(metadata, where):
+    """
+    Evaluate a ChromaDB-style metadata filter against one metadata dict.
+
+    Supports field equality ({'category': 'Network'}), the operators $eq,
+    $ne, $gt, $gte, $lt, $lte, $in and $nin, and nesting with $and/$or.
+
+    Raises:
+        ValueError: For an unsupported operator
+    """
+    if not where:
+        return True
+    for key, condition in where.items():
+        if key == '$and':
+            if not all(matches_where(metadata, clause) for clause in condition):
+                return False
+        elif key == '$or':
+            if not any(matches_where(metadata, clause) for clause in condition):
+                return False
+        else:
+            value = metadata.get(key)
+            if not isinstance(condition, dict):
+                condition = {'$eq': condition}
+            for op, operand in condition.items():
+                if op == '$in':
+                    matched = value in operand
+                elif op == '$nin':
+                    matched = value not in operand
+                elif op in _COMPARISONS:
+                    try:
+                        matched = value is not None and _COMPARISONS[op](value, operand)
+                    except TypeError:
+                        matched = False
+                else:
+                    raise ValueError(f"Unsupported filter operator: {op}")
+                if not matched:
+                    return False
+    return True
+
+
+class RetrievalBackend:
+    """
+    Interface shared by all vector stores used for historical incidents.
+
+    Attributes:
+        manifest_path (str): Where the ingest manifest for this store lives
+    """
+
+    manifest_path = None
+
+    def count(self):
+        """Return the number of stored incidents."""
+        raise NotImplementedError
+
+    def upsert(self, ids, documents, metadatas, embeddings=None):
+        """Insert or replace incidents, embedding documents when no embeddings are given."""
+        raise NotImplementedError
+
+    def delete(self, ids):
+        """Remove incidents by ID."""
+        raise NotImplementedError
+
+    def query(self, query_texts=None, query_embeddings=None, n_results=5,
+              include=('metadatas', 'documents', 'distances'), where=None):
+        """
+        Return the nearest incidents for each query, nearest first.
+
+        Only incidents whose metadata matches where (see matches_where) are
+        searched, so a filter shrinks the candidate set instead of post-filtering.
+        """
+        raise NotImplementedError
+
+    def get(self, ids, include=('metadatas', 'documents', 'embeddings')):
+        """Return stored incidents by ID as flat lists; unknown IDs are skipped."""
+        raise NotImplementedError
+
+    def persist(self):
+        """Flush pending writes to disk."""
+
+    def reset(self):
+        """Remove every stored incident."""
+        raise NotImplementedError
+
+    def destroy(self):
+        """Delete the store's files from disk and start again empty."""
+        raise NotImplementedError
+
+    def close(self):
+        """Release any resources held by the store."""
+
+
+class ChromaBackend(RetrievalBackend):
+    """
+    Retrieval backend over a persistent ChromaDB collection.
+
+    Attributes:
+        path (str): ChromaDB persistence directory
+        client: ChromaDB persistent client
+        collection: ChromaDB collection holding the incident embeddings
+    """
+
+    def __init__(self, path, collection_name, embedding_function):
+        self.path = path
+        self.collection_name = collection_name
+        self.embedding_function = embedding_function
+        self.manifest_path = os.path.join(path, "ingest_manifest.json")
+        self.client = chromadb.PersistentClient(path=path)
+        self.collection = self._open_collection()
+
+    def _open_collection(self):
+        try:
+            # Pass the embedding function explicitly so Chroma does not load
+            # a second copy of the ONNX model for the existing collection
+            collection = self.client.get_collection(
+                name=self.collection_name,
+                embedding_function=self.embedding_function
+            )
+            logger.info("Loaded existing incident collection from ChromaDB")
+        except InvalidCollectionException:
+            collection = self.client.create_collection(
+                name=self.collection_name,
+                embedding_function=self.embedding_function
+            )
+            logger.info("Created new incident collection in ChromaDB")
+        return collection
+
+    def count(self):
+        return self.collection.count()
+
+    def upsert(self, ids, documents, metadatas, embeddings=None):
+        self.collection.upsert(ids=ids, documents=documents, metadatas=metadatas, embeddings=embeddings)
+
+    def delete(self, ids):
+        self.collection.delete(ids=ids)
+
+    def query(self, query_texts=None, query_embeddings=None, n_results=5,
+              include=('metadatas', 'documents', 'distances'), where=None):
+        return self.collection.query(
+            query_texts=query_texts,
+            query_embeddings=query_embeddings,
+            n_results=n_results,
+            where=where or None,
+            include=list(include)
+        )
+
+    def get(self, ids, include=('metadatas', 'documents', 'embeddings')):
+        return self.collection.get(ids=ids, include=list(include))
+
+    def reset(self):
+        try:
+            self.client.delete_collection(self.collection_name)
+            logger.info("Deleted existing collection")
+        except Exception:
+            pass
+        self.collection = self.client.create_collection(
+            name=self.collection_name,
+            embedding_function=self.embedding_function
+        )
+        logger.info("Reinitialized ChromaDB collection")
+
+    def destroy(self):
+        # Close the client connection
+        self.client.reset()
+
+        # Remove the ChromaDB directory
+        if os.path.exists(self.path):
+            shutil.rmtree(self.path)
+            logger.info("Successfully deleted ChromaDB directory")
+
+        # Reinitialize the client and collection
+        self.client = chromadb.PersistentClient(path=self.path)
+        self.collection = self.client.create_collection(
+            name=self.collection_name,
+            embedding_function=self.embedding_function
+        )
+        logger.info("Reinitialized ChromaDB")
+
+    def close(self):
+        self.client.clear_system_cache()
+
+
+class NumpyVectorIndex(RetrievalBackend):
+    """
+    Exact cosine-similarity index over a memory-mapped float32 matrix.
+
+    Embeddings are L2-normalised and stored row-wise in ``embeddings.f32``;
+    IDs, documents and metadata are kept in parallel in-memory arrays and
+    written to ``metadata.json`` by persist(). Queries score all rows with a
+    blocked matrix multiply and select the top k with ``np.argpartition``,
+    so memory for a query stays bounded by ``block_size`` rows. A metadata
+    filter is evaluated first over cached per-field column arrays, and only
+    the matching rows are scored.
+
+    With quantization, the scan reads a float16 copy (``embeddings.f16``) or
+    an int8 copy with one float32 scale per row (``embeddings.i8`` and
+    ``scales.f32``), which halves or quarters the memory the scan keeps
+    resident. The best ``n_results * rescore_factor`` rows are then rescored
+    against the float32 matrix, read row by row from disk rather than through
+    the memory map, so the reported distances are exact. The quantized copy is rebuilt from
+    the float32 matrix when the index is opened with a different mode.
+
+    Writes made after the last persist() are marked by a ``dirty`` file; an
+    index that was not persisted cleanly is discarded on the next load, which
+    makes the ingest manifest fall out of sync and forces a full re-ingest.
+
+    Attributes:
+        path (str): Directory holding the index files
+        block_size (int): Rows scored per matrix-multiply block
+        quantization (str): One of QUANTIZATION_MODES
+        rescore_factor (int): Shortlist size per requested result when quantized
+
+    Example:
+        >>> index = NumpyVectorIndex("./vector_index", embedding_function)
+        >>> index.upsert(ids, documents, metadatas)
+        >>> index.persist()
+        >>> index.query(query_texts=["SAP login failures"], n_results=5)
+    """
+
+    def __init__(self, path, embedding_function, block_size=65536, quantization='none', rescore_factor=4):
+        if quantization not in QUANTIZATION_MODES:
+            raise ValueError(f"Unknown vector quantization: {quantization}")
+        self.path = path
+        self.embedding_function = embedding_function
+        self.block_size = block_size
+        self.quantization = quantization
+        self.rescore_factor = max(1, int(rescore_factor))
+        self.manifest_path = os.path.join(path, "ingest_manifest.json")
+        self._matrix_path = os.path.join(path, "embeddings.f32")
+        self._quantized_paths = {
+            'float16': os.path.join(path, "embeddings.f16"),
+            'int8': os.path.join(path, "embeddings.i8"),
+        }
+        self._scales_path = os.path.join(path, "scales.f32")
+        self._meta_path = os.path.join(path, "metadata.json")
+        self._dirty_path = os.path.join(path, "dirty")
+        self._lock = threading.RLock()
+        os.makedirs(path, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        self._matrix = None
+        self._quantized = None
+        self._scales = None
+        self._capacity = 0
+        self._dim = None
+        self._ids = []
+        self._documents = []
+        self._metadatas = []
+        self._rows = {}
+        self._columns = {}
+
+        if os.path.exists(self._dirty_path):
+            logger.warning("Vector index was not persisted cleanly, starting empty")
+            self._remove_files()
+            return
+        self._remove_unused_quantized_files()
+        if not os.path.exists(self._meta_path):
+            return
+
+        with open(self._meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        self._dim = meta['dim']
+        self._ids = meta['ids']
+        self._documents = meta['documents']
+        self._metadatas = meta['metadatas']
+        self._rows = {incident_id: row for row, incident_id in enumerate(self._ids)}
+        if self._dim:
+            stale = (self.quantization != 'none' and
+                     (meta.get('quantization', 'none') != self.quantization or
+                      not os.path.exists(self._quantized_paths[self.quantization])))
+            self._open_storage(os.path.getsize(self._matrix_path) // (self._dim * 4))
+            if stale:
+                self._requantize()
+        logger.info(f"Loaded NumPy vector index with {len(self._ids)} incidents")
+
+    def _remove_files(self):
+        self._matrix = self._quantized = self._scales = None
+        for file_path in (self._matrix_path, self._meta_path, self._dirty_path, self._scales_path,
+                          *self._quantized_paths.values()):
+            if os.path.exists(file_path):
+                os.remove(file_path)
+
+    def _remove_unused_quantized_files(self):
+        unused = [file_path for mode, file_path in self._quantized_paths.items() if mode != self.quantization]
+        if self.quantization != 'int8':
+            unused.append(self._scales_path)
+        for file_path in unused:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+
+    def _storage(self):
+        return [matrix for matrix in (self._matrix, self._quantized, self._scales) if matrix is not None]
+
+    @staticmethod
+    def _map(file_path, dtype, shape):
+        """Memory-map file_path as an array of shape, resizing the file to fit."""
+        with open(file_path, 'ab') as f:
+            f.truncate(int(np.prod(shape)) * np.dtype(dtype).itemsize)
+        return np.memmap(file_path, dtype=dtype, mode='r+', shape=shape)
+
+    def _open_storage(self, capacity):
+        """(Re)map the float32 matrix and any quantized copy at ``capacity`` rows."""
+        for matrix in self._storage():
+            matrix.flush()
+        self._matrix = self._map(self._matrix_path, np.float32, (capacity, self._dim))
+        if self.quantization == 'float16':
+            self._quantized = self._map(self._quantized_paths['float16'], np.float16, (capacity, self._dim))
+        elif self.quantization == 'int8':
+            self._quantized = self._map(self._quantized_paths['int8'], np.int8, (capacity, self._dim))
+            self._scales = self._map(self._scales_path, np.float32, (capacity,))
+        self._capacity = capacity
+
+    def _write_quantized(self, rows, vectors):
+        if self._quantized is None:
+            return
+        if self._scales is None:
+            self._quantized[rows] = vectors.astype(np.float16)
+            return
+        # Symmetric per-row scale: the largest component maps to +/-127
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        self._quantized[rows] = np.rint(vectors / scales[:, np.newaxis]).astype(np.int8)
+        self._scales[rows] = scales
+
+    def _requantize(self):
+        """Rebuild the quantized copy from the float32 matrix."""
+        logger.info(f"Quantizing {len(self._ids)} vectors to {self.quantization}")
+        for start in range(0, len(self._ids), self.block_size):
+            rows = slice(start, min(start + self.block_size, len(self._ids)))
+            self._write_quantized(rows, np.asarray(self._matrix[rows]))
+
+    def _mark_dirty(self):
+        if not os.path.exists(self._dirty_path):
+            open(self._dirty_path, 'w').close()
+
+    def _ensure_capacity(self, rows):
+        """Grow the memory-mapped matrix file to hold at least ``rows`` rows."""
+        if rows <= self._capacity:
+            return
+        self._open_storage(max(rows, self._capacity * 2, 1024))
+
+    @staticmethod
+    def _normalize(vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors[np.newaxis, :]
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _column(self, field, numeric=False):
+        """Return one metadata field for every row as an array, cached until the next write."""
+        column = self._columns.get((field, numeric))
+        if column is None:
+            values = [metadata.get(field) for metadata in self._metadatas]
+            if numeric:
+                column = np.array([value if isinstance(value, (int, float)) and not isinstance(value, bool)
+                                   else np.nan for value in values], dtype=np.float64)
+            else:
+                column = np.empty(len(values), dtype=object)
+                column[:] = values
+            self._columns[(field, numeric)] = column
+        return column
+
+    def _where_mask(self, where):
+        """Evaluate a metadata filter (see matches_where) for all rows at once."""
+        mask = np.ones(len(self._ids), dtype=bool)
+        for key, condition in where.items():
+            if key == '$and':
+                for clause in condition:
+                    mask &= self._where_mask(clause)
+            elif key == '$or':
+                matched = np.zeros(len(self._ids), dtype=bool)
+                for clause in condition:
+                    matched |= self._where_mask(clause)
+                mask &= matched
+            else:
+                if not isinstance(condition, dict):
+                    condition = {'$eq': condition}
+                for op, operand in condition.items():
+                    if op in ('$in', '$nin'):
+                        matched = np.fromiter((value in operand for value in self._column(key)),
+                                              dtype=bool, count=len(self._ids))
+                        mask &= matched if op == '$in' else ~matched
+                    elif op not in _COMPARISONS:
+                        raise ValueError(f"Unsupported filter operator: {op}")
+                    elif op in ('$eq', '$ne'):
+                        # Elementwise on the object column
+                        mask &= np.asarray(_COMPARISONS[op](self._column(key), operand), dtype=bool)
+                    elif isinstance(operand, (int, float)):
+                        # Missing and non-numeric values are NaN, which compares False
+                        mask &= _COMPARISONS[op](self._column(key, numeric=True), operand)
+                    else:
+                        mask &= np.fromiter((matches_where({key: value}, {key: {op: operand}})
+                                             for value in self._column(key)),
+                                            dtype=bool, count=len(self._ids))
+        return mask
+
+    def count(self):
+        return len(self._ids)
+
+    def upsert(self, ids, documents, metadatas, embeddings=None):
+        if embeddings is None:
+            embeddings = self.embedding_function(documents)
+        vectors = self._normalize(embeddings)
+
+        with self._lock:
+            self._mark_dirty()
+            self._columns = {}
+            if self._dim is None:
+                self._dim = vectors.shape[1]
+            rows = []
+            for incident_id, document, metadata in zip(ids, documents, metadatas):
+                row = self._rows.get(incident_id)
+                if row is None:
+                    row = len(self._ids)
+                    self._rows[incident_id] = row
+                    self._ids.append(incident_id)
+                    self._documents.append(document)
+                    self._metadatas.append(metadata)
+                else:
+                    self._documents[row] = document
+                    self._metadatas[row] = metadata
+                rows.append(row)
+            self._ensure_capacity(len(self._ids))
+            self._matrix[rows] = vectors
+            self._write_quantized(rows, vectors)
+
+    def delete(self, ids):
+        with self._lock:
+            self._mark_dirty()
+            self._columns = {}
+            for incident_id in ids:
+                row = self._rows.pop(incident_id, None)
+                if row is None:
+                    continue
+                # Move the last row into the gap to keep the matrix dense
+                last = len(self._ids) - 1
+                if row != last:
+                    moved_id = self._ids[last]
+                    for matrix in self._storage():
+                        matrix[row] = matrix[last]
+                    self._ids[row] = moved_id
+                    self._documents[row] = self._documents[last]
+                    self._metadatas[row] = self._metadatas[last]
+                    self._rows[moved_id] = row
+                self._ids.pop()
+                self._documents.pop()
+                self._metadatas.pop()
+
+    def query(self, query_texts=None, query_embeddings=None, n_results=5,
+              include=('metadatas', 'documents', 'distances'), where=None):
+        if query_embeddings is None:
+            query_embeddings = self.embedding_function(query_texts)
+        queries = self._normalize(query_embeddings)
+
+        with self._lock:
+            count = len(self._ids)
+            candidates = np.flatnonzero(self._where_mask(where)) if where and count else None
+            total = count if candidates is None else len(candidates)
+            k = min(n_results, total)
+            if self._quantized is None:
+                shortlist, block_size = k, self.block_size
+            else:
+                shortlist = min(k * self.rescore_factor, total)
+                block_size = min(self.block_size, QUANTIZED_BLOCK_SIZE)
+            best_scores = np.empty((len(queries), 0), dtype=np.float32)
+            best_rows = np.empty((len(queries), 0), dtype=np.int64)
+            for start in range(0, total if k else 0, block_size):
+                if candidates is None:
+                    block_rows = np.arange(start, min(start + block_size, count))
+                    block_index = slice(start, start + len(block_rows))
+                else:
+                    block_rows = candidates[start:start + block_size]
+                    block_index = block_rows
+                block_scores = self._block_scores(queries, block_index, block_rows)
+                scores = np.concatenate([best_scores, block_scores], axis=1)
+                rows = np.concatenate(
+                    [best_rows, np.broadcast_to(block_rows, (len(queries), len(block_rows)))],
+                    axis=1
+                )
+                best_scores, best_rows = self._top(scores, rows, shortlist)
+
+            if self._quantized is not None and best_rows.shape[1]:
+                # Exact float32 rescoring of the shortlist
+                vectors = self._read_rows(best_rows.ravel()).reshape(best_rows.shape + (self._dim,))
+                best_scores = np.einsum('qrd,qd->qr', vectors, queries)
+                best_scores, best_rows = self._top(best_scores, best_rows, k)
+
+            order = np.argsort(-best_scores, axis=1)
+            best_scores = np.take_along_axis(best_scores, order, axis=1)
+            best_rows = np.take_along_axis(best_rows, order, axis=1)
+
+            result = {'ids': [[self._ids[row] for row in rows] for rows in best_rows]}
+            if 'documents' in include:
+                result['documents'] = [[self._documents[row] for row in rows] for rows in best_rows]
+            if 'metadatas' in include:
+                result['metadatas'] = [[self._metadatas[row] for row in rows] for rows in best_rows]
+        if 'distances' in include:
+            # Squared L2 between unit vectors, matching ChromaDB's default space
+            result['distances'] = np.clip(2.0 - 2.0 * best_scores, 0.0, None).tolist()
+        return result
+
+    @staticmethod
+    def _top(scores, rows, k):
+        """Keep the k highest scores per query (unordered) with their rows."""
+        if scores.shape[1] <= k:
+            return scores, rows
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        return np.take_along_axis(scores, top, axis=1), np.take_along_axis(rows, top, axis=1)
+
+    def _read_rows(self, rows):
+        """
+        Read float32 rows from the matrix file with ordinary reads.
+
+        Faulting scattered rows in through the memory map would also map
+        neighbouring pages, so the float32 matrix would creep back into
+        resident memory as queries rescore different rows.
+        """
+        vectors = np.empty((len(rows), self._dim), dtype=np.float32)
+        row_bytes = self._dim * vectors.itemsize
+        with open(self._matrix_path, 'rb') as f:
+            for vector, row in zip(vectors, rows):
+                f.seek(int(row) * row_bytes)
+                f.readinto(vector)
+        return vectors
+
+    def _block_scores(self, queries, block_index, block_rows):
+        """Cosine scores of queries against one block, from the quantized copy when present."""
+        if self._quantized is None:
+            return queries @ self._matrix[block_index].T
+        scores = queries @ np.asarray(self._quantized[block_index], dtype=np.float32).T
+        if self._scales is not None:
+            scores *= self._scales[block_rows]
+        return scores
+
+    def get(self, ids, include=('metadatas', 'documents', 'embeddings')):
+        with self._lock:
+            rows = [self._rows[incident_id] for incident_id in ids if incident_id in self._rows]
+            result = {'ids': [self._ids[row] for row in rows]}
+            if 'documents' in include:
+                result['documents'] = [self._documents[row] for row in rows]
+            if 'metadatas' in include:
+                result['metadatas'] = [self._metadatas[row] for row in rows]
+            if 'embeddings' in include:
+                result['embeddings'] = np.array(self._matrix[rows]) if rows else np.empty((0, self._dim or 0))
+        return result
+
+    def persist(self):
+        with self._lock:
+            for matrix in self._storage():
+                matrix.flush()
+            tmp_path = f"{self._meta_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'dim': self._dim,
+                    'quantization': self.quantization,
+                    'ids': self._ids,
+                    'documents': self._documents,
+                    'metadatas': self._metadatas
+                }, f)
+            os.replace(tmp_path, self._meta_path)
+            if os.path.exists(self._dirty_path):
+                os.remove(self._dirty_path)
+
+    def reset(self):
+        with self._lock:
+            self._remove_files()
+            self._load()
+        logger.info("Reinitialized NumPy vector index")
+
+    def destroy(self):
+        with self._lock:
+            self._matrix = self._quantized = self._scales = None
+            if os.path.exists(self.path):
+                shutil.rmtree(self.path)
+            os.makedirs(self.path, exist_ok=True)
+            self._load()
+        logger.info("Deleted NumPy vector index directory")
+
+    def close(self):
+        with self._lock:
+            for matrix in self._storage():
+                matrix.flush()
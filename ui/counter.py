@@ -1,8 +1,10 @@
 import streamlit as st
 import streamlit.components.v1 as components
 from datetime import datetime
+from functools import partial
 import pandas as pd
 import io
+from services.export import FORMATS, MIME_TYPES, PHASE_HISTORY_SCHEMA, export_bytes, phase_records
 
 def initialize_session_state():
     """
@@ -48,25 +50,28 @@ def update_phase_history(phase_num, end_time):
 
 def export_phase_data():
     """
-    Create and return exportable phase history data
+    Create and return exportable phase history rows
+
+    Returns:
+        list: Completed phases plus the current one if the incident is active,
+            or None if no phase has completed yet
     """
     if not st.session_state.phase_history:
         return None
     
-    df = pd.DataFrame(st.session_state.phase_history)
+    rows = list(st.session_state.phase_history)
     
     # Add current phase if incident is active
     if st.session_state.incident_active and st.session_state.current_phase_start:
         current_duration = (datetime.now() - st.session_state.current_phase_start).total_seconds() / 60
-        current_phase = {
+        rows.append({
             'Phase': f"Phase {st.session_state.current_phase}",
             'Start Time': st.session_state.current_phase_start.strftime('%Y-%m-%d %H:%M:%S'),
             'End Time': 'Ongoing',
             'Duration (minutes)': round(current_duration, 2)
-        }
-        df = pd.concat([df, pd.DataFrame([current_phase])], ignore_index=True)
+        })
     
-    return df
+    return rows
 
 def create_status_cards():
     """
@@ -223,16 +228,19 @@ def create_timer_app():
                     st.session_state.current_phase_start = datetime.now()
                     st.experimental_rerun()
     
+    # Build the phase rows once per render for the export and the table
+    rows = export_phase_data()
+    df = pd.DataFrame(rows) if rows is not None else None
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M')
+
     with col3:
         if st.session_state.incident_active:
-            # Export button
-            df = export_phase_data()
+            # Export button; the file is only generated when clicked
             if df is not None:
-                csv = df.to_csv(index=False).encode('utf-8')
                 st.download_button(
                     label="Export Phases",
-                    data=csv,
-                    file_name=f"incident_phases_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
+                    data=lambda: df.to_csv(index=False).encode('utf-8'),
+                    file_name=f"incident_phases_{timestamp}.csv",
                     mime='text/csv',
                     key="export_phases_btn"
                 )
@@ -242,11 +250,23 @@ def create_timer_app():
     components.html(cards_html, height=150)
     
     # Display phase history table if available
-    if st.session_state.phase_history:
+    if df is not None:
         st.markdown("### Phase History")
-        df = export_phase_data()
-        if df is not None:
-            st.dataframe(df)
+        st.dataframe(df)
+
+        # Schema-stable exports for reporting jobs, serialized only when
+        # clicked rather than on every timer rerun
+        incident_id = (st.session_state.get('incident_data') or {}).get('incident_id')
+        records = phase_records(rows, incident_id)
+        for column, fmt in zip(st.columns(len(FORMATS)), FORMATS):
+            with column:
+                st.download_button(
+                    label=f"Export Phases ({fmt.upper()})",
+                    data=partial(export_bytes, PHASE_HISTORY_SCHEMA, records, fmt),
+                    file_name=f"incident_phases_{timestamp}.{fmt}",
+                    mime=MIME_TYPES[fmt],
+                    key=f"export_phases_{fmt}_btn"
+                )
 
 if __name__ == "__main__":
     create_timer_app()
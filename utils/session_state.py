@@ -7,11 +7,14 @@ def initialize_session_state():
     Initialize Streamlit session state variables.
     
     Sets up the following state variables:
+    - extraction: Result of the single transcript extraction shared by all pages
     - incident_data: Stores extracted incident information
     - recipients: List of email recipients
     - additional_recipients: Additional email recipients string
     - show_process_button: Controls process button visibility
     """
+    if 'extraction' not in st.session_state:
+        st.session_state.extraction = None
     if 'incident_data' not in st.session_state:
         st.session_state.incident_data = None
     if 'recipients' not in st.session_state:
@@ -23,3 +26,18 @@ def initialize_session_state():
 
 def update_file_state():
     st.session_state.show_process_button = True
+
+def store_extraction(extraction):
+    """
+    Keep a transcript extraction for every page.
+
+    incident_data (Incident Details) and detailed_issue_info (Incident
+    Summary, Similar Historical Incidents) are the two parts of the same
+    extraction, so a transcript is only extracted once.
+
+    Args:
+        extraction (dict): Result of IncidentExtractor.extract
+    """
+    st.session_state.extraction = extraction
+    st.session_state.incident_data = extraction['incident_data']
+    st.session_state.detailed_issue_info = extraction['detailed_issue_info']
@@ -2,8 +2,10 @@
 import streamlit as st
 from services.incident_manager import IncidentManager
 from services.email_service import EmailService
+from services.incident_extraction import IncidentExtractor
+from services.prefetch import prefetch_analysis
 from ui.components import display_incident_details, display_email_section
-from utils.session_state import update_file_state
+from utils.session_state import store_extraction, update_file_state
 
 def show():
     st.title("🚨 Incident Details")
@@ -15,7 +17,12 @@ def show():
         if 'transcript' not in st.session_state:
             transcript = incident_manager.read_docx(uploaded_file)
             st.session_state.transcript = transcript
-            st.session_state.incident_data = incident_manager.extract_incident_details(transcript)
+            store_extraction(IncidentExtractor(incident_manager.settings.OPENAI_API_KEY).extract(transcript))
+            # Start the similar incidents analysis while the user reads the details
+            prefetch_analysis(
+                st.session_state.incident_data.get('incident_id') or 'unknown',
+                st.session_state.detailed_issue_info
+            )
             st.success("Transcript processed successfully!")
             update_file_state()
 
@@ -1,19 +1,27 @@
 # pages/incident_summary.py
 import streamlit as st
-from services.detail_extractor import IncidentDetailExtractor
+from functools import partial
+from services.incident_extraction import IncidentExtractor
+from services.export import FORMATS, INCIDENT_DETAILS_SCHEMA, MIME_TYPES, export_bytes, incident_details_record
 from ui.components import display_detailed_issue_info
 from ui.counter import create_timer_app
+from utils.session_state import store_extraction
 
 def show():
     # st.title("📊 Incident Summary")
 
     if 'transcript' in st.session_state and st.session_state.transcript:
-        if 'detailed_issue_info' not in st.session_state:
+        # Normally extracted together with the incident details on upload
+        if not st.session_state.get('extraction'):
             if 'settings' in st.session_state:
-                detailed_extractor = IncidentDetailExtractor(st.session_state.settings.OPENAI_API_KEY)
-                detailed_issue_info = detailed_extractor.extract_detailed_issue_info(st.session_state.transcript)
-                if detailed_issue_info:
-                    st.session_state.detailed_issue_info = detailed_issue_info
+                try:
+                    extraction = IncidentExtractor(st.session_state.settings.OPENAI_API_KEY).extract(
+                        st.session_state.transcript
+                    )
+                    store_extraction(extraction)
+                except Exception:
+                    # Logged by the extractor; the warning below is shown instead
+                    pass
 
         # Display timer first
         # create_timer_app()
@@ -21,6 +29,19 @@ def show():
         # Then display detailed information
         if 'detailed_issue_info' in st.session_state and st.session_state.detailed_issue_info:
             display_detailed_issue_info(st.session_state.detailed_issue_info)
+
+            record = incident_details_record(
+                st.session_state.get('incident_data'), st.session_state.detailed_issue_info
+            )
+            for column, fmt in zip(st.columns(len(FORMATS)), FORMATS):
+                with column:
+                    st.download_button(
+                        label=f"Export Details ({fmt.upper()})",
+                        data=partial(export_bytes, INCIDENT_DETAILS_SCHEMA, [record], fmt),
+                        file_name=f"incident_details_{record['incident_id'] or 'unknown'}.{fmt}",
+                        mime=MIME_TYPES[fmt],
+                        key=f"export_details_{fmt}_btn"
+                    )
         else:
             st.warning("Detailed incident information not available.")
     else:
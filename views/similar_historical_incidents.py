@@ -1,100 +1,147 @@
+import time
+from functools import partial
 import streamlit as st
-from History.Similar_Incidents3 import EnhancedIncidentAnalysisSystem
-from config.settings import Settings
+from services import engine_registry
+from services.analysis_store import analysis_key, describe_incident, get_analysis_store
+from services.export import ANALYSIS_SCHEMA, FORMATS, MIME_TYPES, analysis_record, export_bytes
+from services.incident_metadata import build_where
+from services.prefetch import analysis_job_key, get_prefetcher
 
-def show():
-    st.title("🔍 Similar Historical Incidents")
-
-    if 'detailed_issue_info' in st.session_state:
-        # Concatenate detailed issue info into a single string
-        incident_description = " ".join(
-            f"{key}: {value}" for key, value in st.session_state.detailed_issue_info.items()
-        )
+def show_similar_incidents(analysis_system, incident_description, similar_incidents):
+    """Render the similar incidents, each with an on-demand LLM comparison."""
+    if 'similarity_explanations' not in st.session_state:
+        st.session_state.similarity_explanations = {}
+    for incident in similar_incidents:
+        st.markdown(f"**Incident ID:** {incident['incident_id']}")
+        st.markdown(f"**Similarity Score:** {incident['similarity_score']}")
+        if incident.get('matched_identifiers'):
+            st.markdown(f"**Exact Matches:** {', '.join(incident['matched_identifiers'])}")
+        if incident.get('near_duplicates'):
+            st.markdown(f"**Near-duplicates:** {', '.join(incident['near_duplicates'])}")
+        st.markdown(f"**Description:** {incident['description']}")
+        st.markdown(f"**Actions Taken:** {incident['actions_taken']}")
+        st.markdown(f"**Participants:** {incident['participants']}")
+        with st.expander("Detailed comparison"):
+            explanation_key = (incident_description, incident['incident_id'])
+            if st.button("Compare with AI", key=f"compare_{incident['incident_id']}"):
+                st.session_state.similarity_explanations[explanation_key] = \
+                    analysis_system.explain_similarity(incident_description, incident)
+            explanation = st.session_state.similarity_explanations.get(explanation_key)
+            if explanation:
+                st.markdown(f"**AI Similarity Score:** {explanation.get('score', 'N/A')}")
+                st.markdown(f"**Matching Patterns:** {explanation.get('patterns', 'N/A')}")
+                st.markdown(f"**Applicable Solution:** {explanation.get('solution', 'N/A')}")
+        st.markdown("---")
 
-        # Initialize the analysis system
-        analysis_system = EnhancedIncidentAnalysisSystem(
-            groq_api_key=Settings().GROQ_API_KEY    ,
-            historical_incidents_file=r'C:\Users\gurhegde\OneDrive - Deloitte (O365D)\CAI Playground\Pratik-Tasks\Unilever POC\Integration 1.2\History\Incidents_4X3.xlsx'
-        )
+def stream_root_cause(analysis_system, incident_description):
+    """
+    Render the root cause analysis, each field as soon as its tokens arrive.
 
-        # Perform analysis
-        # EnhancedIncidentAnalysisSystem.delete_all_data()
-        result = analysis_system.analyze_incident(incident_description)
+    Returns:
+        tuple: (analysis dict, True if any field came from ROOT_CAUSE_FAILED)
+    """
+    root_analysis = {}
+    fields = {}
+    failed = False
+    with st.spinner("Analyzing root cause..."):
+        for key, value, complete, field_failed in analysis_system.stream_root_cause(incident_description):
+            if key not in fields:
+                fields[key] = st.empty()
+            fields[key].markdown(f"**{key}:** {value}" + ("" if complete else " ▌"))
+            if complete:
+                root_analysis[key] = value
+            failed = failed or field_failed
+    return root_analysis, failed
 
-        # Display root cause analysis
-        st.subheader("Root Cause Analysis")
-        for key, value in result['current_incident']['analysis'].items():
-            st.markdown(f"**{key}:** {value}")
+@st.fragment(run_every=1)
+def show_prefetch_progress(job):
+    """Show the stage of a background analysis, rerunning the page once it finishes."""
+    if job.done():
+        st.rerun()
+    st.info(f"Analysis started on upload is running in the background: {job.stage}...")
 
-        # Display similar incidents
-        st.subheader("Similar Incidents")
-        for incident in result['similar_incidents']:
-            st.markdown(f"**Incident ID:** {incident['incident_id']}")
-            st.markdown(f"**Similarity Score:** {incident['similarity_score']}")
-            st.markdown(f"**Description:** {incident['description']}")
-            st.markdown(f"**Actions Taken:** {incident['actions_taken']}")
-            st.markdown(f"**Participants:** {incident['participants']}")
-            st.markdown("---")
-
-        # Export button
-        if st.button("Export Analysis"):
-            # Convert result to a downloadable format
-            st.download_button(
-                label="Download Analysis",
-                data=str(result),
-                file_name="similar_incidents_analysis.txt",
-                mime="text/plain"
-            )
-    else:
-        st.warning("Please process an incident document first.")
-import streamlit as st
-from services.incident_manager import IncidentManager
-from History.Similar_Incidents3 import EnhancedIncidentAnalysisSystem
-from ui.components import display_incident_details
+def prefetch_job(incident_id, incident_description, categories, refresh):
+    """Return the in-flight upload prefetch for this analysis, or None."""
+    prefetcher = get_prefetcher()
+    if refresh or categories or prefetcher is None:
+        return None
+    job = prefetcher.get(analysis_job_key(incident_id, incident_description))
+    return job if job is not None and not job.done() else None
 
 def show():
     st.title("🔍 Similar Historical Incidents")
 
-    # Initialize the incident analysis system
-    analysis_system = EnhancedIncidentAnalysisSystem()
+    if 'detailed_issue_info' in st.session_state:
+        # Concatenate detailed issue info into a single string
+        incident_description = describe_incident(st.session_state.detailed_issue_info)
 
-    # Input for incident description
-    incident_description = st.text_area("Describe the current incident", height=150)
+        # Shared, already-warm analysis system for this server process
+        analysis_system = engine_registry.get_engine()
+        incident_id = (st.session_state.get('incident_data') or {}).get('incident_id') or 'unknown'
+        refresh = st.button("Refresh Analysis")
 
-    if st.button("Analyze Incident"):
-        if incident_description:
-            with st.spinner("Analyzing..."):
-                result = analysis_system.analyze_incident(incident_description)
+        # Reserve the root cause section so the similar incidents, scored from
+        # embeddings alone, can be shown before the LLM analysis returns
+        root_cause_section = st.container()
 
-                # Display root cause analysis
-                st.subheader("Root Cause Analysis")
-                root_cause = result['current_incident']['analysis']
-                st.markdown(f"""
-                    <div class="card">
-                        <h4>Category: {root_cause.get('CATEGORY', 'N/A')}</h4>
-                        <p><strong>Root Cause:</strong> {root_cause.get('ROOT_CAUSE', 'N/A')}</p>
-                        <p><strong>Impact Level:</strong> {root_cause.get('IMPACT', 'N/A')}</p>
-                        <p><strong>Component:</strong> {root_cause.get('COMPONENT', 'N/A')}</p>
-                        <p><strong>Solution:</strong> {root_cause.get('SOLUTION', 'N/A')}</p>
-                        <p><strong>Prevention:</strong> {root_cause.get('PREVENTION', 'N/A')}</p>
-                    </div>
-                """, unsafe_allow_html=True)
+        st.subheader("Similar Incidents")
+        categories = st.multiselect("Limit to categories", analysis_system.categories)
+
+        # Every rerun (filters, comparisons, export) reads the stored analysis;
+        # it is only recomputed when its inputs, models or prompts change, or
+        # on Refresh Analysis
+        store = get_analysis_store()
+        input_hash, version = analysis_key(analysis_system, incident_description, categories)
+        result = None if refresh else store.get(incident_id, input_hash, version)
 
-                # Display similar incidents
-                st.subheader("Similar Incidents")
-                for incident in result['similar_incidents']:
-                    st.markdown(f"""
-                        <div class="card">
-                            <h4>Incident ID: {incident['incident_id']}</h4>
-                            <p><strong>Similarity Score:</strong> {incident['similarity_score']}%</p>
-                            <p><strong>Description:</strong> {incident['description']}</p>
-                            <p><strong>Actions Taken:</strong> {incident['actions_taken']}</p>
-                            <p><strong>Participants:</strong> {incident['participants']}</p>
-                        </div>
-                    """, unsafe_allow_html=True)
+        # Attach to the analysis started on upload instead of repeating it
+        job = prefetch_job(incident_id, incident_description, categories, refresh) if result is None else None
+        if job is not None:
+            with root_cause_section:
+                st.subheader("Root Cause Analysis")
+                show_prefetch_progress(job)
+            return
 
-                # Export button
-                if st.button("Export Analysis Results"):
-                    st.success("Analysis results exported successfully!")
+        if result is None:
+            similar_incidents = analysis_system.find_similar_incidents(
+                incident_description, where=build_where(category=categories)
+            )
         else:
-            st.warning("Please enter an incident description to analyze.")
+            similar_incidents = result['similar_incidents']
+        show_similar_incidents(analysis_system, incident_description, similar_incidents)
+
+        with root_cause_section:
+            st.subheader("Root Cause Analysis")
+            if result is None:
+                root_analysis, failed = stream_root_cause(analysis_system, incident_description)
+                result = {
+                    'incident_id': incident_id,
+                    'current_incident': {
+                        'description': incident_description,
+                        'analysis': root_analysis
+                    },
+                    'similar_incidents': similar_incidents
+                }
+                # Failed or partly failed analyses are shown but not kept, so the next rerun retries
+                if not failed:
+                    store.put(incident_id, input_hash, version, result)
+            else:
+                st.caption(
+                    f"Stored analysis from {time.strftime('%Y-%m-%d %H:%M', time.localtime(result['stored_at']))}"
+                )
+                for key, value in result['current_incident']['analysis'].items():
+                    st.markdown(f"**{key}:** {value}")
+
+        # Download buttons: the rerun they trigger is served from the store
+        record = analysis_record(result, incident_id, version, result.get('stored_at', time.time()))
+        for column, fmt in zip(st.columns(len(FORMATS)), FORMATS):
+            with column:
+                st.download_button(
+                    label=f"Export Analysis ({fmt.upper()})",
+                    data=partial(export_bytes, ANALYSIS_SCHEMA, [record], fmt),
+                    file_name=f"similar_incidents_analysis_{incident_id}.{fmt}",
+                    mime=MIME_TYPES[fmt],
+                    key=f"export_analysis_{fmt}_btn"
+                )
+    else:
+        st.warning("Please process an incident document first.")